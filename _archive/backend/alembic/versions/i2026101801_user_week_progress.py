@@ -0,0 +1,44 @@
+"""Add user_week_progress counters and backfill them from user_task_statuses
+
+Revision ID: i2026101801_user_week_progress
+Revises: h2026010401_phase2_infrastructure
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'i2026101801_user_week_progress'
+down_revision: Union[str, None] = 'h2026010401_phase2_infrastructure'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'user_week_progress',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('week_id', sa.Integer(), nullable=False),
+        sa.Column('tasks_completed', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['week_id'], ['weeks.id']),
+        sa.PrimaryKeyConstraint('user_id', 'week_id')
+    )
+
+    # Backfill counters from existing completions
+    op.execute("""
+        INSERT INTO user_week_progress (user_id, week_id, tasks_completed)
+        SELECT uts.user_id, t.week_id, COUNT(uts.id)
+        FROM user_task_statuses uts
+        JOIN tasks t ON t.id = uts.task_id
+        WHERE uts.completed = true
+        GROUP BY uts.user_id, t.week_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('user_week_progress')
@@ -0,0 +1,96 @@
+"""Add append-only reward_ledger and backfill legacy reward events per user
+
+Revision ID: j2026101801_reward_ledger
+Revises: i2026101801_user_week_progress
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'j2026101801_reward_ledger'
+down_revision: Union[str, None] = 'i2026101801_user_week_progress'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'reward_ledger',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('event_key', sa.String(length=100), nullable=False),
+        sa.Column('source', sa.String(length=30), nullable=False),
+        sa.Column('xp_delta', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('gold_delta', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_reward_ledger_id'), 'reward_ledger', ['id'], unique=False)
+    op.create_index('ix_reward_ledger_user_event', 'reward_ledger', ['user_id', 'event_key'], unique=False)
+
+    # Existing rewards predate the ledger: post one event per completed task and
+    # owned badge/achievement (amounts as tasks.py and catalog.py compute them,
+    # with the x0.5 difficulty multipliers applied in integer halves), so undoing
+    # a legacy completion reverses what it earned. Whatever the totals hold
+    # beyond those events becomes one opening entry per user.
+    op.execute("""
+        INSERT INTO reward_ledger (user_id, event_key, source, xp_delta, gold_delta, created_at)
+        SELECT user_id, event_key, 'migration', xp, xp / 10, created_at
+        FROM (
+            SELECT s.user_id AS user_id,
+                   'task:' || CAST(t.id AS VARCHAR(20)) AS event_key,
+                   COALESCE(t.xp_reward, 0) * CASE t.difficulty
+                       WHEN 'trivial' THEN 1 WHEN 'hard' THEN 3 WHEN 'boss' THEN 4 ELSE 2
+                   END / 2 AS xp,
+                   COALESCE(s.completed_at, CURRENT_TIMESTAMP) AS created_at
+            FROM user_task_statuses s
+            JOIN tasks t ON t.id = s.task_id
+            WHERE s.completed
+            UNION ALL
+            SELECT ub.user_id,
+                   'badge:' || b.badge_id,
+                   COALESCE(b.xp_value, 0) * CASE b.difficulty
+                       WHEN 'hard' THEN 3 WHEN 'epic' THEN 4 ELSE 2
+                   END / 2,
+                   MIN(COALESCE(ub.earned_at, CURRENT_TIMESTAMP))
+            FROM user_badges ub
+            JOIN badges b ON b.id = ub.badge_id
+            GROUP BY ub.user_id, b.badge_id, b.xp_value, b.difficulty
+            UNION ALL
+            SELECT ua.user_id,
+                   'achievement:' || a.achievement_id,
+                   COALESCE(a.xp_value, 0) * CASE a.difficulty
+                       WHEN 'hard' THEN 3 WHEN 'epic' THEN 4 ELSE 2
+                   END / 2,
+                   MIN(COALESCE(ua.earned_at, CURRENT_TIMESTAMP))
+            FROM user_achievements ua
+            JOIN achievements a ON a.id = ua.achievement_id
+            GROUP BY ua.user_id, a.achievement_id, a.xp_value, a.difficulty
+        ) legacy_events
+        WHERE xp != 0
+    """)
+    op.execute("""
+        INSERT INTO reward_ledger (user_id, event_key, source, xp_delta, gold_delta, created_at)
+        SELECT u.id, 'opening-balance', 'migration',
+               COALESCE(u.xp, 0) - COALESCE(e.xp, 0),
+               COALESCE(u.gold, 0) - COALESCE(e.gold, 0),
+               CURRENT_TIMESTAMP
+        FROM users u
+        LEFT JOIN (
+            SELECT user_id, SUM(xp_delta) AS xp, SUM(gold_delta) AS gold
+            FROM reward_ledger
+            GROUP BY user_id
+        ) e ON e.user_id = u.id
+        WHERE COALESCE(u.xp, 0) != COALESCE(e.xp, 0) OR COALESCE(u.gold, 0) != COALESCE(e.gold, 0)
+    """)
+
+def downgrade() -> None:
+    op.drop_index('ix_reward_ledger_user_event', table_name='reward_ledger')
+    op.drop_index(op.f('ix_reward_ledger_id'), table_name='reward_ledger')
+    op.drop_table('reward_ledger')
@@ -0,0 +1,62 @@
+"""Add per-user activity bitmaps and backfill them from user_task_statuses
+
+Revision ID: k2026101801_user_activity_bitmaps
+Revises: j2026101801_reward_ledger
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'k2026101801_user_activity_bitmaps'
+down_revision: Union[str, None] = 'j2026101801_reward_ledger'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bitmaps = op.create_table(
+        'user_activity_bitmaps',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('origin', sa.Date(), nullable=True),
+        sa.Column('bits', sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+    # Backfill: bit packing is done here rather than in SQL to stay portable
+    days_by_user = {}
+    rows = op.get_bind().execute(sa.text("""
+        SELECT user_id, DATE(completed_at)
+        FROM user_task_statuses
+        WHERE completed = true AND completed_at IS NOT NULL
+        GROUP BY user_id, DATE(completed_at)
+    """))
+    for user_id, day in rows:
+        if day:
+            days_by_user.setdefault(user_id, []).append(
+                day if isinstance(day, date) else date.fromisoformat(str(day))
+            )
+
+    backfill = []
+    for user_id, days in days_by_user.items():
+        origin = min(days)
+        bits = 0
+        for day in days:
+            bits |= 1 << (day - origin).days
+        backfill.append({
+            'user_id': user_id,
+            'origin': origin,
+            'bits': bits.to_bytes((bits.bit_length() + 7) // 8, 'little'),
+        })
+    if backfill:
+        op.bulk_insert(bitmaps, backfill)
+
+
+def downgrade() -> None:
+    op.drop_table('user_activity_bitmaps')
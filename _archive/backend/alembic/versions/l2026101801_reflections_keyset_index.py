@@ -0,0 +1,27 @@
+"""Index reflections on (user_id, created_at, id) for keyset pagination
+
+Revision ID: l2026101801_reflections_keyset_index
+Revises: k2026101801_user_activity_bitmaps
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'l2026101801_reflections_keyset_index'
+down_revision: Union[str, None] = 'k2026101801_user_activity_bitmaps'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_reflections_user_created', 'reflections', ['user_id', 'created_at', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reflections_user_created', table_name='reflections')
@@ -0,0 +1,76 @@
+"""Add the full-text search index (SQLite FTS5 / PostgreSQL tsvector) and populate it
+
+Revision ID: m2026101801_search_index
+Revises: l2026101801_reflections_keyset_index
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'm2026101801_search_index'
+down_revision: Union[str, None] = 'l2026101801_reflections_keyset_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# DDL and backfill as of this revision (app/utils/search.py keeps the live copy)
+SQLITE_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+        kind UNINDEXED, ref_id UNINDEXED, owner, parent UNINDEXED,
+        title, body, extra,
+        tokenize = 'porter unicode61'
+    )
+    """,
+)
+POSTGRES_DDL = (
+    """
+    CREATE TABLE IF NOT EXISTS search_index (
+        doc_id BIGINT PRIMARY KEY,
+        kind VARCHAR(20) NOT NULL,
+        ref_id INTEGER NOT NULL,
+        owner VARCHAR(30) NOT NULL,
+        parent VARCHAR(50),
+        title TEXT,
+        body TEXT,
+        extra TEXT,
+        document TSVECTOR GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(body, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(extra, '')), 'C')
+        ) STORED
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_search_index_document ON search_index USING GIN (document)",
+    "CREATE INDEX IF NOT EXISTS ix_search_index_owner ON search_index (owner)",
+)
+
+
+def upgrade() -> None:
+    postgres = op.get_bind().dialect.name == "postgresql"
+    for statement in POSTGRES_DDL if postgres else SQLITE_DDL:
+        op.execute(statement)
+
+    # Reflections get even document ids, questions odd ones
+    key = "doc_id" if postgres else "rowid"
+    op.execute("DELETE FROM search_index")
+    op.execute(f"""
+        INSERT INTO search_index ({key}, kind, ref_id, owner, parent, title, body, extra)
+        SELECT r.id * 2, 'reflection', r.id, 'u' || r.user_id, CAST(r.week_id AS VARCHAR(20)),
+               'Week ' || w.week_number || ': ' || w.title, r.content, NULL
+        FROM reflections r LEFT JOIN weeks w ON w.id = r.week_id
+    """)
+    op.execute(f"""
+        INSERT INTO search_index ({key}, kind, ref_id, owner, parent, title, body, extra)
+        SELECT q.id * 2 + 1, 'question', q.id, 'questions', q.quiz_id,
+               q.topic_tag, q.text, q.explanation
+        FROM questions q
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS search_index")
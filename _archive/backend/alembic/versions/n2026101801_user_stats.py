@@ -0,0 +1,46 @@
+"""Add user_stats totals and backfill them from the source tables
+
+Revision ID: n2026101801_user_stats
+Revises: m2026101801_search_index
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'n2026101801_user_stats'
+down_revision: Union[str, None] = 'm2026101801_search_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'user_stats',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('tasks_completed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('badges_earned', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('achievements_earned', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('quizzes_completed', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+    # Backfill from existing rows
+    op.execute("""
+        INSERT INTO user_stats (user_id, tasks_completed, badges_earned, achievements_earned, quizzes_completed)
+        SELECT u.id,
+               (SELECT COUNT(*) FROM user_task_statuses uts WHERE uts.user_id = u.id AND uts.completed = true),
+               (SELECT COUNT(*) FROM user_badges ub WHERE ub.user_id = u.id),
+               (SELECT COUNT(*) FROM user_achievements ua WHERE ua.user_id = u.id),
+               (SELECT COUNT(*) FROM quiz_results qr WHERE qr.user_id = u.id)
+        FROM users u
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('user_stats')
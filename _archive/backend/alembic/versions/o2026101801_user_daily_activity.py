@@ -0,0 +1,97 @@
+"""Add the user_daily_activity rollup and backfill it from task, quiz and review history
+
+Revision ID: o2026101801_user_daily_activity
+Revises: n2026101801_user_stats
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'o2026101801_user_daily_activity'
+down_revision: Union[str, None] = 'n2026101801_user_stats'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'user_daily_activity',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('tasks', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('quiz_xp', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('reviews', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('xp', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+
+    # Backfill: the same rollup as rebuild_daily_activity() at this revision,
+    # from the source tables with XP from each item's ledger event. Items
+    # without one predate the ledger and use the amounts credited then: task
+    # xp_reward by difficulty (in integer halves), 10 + score per quiz, and
+    # 10 (100 once mastered, 0 after a failure) for a schedule's latest review.
+    day_of = "CAST({} AS DATE)" if op.get_bind().dialect.name == "postgresql" else "date({})"
+    completed_day, result_day = day_of.format("s.completed_at"), day_of.format("r.completed_at")
+    created_day, reviewed_day = day_of.format("l.created_at"), day_of.format("v.last_reviewed_at")
+    op.execute(f"""
+        INSERT INTO user_daily_activity (user_id, day, tasks, quiz_xp, reviews, xp)
+        SELECT user_id, day,
+               CASE WHEN SUM(tasks) > 0 THEN SUM(tasks) ELSE 0 END,
+               CASE WHEN SUM(quiz_xp) > 0 THEN SUM(quiz_xp) ELSE 0 END,
+               CASE WHEN SUM(reviews) > 0 THEN SUM(reviews) ELSE 0 END,
+               CASE WHEN SUM(xp) > 0 THEN SUM(xp) ELSE 0 END
+        FROM (
+            SELECT s.user_id, {completed_day} AS day, 1 AS tasks, 0 AS quiz_xp, 0 AS reviews,
+                   COALESCE(e.xp, COALESCE(t.xp_reward, 0) * CASE t.difficulty
+                       WHEN 'trivial' THEN 1 WHEN 'hard' THEN 3 WHEN 'boss' THEN 4 ELSE 2
+                   END / 2) AS xp
+            FROM user_task_statuses s
+            JOIN tasks t ON t.id = s.task_id
+            LEFT JOIN (
+                SELECT user_id, event_key, SUM(xp_delta) AS xp
+                FROM reward_ledger
+                WHERE event_key LIKE 'task:%'
+                GROUP BY user_id, event_key
+            ) e ON e.user_id = s.user_id AND e.event_key = 'task:' || CAST(s.task_id AS VARCHAR(20))
+            WHERE s.completed AND s.completed_at IS NOT NULL
+            UNION ALL
+            SELECT user_id, day, 0, xp, 0, xp
+            FROM (
+                SELECT r.user_id, {result_day} AS day,
+                       COALESCE(e.xp, 10 + COALESCE(r.score, 0)) AS xp
+                FROM quiz_results r
+                LEFT JOIN (
+                    SELECT user_id, event_key, SUM(xp_delta) AS xp
+                    FROM reward_ledger
+                    WHERE event_key LIKE 'quiz-result:%'
+                    GROUP BY user_id, event_key
+                ) e ON e.user_id = r.user_id AND e.event_key = 'quiz-result:' || CAST(r.id AS VARCHAR(20))
+                WHERE r.completed_at IS NOT NULL
+            ) quizzes
+            UNION ALL
+            SELECT l.user_id, {created_day}, 0, 0, CASE WHEN l.xp_delta > 0 THEN 1 ELSE 0 END, l.xp_delta
+            FROM reward_ledger l
+            WHERE l.event_key LIKE 'srs-review:%'
+            UNION ALL
+            SELECT v.user_id, {reviewed_day}, 0, 0, 1,
+                   CASE WHEN COALESCE(v.success_count, 0) = 0 THEN 0 WHEN v.is_mastered THEN 100 ELSE 10 END
+            FROM user_question_reviews v
+            WHERE v.last_reviewed_at IS NOT NULL
+              AND NOT EXISTS (
+                  SELECT 1 FROM reward_ledger l
+                  WHERE l.user_id = v.user_id
+                    AND l.event_key = 'srs-review:' || CAST(v.id AS VARCHAR(20))
+              )
+        ) contributions
+        GROUP BY user_id, day
+        HAVING SUM(tasks) <> 0 OR SUM(quiz_xp) <> 0 OR SUM(reviews) <> 0 OR SUM(xp) <> 0
+    """)
+
+def downgrade() -> None:
+    op.drop_table('user_daily_activity')
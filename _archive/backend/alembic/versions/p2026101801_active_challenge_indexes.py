@@ -0,0 +1,46 @@
+"""Add user_challenges.expired_at and partial indexes for active challenges and quests
+
+Revision ID: p2026101801_active_challenge_indexes
+Revises: o2026101801_user_daily_activity
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'p2026101801_active_challenge_indexes'
+down_revision: Union[str, None] = 'o2026101801_user_daily_activity'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE_CHALLENGE = sa.text('completed_at IS NULL AND expired_at IS NULL')
+ACTIVE_QUEST = sa.text('completed_at IS NULL')
+
+
+def upgrade() -> None:
+    op.add_column('user_challenges', sa.Column('expired_at', sa.DateTime(), nullable=True))
+    op.create_index(
+        'ix_user_challenges_active', 'user_challenges', ['user_id'],
+        postgresql_where=ACTIVE_CHALLENGE, sqlite_where=ACTIVE_CHALLENGE,
+    )
+    op.create_index(
+        'ix_user_quests_active', 'user_quests', ['user_id'],
+        postgresql_where=ACTIVE_QUEST, sqlite_where=ACTIVE_QUEST,
+    )
+
+    # Close challenges that already ended; the app's expiry job keeps this up to date
+    op.execute("""
+        UPDATE user_challenges SET expired_at = CURRENT_TIMESTAMP
+        WHERE completed_at IS NULL
+          AND challenge_id IN (SELECT id FROM challenges WHERE ends_at IS NOT NULL AND ends_at <= CURRENT_TIMESTAMP)
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_quests_active', table_name='user_quests')
+    op.drop_index('ix_user_challenges_active', table_name='user_challenges')
+    op.drop_column('user_challenges', 'expired_at')
@@ -0,0 +1,53 @@
+"""Add per-course quest chains and store each user quest's position in its chain
+
+Revision ID: q2026101801_quest_chains
+Revises: p2026101801_active_challenge_indexes
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'q2026101801_quest_chains'
+down_revision: Union[str, None] = 'p2026101801_active_challenge_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Batch mode: SQLite cannot ALTER constraints, so the tables are recreated there
+    with op.batch_alter_table('quests') as batch_op:
+        batch_op.add_column(sa.Column('course_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('position', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_quests_course_id', 'courses', ['course_id'], ['id'])
+    with op.batch_alter_table('user_quests') as batch_op:
+        batch_op.add_column(sa.Column('course_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('chain_index', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_user_quests_course_id', 'courses', ['course_id'], ['id'])
+    op.create_index('ix_user_quests_user_chain', 'user_quests', ['user_id', 'course_id', 'chain_index'])
+
+    # Existing quests all belong to the default chain, in id order (the order
+    # assign_next_quest used to pick them in)
+    bind = op.get_bind()
+    quest_ids = [row[0] for row in bind.execute(sa.text("SELECT id FROM quests ORDER BY id"))]
+    if quest_ids:
+        bind.execute(
+            sa.text("UPDATE user_quests SET chain_index = :chain_index WHERE quest_id = :quest_id"),
+            [{"chain_index": index, "quest_id": quest_id} for index, quest_id in enumerate(quest_ids)],
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_quests_user_chain', table_name='user_quests')
+    with op.batch_alter_table('user_quests') as batch_op:
+        batch_op.drop_constraint('fk_user_quests_course_id', type_='foreignkey')
+        batch_op.drop_column('chain_index')
+        batch_op.drop_column('course_id')
+    with op.batch_alter_table('quests') as batch_op:
+        batch_op.drop_constraint('fk_quests_course_id', type_='foreignkey')
+        batch_op.drop_column('position')
+        batch_op.drop_column('course_id')
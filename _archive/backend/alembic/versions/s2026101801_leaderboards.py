@@ -0,0 +1,75 @@
+"""Add quiz_best_scores and xp_rank_buckets for the leaderboards
+
+Revision ID: s2026101801_leaderboards
+Revises: r2026101801_content_versions
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 's2026101801_leaderboards'
+down_revision: Union[str, None] = 'r2026101801_content_versions'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'quiz_best_scores',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('quiz_id', sa.String(length=50), nullable=False),
+        sa.Column('result_id', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_questions', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('achieved_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['result_id'], ['quiz_results.id']),
+        sa.PrimaryKeyConstraint('user_id', 'quiz_id')
+    )
+    op.create_index('ix_quiz_best_scores_rank', 'quiz_best_scores', ['score', 'achieved_at', 'result_id'])
+
+    op.create_table(
+        'xp_rank_buckets',
+        sa.Column('bucket', sa.Integer(), nullable=False),
+        sa.Column('users', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('bucket')
+    )
+    op.create_index('ix_users_xp_rank', 'users', ['xp', 'id'])
+
+    # Backfill, as `maintenance.py rebuild-leaderboards` did at this revision:
+    # each user's best result per quiz (earliest, then lowest id, on ties) and
+    # the number of users per 100-XP band
+    op.execute("""
+        INSERT INTO quiz_best_scores (user_id, quiz_id, result_id, score, total_questions, achieved_at)
+        SELECT user_id, quiz_id, result_id, score, total_questions, achieved_at
+        FROM (
+            SELECT user_id, quiz_id, id AS result_id,
+                   COALESCE(score, 0) AS score,
+                   COALESCE(total_questions, 0) AS total_questions,
+                   completed_at AS achieved_at,
+                   row_number() OVER (
+                       PARTITION BY user_id, quiz_id ORDER BY score DESC, completed_at, id
+                   ) AS position
+            FROM quiz_results
+        ) ranked
+        WHERE position = 1
+    """)
+    op.execute("""
+        INSERT INTO xp_rank_buckets (bucket, users)
+        SELECT COALESCE(xp, 0) / 100, COUNT(id)
+        FROM users
+        WHERE COALESCE(xp, 0) >= 100
+        GROUP BY COALESCE(xp, 0) / 100
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_xp_rank', table_name='users')
+    op.drop_table('xp_rank_buckets')
+    op.drop_index('ix_quiz_best_scores_rank', table_name='quiz_best_scores')
+    op.drop_table('quiz_best_scores')
@@ -0,0 +1,38 @@
+"""Make user_question_reviews unique per (user_id, question_id) for the SRS upsert
+
+Revision ID: t2026101801_unique_question_reviews
+Revises: s2026101801_leaderboards
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 't2026101801_unique_question_reviews'
+down_revision: Union[str, None] = 's2026101801_leaderboards'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Drop duplicate schedules, keeping the oldest row: the one the old
+    # per-question lookup (query.first()) kept updating
+    op.execute("""
+        DELETE FROM user_question_reviews
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM user_question_reviews GROUP BY user_id, question_id
+        )
+    """)
+    op.create_index(
+        'ix_user_question_reviews_user_question',
+        'user_question_reviews',
+        ['user_id', 'question_id'],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_question_reviews_user_question', table_name='user_question_reviews')
@@ -0,0 +1,51 @@
+"""Add quiz_tasks, the explicit quiz -> task links used by the quiz completion hook
+
+Revision ID: u2026101801_quiz_tasks
+Revises: t2026101801_unique_question_reviews
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'u2026101801_quiz_tasks'
+down_revision: Union[str, None] = 't2026101801_unique_question_reviews'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'quiz_tasks',
+        sa.Column('quiz_id', sa.String(length=50), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['task_id'], ['tasks.id']),
+        sa.PrimaryKeyConstraint('quiz_id'),
+    )
+    op.create_index('ix_quiz_tasks_task_id', 'quiz_tasks', ['task_id'])
+
+    # Link existing day-N quizzes the way the hook used to derive their task
+    # ("day-5-practice" -> "w1-d5")
+    bind = op.get_bind()
+    tasks = {task_id: pk for pk, task_id in bind.execute(sa.text("SELECT id, task_id FROM tasks"))}
+    links = []
+    for (quiz_id,) in bind.execute(sa.text("SELECT DISTINCT quiz_id FROM questions")):
+        match = re.match(r"^day-(\d+)(?:-|$)", quiz_id)
+        if not match or int(match.group(1)) < 1:
+            continue
+        day_num = int(match.group(1))
+        task_pk = tasks.get(f"w{(day_num - 1) // 7 + 1}-d{(day_num - 1) % 7 + 1}")
+        if task_pk is not None:
+            links.append({"quiz_id": quiz_id, "task_id": task_pk})
+    if links:
+        bind.execute(sa.text("INSERT INTO quiz_tasks (quiz_id, task_id) VALUES (:quiz_id, :task_id)"), links)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_quiz_tasks_task_id', table_name='quiz_tasks')
+    op.drop_table('quiz_tasks')
@@ -7,7 +7,9 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text
 
 from .database import engine, Base, get_db
-from .routers import weeks, tasks, reflections, progress, badges, rpg, achievements, quizzes, spaced_repetition
+from .routers import weeks, tasks, reflections, progress, badges, rpg, achievements, quizzes, spaced_repetition, search, leaderboard
+from .utils.code_runner import shutdown_sandbox_pool
+from .utils.search import ensure_search_index
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -25,6 +27,7 @@ async def lifespan(app: FastAPI):
     try:
         # Wrap in a short timeout or just try-except to prevent boot-looping
         Base.metadata.create_all(bind=engine)
+        ensure_search_index(engine)
         logger.info("[Lifespan] Database initialization sync complete.")
     except Exception as e:
         # FAIL SOFT: Log the error but allow the app to start
@@ -32,7 +35,8 @@ async def lifespan(app: FastAPI):
         logger.error(f"[Lifespan] Database table creation failed: {e}")
 
     yield
-    # Shutdown logic (if any) can go here
+    # Shutdown: stop the code runner's worker processes if they were started
+    shutdown_sandbox_pool()
 
 
 # Determine root path (essential for Vercel routing)
@@ -84,6 +88,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 # Include routers
@@ -96,6 +101,8 @@ app.include_router(rpg.router, prefix="/api/rpg", tags=["rpg"])
 app.include_router(achievements.router, prefix="/api/achievements", tags=["achievements"])
 app.include_router(quizzes.router, prefix="/api/quizzes", tags=["quizzes"])
 app.include_router(spaced_repetition.router, prefix="/api/srs", tags=["Spaced Repetition"])
+app.include_router(search.router, prefix="/api/search", tags=["search"])
+app.include_router(leaderboard.router, prefix="/api/leaderboard", tags=["leaderboard"])
 
 
 @app.get("/api")
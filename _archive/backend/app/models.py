@@ -1,11 +1,15 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index
+from sqlalchemy import Column, Integer, String, Text, Boolean, Date, DateTime, ForeignKey, Index, LargeBinary, text
 from sqlalchemy.orm import relationship
 from .database import Base
 
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # XP leaderboard pages and same-bucket rank counts (see utils/leaderboard.py)
+        Index('ix_users_xp_rank', 'xp', 'id'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String(50), unique=True, nullable=False)
@@ -93,8 +97,69 @@ class UserTaskStatus(Base):
     task = relationship("Task", back_populates="user_statuses")
 
 
+class UserWeekProgress(Base):
+    """Per-user, per-week completed task counter kept in step with UserTaskStatus."""
+    __tablename__ = "user_week_progress"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    week_id = Column(Integer, ForeignKey("weeks.id"), primary_key=True)
+    tasks_completed = Column(Integer, default=0, nullable=False)
+
+
+class UserStats(Base):
+    """Per-user totals behind /api/progress, kept in step by the write paths (see utils/user_stats.py)."""
+    __tablename__ = "user_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    tasks_completed = Column(Integer, default=0, nullable=False)
+    badges_earned = Column(Integer, default=0, nullable=False)
+    achievements_earned = Column(Integer, default=0, nullable=False)
+    quizzes_completed = Column(Integer, default=0, nullable=False)
+
+
+class UserDailyActivity(Base):
+    """Per-user, per-day activity rollup behind the calendar and heatmap (see utils/daily_activity.py)."""
+    __tablename__ = "user_daily_activity"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    tasks = Column(Integer, default=0, nullable=False)  # Tasks completed
+    quiz_xp = Column(Integer, default=0, nullable=False)  # XP from quiz submissions
+    reviews = Column(Integer, default=0, nullable=False)  # SRS reviews submitted
+    xp = Column(Integer, default=0, nullable=False)  # XP from tasks, quizzes and reviews
+
+
+class UserActivityBitmap(Base):
+    """One bit per active day since ``origin`` (see utils/activity.py)."""
+    __tablename__ = "user_activity_bitmaps"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    origin = Column(Date, nullable=True)  # Day represented by bit 0
+    bits = Column(LargeBinary, nullable=False, default=b"")
+
+
+class RewardLedgerEntry(Base):
+    """Append-only XP/gold delta keyed by the event that caused it (see utils/ledger.py)."""
+    __tablename__ = "reward_ledger"
+    __table_args__ = (
+        Index('ix_reward_ledger_user_event', 'user_id', 'event_key'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    event_key = Column(String(100), nullable=False)  # e.g., "task:12", "badge:b-week-1"
+    source = Column(String(30), nullable=False)  # e.g., "task", "quiz", "undo"
+    xp_delta = Column(Integer, default=0, nullable=False)
+    gold_delta = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
 class Reflection(Base):
     __tablename__ = "reflections"
+    __table_args__ = (
+        # Keyset pagination of a user's reflections, newest first
+        Index('ix_reflections_user_created', 'user_id', 'created_at', 'id'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -168,6 +233,8 @@ class Quest(Base):
     boss_hp = Column(Integer, default=100)
     reward_xp_bonus = Column(Integer, default=0)
     reward_badge_id = Column(String(50), nullable=True)
+    course_id = Column(Integer, ForeignKey("courses.id"), nullable=True)  # Quest chain; NULL = default chain
+    position = Column(Integer, nullable=True)  # Order within the chain (NULLs last, then by id)
 
     quest_tasks = relationship("QuestTask", back_populates="quest")
     user_quests = relationship("UserQuest", back_populates="quest")
@@ -186,10 +253,21 @@ class QuestTask(Base):
 
 class UserQuest(Base):
     __tablename__ = "user_quests"
+    __table_args__ = (
+        # Active-quest lookups only ever touch the user's unfinished row
+        Index(
+            'ix_user_quests_active', 'user_id',
+            postgresql_where=text('completed_at IS NULL'),
+            sqlite_where=text('completed_at IS NULL'),
+        ),
+        Index('ix_user_quests_user_chain', 'user_id', 'course_id', 'chain_index'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     quest_id = Column(Integer, ForeignKey("quests.id"), nullable=False)
+    course_id = Column(Integer, ForeignKey("courses.id"), nullable=True)  # Chain the quest was assigned from
+    chain_index = Column(Integer, nullable=True)  # Position of quest_id in that chain (see utils/quest_manager.py)
     boss_hp_remaining = Column(Integer, default=0)
     started_at = Column(DateTime, default=datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)
@@ -214,12 +292,21 @@ class Challenge(Base):
 
 class UserChallenge(Base):
     __tablename__ = "user_challenges"
+    __table_args__ = (
+        # Partial index: completion cost stays flat however long the challenge history grows
+        Index(
+            'ix_user_challenges_active', 'user_id',
+            postgresql_where=text('completed_at IS NULL AND expired_at IS NULL'),
+            sqlite_where=text('completed_at IS NULL AND expired_at IS NULL'),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     challenge_id = Column(Integer, ForeignKey("challenges.id"), nullable=False)
     progress = Column(Integer, default=0)
     completed_at = Column(DateTime, nullable=True)
+    expired_at = Column(DateTime, nullable=True)  # Closed unfinished after Challenge.ends_at
 
     user = relationship("User", back_populates="challenges")
     challenge = relationship("Challenge", back_populates="user_challenges")
@@ -251,6 +338,30 @@ class QuizResult(Base):
 
 
 
+class QuizBestScore(Base):
+    """Each user's best result per quiz, behind the quiz leaderboard (see utils/leaderboard.py)."""
+    __tablename__ = "quiz_best_scores"
+    __table_args__ = (
+        # Keyset pagination of the leaderboard: score DESC, achieved_at DESC, result_id DESC
+        Index('ix_quiz_best_scores_rank', 'score', 'achieved_at', 'result_id'),
+    )
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    quiz_id = Column(String(50), primary_key=True)
+    result_id = Column(Integer, ForeignKey("quiz_results.id"), nullable=False)  # Attempt that set the best score
+    score = Column(Integer, default=0, nullable=False)
+    total_questions = Column(Integer, default=0, nullable=False)
+    achieved_at = Column(DateTime, nullable=False)
+
+
+class XpRankBucket(Base):
+    """Number of users per XP band, so rank lookups skip counting everyone above (see utils/leaderboard.py)."""
+    __tablename__ = "xp_rank_buckets"
+
+    bucket = Column(Integer, primary_key=True)  # users.xp // RANK_BUCKET_XP, only bands >= 1 are stored
+    users = Column(Integer, default=0, nullable=False)
+
+
 class Question(Base):
     __tablename__ = "questions"
 
@@ -272,12 +383,31 @@ class Question(Base):
     reviews = relationship("UserQuestionReview", back_populates="question")
 
 
+class QuizTask(Base):
+    """Task a quiz completes when passed; several quizzes may complete the same task."""
+    __tablename__ = "quiz_tasks"
+
+    quiz_id = Column(String(50), primary_key=True)  # e.g., "day-1-practice"
+    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False, index=True)
+
+
+class ContentVersion(Base):
+    """Version stamp per kind of seeded content, bumped by every commit that changes it (see utils/cache_events.py)."""
+    __tablename__ = "content_versions"
+
+    name = Column(String(50), primary_key=True)  # e.g. "questions"
+    version = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
 class UserQuestionReview(Base):
     """Tracks spaced repetition state for each question per user."""
     __tablename__ = "user_question_reviews"
 
     __table_args__ = (
         Index('ix_user_question_reviews_user_due', 'user_id', 'due_date'),
+        # One schedule per question per user; target of the failed-question upsert
+        Index('ix_user_question_reviews_user_question', 'user_id', 'question_id', unique=True),
     )
 
     id = Column(Integer, primary_key=True, index=True)
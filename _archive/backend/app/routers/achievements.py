@@ -1,35 +1,50 @@
 from typing import List
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from ..database import get_db
-from ..models import Achievement, UserAchievement, User
+from ..models import UserAchievement, User
 from ..schemas import AchievementResponse
 from ..auth import get_current_user
+from ..utils.catalog import get_catalog
+from ..utils.http_cache import make_etag, not_modified
 
 router = APIRouter()
 
 
 @router.get("", response_model=List[AchievementResponse])
-def get_all_achievements(user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    """Get all achievements with unlock status for the authenticated user."""
-    achievements = db.query(Achievement).all()
-    result = []
-    for ach in achievements:
-        unlocked = (
-            db.query(UserAchievement)
-            .filter(UserAchievement.user_id == user.id, UserAchievement.achievement_id == ach.id)
-            .first()
-        )
-        result.append({
+def get_all_achievements(
+    request: Request,
+    response: Response,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get all achievements with unlock status for the authenticated user (ETag-aware, see badges)."""
+    catalog = get_catalog(db)
+    earned_count, last_earned = db.query(
+        func.count(UserAchievement.id), func.max(UserAchievement.earned_at)
+    ).filter(UserAchievement.user_id == user.id).one()
+
+    etag = make_etag("achievements", catalog.version, user.id, earned_count, last_earned)
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+
+    earned = dict(
+        db.query(UserAchievement.achievement_id, UserAchievement.earned_at)
+        .filter(UserAchievement.user_id == user.id)
+    )
+    return [
+        {
             "id": ach.id,
-            "achievement_id": ach.achievement_id,
+            "achievement_id": ach.code,
             "name": ach.name,
             "description": ach.description,
             "xp_value": ach.xp_value,
             "difficulty": ach.difficulty,
-            "unlocked": unlocked is not None,
-            "earned_at": unlocked.earned_at if unlocked else None,
-        })
-    return result
-
+            "unlocked": ach.id in earned,
+            "earned_at": earned.get(ach.id),
+        }
+        for ach in sorted(catalog.achievements.values(), key=lambda entry: entry.id)
+    ]
@@ -1,38 +1,56 @@
 from typing import List
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from ..database import get_db
-from ..models import Badge, UserBadge, User
+from ..models import UserBadge, User
 from ..schemas import BadgeResponse
 from ..auth import get_current_user
+from ..utils.catalog import get_catalog
+from ..utils.http_cache import make_etag, not_modified
 
 router = APIRouter()
 
 
 @router.get("", response_model=List[BadgeResponse])
-def get_all_badges(user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    """Get all badges with unlock status for the authenticated user."""
-    badges = db.query(Badge).all()
-
-    result = []
-    for badge in badges:
-        user_badge = db.query(UserBadge).filter(
-            UserBadge.badge_id == badge.id,
-            UserBadge.user_id == user.id
-        ).first()
-
-        result.append({
+def get_all_badges(
+    request: Request,
+    response: Response,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Get all badges with unlock status for the authenticated user.
+
+    Served from the cached catalog plus one fetch of the user's earned rows.
+    The ETag combines the catalog version with the user's earned count and
+    latest earned_at, so an unchanged collection returns 304 after a single
+    aggregate query.
+    """
+    catalog = get_catalog(db)
+    earned_count, last_earned = db.query(
+        func.count(UserBadge.id), func.max(UserBadge.earned_at)
+    ).filter(UserBadge.user_id == user.id).one()
+
+    etag = make_etag("badges", catalog.version, user.id, earned_count, last_earned)
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+
+    earned = dict(
+        db.query(UserBadge.badge_id, UserBadge.earned_at).filter(UserBadge.user_id == user.id)
+    )
+    return [
+        {
             "id": badge.id,
-            "badge_id": badge.badge_id,
+            "badge_id": badge.code,
             "name": badge.name,
             "description": badge.description,
             "xp_value": badge.xp_value,
             "difficulty": badge.difficulty,
-            "unlocked": user_badge is not None,
-            "earned_at": user_badge.earned_at if user_badge else None
-        })
-
-    return result
-
-
+            "unlocked": badge.id in earned,
+            "earned_at": earned.get(badge.id)
+        }
+        for badge in sorted(catalog.badges.values(), key=lambda entry: entry.id)
+    ]
@@ -0,0 +1,54 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from ..database import get_db
+from ..models import User
+from ..auth import get_current_user
+from ..utils.gamification import levels_from_xp
+from ..utils.leaderboard import xp_rank
+from ..utils.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+router = APIRouter()
+
+MAX_PAGE_SIZE = 100
+
+
+@router.get("/xp")
+def get_xp_leaderboard(
+    response: Response,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Users ordered by total XP, highest first (ties newest account first).
+
+    Keyset-paginated on (xp, id) through ix_users_xp_rank: when more rows
+    exist, the X-Next-Cursor response header holds the cursor for the next page.
+    """
+    query = db.query(User.id, User.username, User.xp).filter(User.xp.isnot(None))
+    if cursor:
+        cursor_xp, user_id = decode_cursor(cursor, 2)
+        if not isinstance(cursor_xp, int) or not isinstance(user_id, int):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(or_(User.xp < cursor_xp, and_(User.xp == cursor_xp, User.id < user_id)))
+
+    rows = query.order_by(User.xp.desc(), User.id.desc()).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].xp, rows[-1].id)
+
+    levels = levels_from_xp(row.xp for row in rows)
+    return [
+        {"user_id": row.id, "username": row.username, "xp": row.xp, "level": level}
+        for row, level in zip(rows, levels)
+    ]
+
+
+@router.get("/xp/me")
+def get_my_xp_rank(user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    """The authenticated user's XP and rank (1 = most XP, ties share a rank)."""
+    xp, rank = xp_rank(db, user.id)
+    return {"user_id": user.id, "xp": xp, "rank": rank}
@@ -1,13 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 
 from ..database import get_db
-from ..models import User, Task, UserTaskStatus, Badge, UserBadge, Achievement, UserAchievement
+from ..models import User
 from ..schemas import ProgressResponse
 from ..auth import get_current_user
-from ..utils.gamification import level_from_xp, xp_for_next_level
+from ..utils.gamification import level_from_xp, xp_for_next_level, cumulative_xp_to_level, resolve_vitals
+from ..utils.activity import load_activity
+from ..utils.catalog import get_catalog
+from ..utils.curriculum import get_curriculum
+from ..utils.daily_activity import DAILY_METRICS, daily_activity
+from ..utils.user_stats import get_user_stats
 
 
 router = APIRouter()
@@ -17,40 +22,25 @@ router = APIRouter()
 
 @router.get("", response_model=ProgressResponse)
 def get_progress(user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    """Get overall progress statistics for the authenticated user."""
-    # Count tasks
-    tasks_total = db.query(Task).count()
-    tasks_completed = db.query(UserTaskStatus).filter(
-        UserTaskStatus.user_id == user.id,
-        UserTaskStatus.completed
-    ).count()
+    """
+    Get overall progress statistics for the authenticated user.
+
+    Per-user totals come from the user's user_stats row and catalog totals
+    from the curriculum and reward catalog caches (one stamp read each).
+    """
+    stats = get_user_stats(db, user.id)
+    catalog = get_catalog(db)
+    tasks_total = get_curriculum(db).total_tasks
+    tasks_completed = stats.tasks_completed
 
     # Calculate completion percentage
     completion_percentage = (tasks_completed / tasks_total * 100) if tasks_total > 0 else 0.0
 
-    # Count badges
-    badges_total = db.query(Badge).count()
-    badges_earned = db.query(UserBadge).filter(
-        UserBadge.user_id == user.id
-    ).count()
-    achievements_total = db.query(Achievement).count()
-    achievements_earned = db.query(UserAchievement).filter(
-        UserAchievement.user_id == user.id
-    ).count()
-
 
     current_level = level_from_xp(user.xp)
     xp_required = xp_for_next_level(current_level)
 
     # Calculate XP at the start of current level (to normalize progress bar)
-    def cumulative_xp_to_level(lvl):
-        if lvl <= 1:
-            return 0
-        total = 0
-        for i in range(1, lvl):
-            total += xp_for_next_level(i)
-        return total
-
     xp_start_of_level = cumulative_xp_to_level(current_level)
     xp_into_level = max(0, user.xp - xp_start_of_level)
     xp_needed_for_level = xp_required # This is XP needed to complete *this* level
@@ -65,89 +55,101 @@ def get_progress(user: User = Depends(get_current_user), db: Session = Depends(g
     return {
         "total_xp": user.xp,
         "level": current_level,
-        "streak": user.streak,
+        "streak": resolve_vitals(user).streak,
         "current_week": user.current_week,
         "tasks_completed": tasks_completed,
         "tasks_total": tasks_total,
         "completion_percentage": round(completion_percentage, 1),
-        "badges_earned": badges_earned,
-        "badges_total": badges_total,
-        "achievements_earned": achievements_earned,
-        "achievements_total": achievements_total,
+        "badges_earned": stats.badges_earned,
+        "badges_total": len(catalog.badges),
+        "achievements_earned": stats.achievements_earned,
+        "achievements_total": len(catalog.achievements),
+        "quizzes_completed": stats.quizzes_completed,
         "xp_to_next_level": int(xp_remaining),
         "level_progress": round(progress_percent, 1),
     }
 
 
 @router.get("/calendar")
-def get_calendar_data(user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    """Get task completion dates for calendar visualization."""
+def get_calendar_data(
+    compact: bool = False,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Get task completion dates for calendar visualization.
+
+    Streak days come from the user's activity bitmap. With ``compact=true``
+    active days are returned as run-length encoded ``[first_day, length]``
+    pairs instead of per-day task counts, which needs no per-row query.
+    """
     try:
-        # Get all completed tasks with their completion dates
         # Limit to last 2 years for performance
         two_years_ago = date.today() - timedelta(days=730)
+        bitmap = load_activity(db, user.id)
 
-        completed_tasks = db.query(
-            func.date(UserTaskStatus.completed_at).label('completion_date'),
-            func.count(UserTaskStatus.id).label('task_count')
-        ).filter(
-            UserTaskStatus.user_id == user.id,
-            UserTaskStatus.completed,
-            UserTaskStatus.completed_at.isnot(None),
-            func.date(UserTaskStatus.completed_at) >= two_years_ago
-        ).group_by(
-            func.date(UserTaskStatus.completed_at)
-        ).all()
-
-        # Convert to dictionary: date_string -> task_count
-        calendar_data = {}
-        for row in completed_tasks:
-            try:
-                if isinstance(row.completion_date, date):
-                    date_str = row.completion_date.isoformat()
-                else:
-                    date_str = str(row.completion_date)
-                calendar_data[date_str] = row.task_count
-            except (ValueError, AttributeError):
-                # Skip invalid dates
-                continue
-
-        last_checkin = user.last_checkin_at.date() if user.last_checkin_at else None
-
-        # Calculate streak days: find most recent completion and go backwards
-        streak_days = []
+        # Streak days: the run of active days ending on the most recent one
         MAX_STREAK_DAYS = 365
+        last_active = bitmap.last_active_day()
+        streak_length = min(bitmap.current_run(), MAX_STREAK_DAYS)
+        streak_days = [
+            (last_active - timedelta(days=offset)).isoformat()
+            for offset in range(streak_length - 1, -1, -1)
+        ]
 
-        if calendar_data:
-            # Find the most recent date with tasks completed
-            sorted_dates = sorted([d for d in calendar_data.keys()], reverse=True)
-            if sorted_dates:
-                try:
-                    most_recent = date.fromisoformat(sorted_dates[0])
-                    current_date = most_recent
-                    days_checked = 0
-
-                    # Go backwards finding consecutive days with tasks
-                    while (days_checked < MAX_STREAK_DAYS and
-                           len(streak_days) < MAX_STREAK_DAYS and
-                           current_date >= (most_recent - timedelta(days=MAX_STREAK_DAYS))):
-                        date_str = current_date.isoformat()
-                        if date_str in calendar_data:
-                            streak_days.insert(0, date_str)
-                            current_date -= timedelta(days=1)
-                            days_checked += 1
-                        else:
-                            # Gap found, streak ends
-                            break
-                except ValueError:
-                    # Invalid date format, skip streak calculation
-                    pass
-
-        return {
-            "completion_dates": calendar_data,
+        last_checkin = user.last_checkin_at.date() if user.last_checkin_at else None
+        payload = {
             "streak_days": streak_days,
             "last_checkin": last_checkin.isoformat() if last_checkin else None,
-            "current_streak": user.streak,
+            "current_streak": resolve_vitals(user).streak,
+            "best_streak": max(user.best_streak or 0, bitmap.longest_run()),
         }
+
+        if compact:
+            payload["active_runs"] = [
+                [first_day.isoformat(), length]
+                for first_day, length in bitmap.runs(since=two_years_ago)
+            ]
+            return payload
+
+        # Per-day task counts: date_string -> task_count, from the daily rollup
+        payload["completion_dates"] = {
+            day.isoformat(): count
+            for day, count in daily_activity(db, user.id, "tasks", two_years_ago).items()
+        }
+        return payload
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching calendar data: {str(e)}")
+
+
+@router.get("/heatmap")
+def get_activity_heatmap(
+    metric: str = "tasks",
+    year: Optional[int] = Query(None, ge=2000, le=2100),
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Per-day activity for a year heatmap, read from the daily activity rollup.
+
+    ``metric`` is one of tasks, quiz_xp, reviews or xp. Without ``year`` the
+    window is the 365 days ending today (UTC). Days without activity are omitted.
+    """
+    if metric not in DAILY_METRICS:
+        raise HTTPException(status_code=400, detail=f"metric must be one of: {', '.join(DAILY_METRICS)}")
+
+    if year is not None:
+        start, end = date(year, 1, 1), date(year, 12, 31)
+    else:
+        end = datetime.utcnow().date()
+        start = end - timedelta(days=364)
+
+    days = daily_activity(db, user.id, metric, start, end)
+    return {
+        "metric": metric,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "days": {day.isoformat(): value for day, value in days.items()},
+        "total": sum(days.values()),
+        "max": max(days.values(), default=0),
+    }
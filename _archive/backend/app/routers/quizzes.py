@@ -1,19 +1,43 @@
-import json
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import and_, func, or_
 
 from ..database import get_db
-from ..models import QuizResult, User, Question, Achievement, UserAchievement, UserQuestionReview
-from ..schemas import QuizSubmission, QuestionResponse, QuestionPublicResponse, AnswerSubmission, AnswerVerifyResponse
+from ..models import QuizBestScore, QuizResult, Task, User, Question, UserAchievement
+from ..schemas import (
+    QuizSubmission,
+    QuestionResponse,
+    QuestionPublicResponse,
+    AnswerSubmission,
+    AnswerBatchSubmission,
+    AnswerVerifyResponse,
+)
 from ..auth import get_current_user
 from ..routers.spaced_repetition import SRS_INTERVALS
+from ..routers.tasks import _complete_loaded_task
+from ..utils.catalog import get_catalog
+from ..utils.code_runner import SandboxError, get_sandbox_pool
+from ..utils.curriculum import get_curriculum
+from ..utils.daily_activity import record_daily_activity
+from ..utils.gamification import QUIZ_BASE_XP
+from ..utils.http_cache import make_etag, not_modified
+from ..utils.leaderboard import record_best_score
+from ..utils.ledger import achievement_event, credit
+from ..utils.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, parse_cursor_datetime
+from ..utils.question_cache import get_quiz_payload
+from ..utils.rate_limit import RateLimiter, enforce
+from ..utils.review_queue import queue_reviews
+from ..utils.user_stats import adjust_user_stats
 from datetime import datetime, timedelta
 
 router = APIRouter()
 
+# Answer checks reveal correct answers, so every verify endpoint spends from one
+# per-user budget, charged per answer: batching saves round trips, not checks.
+verify_limiter = RateLimiter(rate=1.0, burst=50)
+
 
 @router.get("/completed")
 def get_completed_quizzes(user: User = Depends(get_current_user), db: Session = Depends(get_db)):
@@ -25,59 +49,75 @@ def get_completed_quizzes(user: User = Depends(get_current_user), db: Session =
 
 
 @router.get("/leaderboard")
-def get_quiz_leaderboard(limit: int = 20, offset: int = 0, db: Session = Depends(get_db)):
-    """Get top quiz scores for the leaderboard."""
-    results = db.query(QuizResult).order_by(
-        QuizResult.score.desc(),
-        QuizResult.completed_at.desc()
-    ).offset(offset).limit(limit).all()
+def get_quiz_leaderboard(
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Get top quiz scores for the leaderboard: each user's best attempt per quiz.
+
+    Keyset-paginated on (score, achieved_at, result_id), all descending:
+    when more rows exist, the X-Next-Cursor response header holds the cursor
+    for the next page.
+    """
+    query = db.query(QuizBestScore)
+    if cursor:
+        score, achieved_at, result_id = decode_cursor(cursor, 3)
+        achieved_at = parse_cursor_datetime(achieved_at)
+        if not isinstance(score, int) or not isinstance(result_id, int):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(or_(
+            QuizBestScore.score < score,
+            and_(QuizBestScore.score == score, or_(
+                QuizBestScore.achieved_at < achieved_at,
+                and_(QuizBestScore.achieved_at == achieved_at, QuizBestScore.result_id < result_id),
+            )),
+        ))
+
+    results = query.order_by(
+        QuizBestScore.score.desc(),
+        QuizBestScore.achieved_at.desc(),
+        QuizBestScore.result_id.desc()
+    ).limit(limit + 1).all()
+    if len(results) > limit:
+        results = results[:limit]
+        last = results[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.score, last.achieved_at, last.result_id)
 
     return [
         {
-            "id": r.id,
+            "id": r.result_id,
+            "user_id": r.user_id,
             "quiz_id": r.quiz_id,
             "score": r.score,
             "total_questions": r.total_questions,
             "score_breakdown": f"{r.score}/{r.total_questions}",
             "percentage": round((r.score / r.total_questions) * 100, 1) if r.total_questions > 0 else 0,
-            "completed_at": r.completed_at.isoformat() if r.completed_at else None
+            "completed_at": r.achieved_at.isoformat() if r.achieved_at else None
         }
         for r in results
     ]
 
 
 @router.get("/{quiz_id}/questions", response_model=List[QuestionPublicResponse])
-def get_quiz_questions(quiz_id: str, user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    """Get questions for a specific quiz (without correct answers or explanations)."""
-    questions = db.query(Question).filter(Question.quiz_id == quiz_id).all()
-
-    # Parse options/test_cases JSON strings to lists
-    response = []
-    for q in questions:
-        try:
-            options_list = json.loads(q.options) if q.options else []
-        except (json.JSONDecodeError, TypeError):
-            options_list = []
-
-        try:
-            test_cases_list = json.loads(q.test_cases) if q.test_cases else None
-        except (json.JSONDecodeError, TypeError):
-            test_cases_list = None
-
-        response.append(QuestionPublicResponse(
-            id=q.id,
-            quiz_id=q.quiz_id,
-            question_type=q.question_type or "mcq",
-            text=q.text,
-            code=q.code,  # For code-correction questions
-            options=options_list,
-            starter_code=q.starter_code,
-            test_cases=test_cases_list,
-            difficulty=q.difficulty,
-            topic_tag=q.topic_tag
-        ))
-
-    return response
+def get_quiz_questions(
+    quiz_id: str,
+    request: Request,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Get questions for a specific quiz (without correct answers or explanations).
+
+    Served as the pre-serialized body from the question cache; the ETag is the
+    payload's content hash, so unchanged quizzes revalidate with 304.
+    """
+    payload = get_quiz_payload(db, quiz_id)
+    response = Response(content=payload.body, media_type="application/json")
+    cached = not_modified(request, response, make_etag("quiz-questions", quiz_id, payload.version))
+    return cached or response
 
 
 # M2 Fix: Pydantic model for complete_quiz request
@@ -113,28 +153,59 @@ def complete_quiz(quiz_id: str, request: QuizCompleteRequest = None, user: User
         completed_at=datetime.utcnow()
     )
     db.add(result)
+    adjust_user_stats(db, user.id, quizzes_completed=1)
+    db.flush()
+    record_best_score(db, result)
     db.commit()
     
     return {"status": "completed", "quiz_id": quiz_id, "score": score}
 
 
 # H2 Fix: Extracted shared verification logic to eliminate duplication
-def _verify_answer_logic(question: Question, answer) -> tuple[bool, int, str]:
-    """Shared verification logic. Returns (is_correct, correct_index, explanation)."""
+def _verify_answer_logic(question: Question, answer) -> tuple[bool, int, str, Optional[list]]:
+    """
+    Shared verification logic.
+    Returns (is_correct, correct_index, explanation, test_results); test_results
+    is only set for coding answers run by the server-side code runner.
+    """
     question_type = question.question_type or 'mcq'
     is_correct = False
+    test_results = None
     
     if question_type in ('mcq', 'code-correction'):
         is_correct = isinstance(answer, int) and question.correct_index == answer
     elif question_type == 'coding':
-        is_correct = isinstance(answer, dict) and answer.get('allPassed', False)
+        is_correct, test_results = _check_coding_answer(question, answer)
     
-    return is_correct, question.correct_index, question.explanation
+    return is_correct, question.correct_index, question.explanation, test_results
+
+
+def _check_coding_answer(question: Question, answer) -> tuple[bool, Optional[list]]:
+    """
+    Run the submitted code (``answer["code"]``) against the question's test
+    cases when the code runner is enabled; otherwise fall back to the client's
+    ``allPassed`` flag. With the runner enabled, a question without test
+    cases cannot be verified and is never answered correctly.
+    """
+    if not isinstance(answer, dict):
+        return False, None
+    try:
+        pool = get_sandbox_pool()
+        if pool is None:
+            return bool(answer.get('allPassed', False)), None
+        code = answer.get('code')
+        if not question.test_cases or not isinstance(code, str):
+            return False, None
+        run = pool.run(code, question.test_cases)
+    except SandboxError as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "1"})
+    return run.all_passed, [result.to_dict() for result in run.results]
 
 
 @router.post("/{quiz_id}/verify", response_model=AnswerVerifyResponse)
 def verify_answer_with_quiz(quiz_id: str, submission: AnswerSubmission, user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Verify a single answer (deprecated - use /verify instead)."""
+    enforce(verify_limiter, user.id)
     question = db.query(Question).filter(
         Question.quiz_id == quiz_id,
         Question.id == submission.question_id
@@ -143,41 +214,85 @@ def verify_answer_with_quiz(quiz_id: str, submission: AnswerSubmission, user: Us
     if not question:
         raise HTTPException(status_code=404, detail="Question not found")
     
-    is_correct, correct_index, explanation = _verify_answer_logic(question, submission.answer)
+    is_correct, correct_index, explanation, test_results = _verify_answer_logic(question, submission.answer)
     
     return AnswerVerifyResponse(
         question_id=question.id,
         is_correct=is_correct,
         correct_index=correct_index,
-        explanation=explanation
+        explanation=explanation,
+        test_results=test_results
     )
 
 
 @router.post("/verify", response_model=AnswerVerifyResponse)
 def verify_answer(submission: AnswerSubmission, user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Verify a single answer by question ID only."""
+    enforce(verify_limiter, user.id)
     question = db.query(Question).filter(Question.id == submission.question_id).first()
     
     if not question:
         raise HTTPException(status_code=404, detail="Question not found")
     
-    is_correct, correct_index, explanation = _verify_answer_logic(question, submission.answer)
+    is_correct, correct_index, explanation, test_results = _verify_answer_logic(question, submission.answer)
     
     return AnswerVerifyResponse(
         question_id=question.id,
         is_correct=is_correct,
         correct_index=correct_index,
-        explanation=explanation
+        explanation=explanation,
+        test_results=test_results
     )
 
 
+@router.post("/verify-batch", response_model=List[AnswerVerifyResponse])
+def verify_answers(batch: AnswerBatchSubmission, user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    """
+    Verify several answers in one round trip, answered in request order.
+
+    The questions are read with one IN query. Each answer costs the same as
+    a call to /verify against the shared per-user limit; 404 if any question
+    does not exist.
+    """
+    enforce(verify_limiter, user.id, cost=len(batch.answers))
+
+    question_ids = {submission.question_id for submission in batch.answers}
+    questions = {
+        row.id: row
+        for row in db.query(
+            Question.id, Question.question_type, Question.correct_index, Question.explanation,
+            Question.test_cases
+        ).filter(Question.id.in_(question_ids))
+    }
+    missing = question_ids - questions.keys()
+    if missing:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Questions not found: {', '.join(str(q) for q in sorted(missing))}"
+        )
+
+    results = []
+    for submission in batch.answers:
+        is_correct, correct_index, explanation, test_results = _verify_answer_logic(
+            questions[submission.question_id], submission.answer
+        )
+        results.append(AnswerVerifyResponse(
+            question_id=submission.question_id,
+            is_correct=is_correct,
+            correct_index=correct_index,
+            explanation=explanation,
+            test_results=test_results
+        ))
+    return results
+
+
 def award_achievement_for_quiz(db: Session, user_id: int, achievement_id: str) -> tuple[bool, int]:
     """Award an achievement if not already earned. Returns (awarded, xp_value)."""
-    achievement = db.query(Achievement).filter(Achievement.achievement_id == achievement_id).first()
+    achievement = get_catalog(db).achievements.get(achievement_id)
     if not achievement:
         return False, 0
 
-    existing = db.query(UserAchievement).filter(
+    existing = db.query(UserAchievement.id).filter(
         UserAchievement.user_id == user_id,
         UserAchievement.achievement_id == achievement.id
     ).first()
@@ -186,6 +301,7 @@ def award_achievement_for_quiz(db: Session, user_id: int, achievement_id: str) -
         return False, 0
 
     db.add(UserAchievement(user_id=user_id, achievement_id=achievement.id))
+    adjust_user_stats(db, user_id, achievements_earned=1)
     return True, achievement.xp_value
 
 
@@ -215,8 +331,10 @@ def submit_quiz(submission: QuizSubmission, user: User = Depends(get_current_use
 
     score = 0
     total_questions = len(questions)
+    failed_question_ids = []
+    answered = set()
 
-    # Calculate score server-side - handle both MCQ and coding questions
+    # Calculate score server-side in one pass - handles both MCQ and coding questions
     for q_id_str, answer in submission.answers.items():
         try:
             q_id = int(q_id_str)
@@ -224,20 +342,15 @@ def submit_quiz(submission: QuizSubmission, user: User = Depends(get_current_use
             continue
 
         question = questions_map.get(q_id)
-        if not question:
+        if not question or q_id in answered:  # "1" and "01" name the same question
             continue
+        answered.add(q_id)
 
-        # Trust the model default; column is now guaranteed
-        question_type = question.question_type or 'mcq'
-
-        if question_type in ('mcq', 'code-correction'):
-            # MCQ/Code-correction: answer is the selected index (int)
-            if isinstance(answer, int) and question.correct_index == answer:
-                score += 1
-        elif question_type == 'coding':
-            # Coding: answer is dict with allPassed flag
-            if isinstance(answer, dict) and answer.get('allPassed', False):
-                score += 1
+        is_correct, _, _, _ = _verify_answer_logic(question, answer)
+        if is_correct:
+            score += 1
+        else:
+            failed_question_ids.append(q_id)
 
     # Save result
     result = QuizResult(
@@ -247,59 +360,17 @@ def submit_quiz(submission: QuizSubmission, user: User = Depends(get_current_use
         total_questions=total_questions
     )
     db.add(result)
+    adjust_user_stats(db, user.id, quizzes_completed=1)
 
-    # --- SRS Auto-Queueing: Add incorrectly answered questions to review queue ---
-    failed_question_ids = []
-    for q_id_str, answer in submission.answers.items():
-        try:
-            q_id = int(q_id_str)
-        except ValueError:
-            continue
-
-        question = questions_map.get(q_id)
-        if not question:
-            continue
+    # SRS Auto-Queueing: (re)start incorrectly answered questions in one upsert
+    queue_reviews(db, user.id, failed_question_ids, datetime.utcnow() + timedelta(days=SRS_INTERVALS[0]))
 
-        question_type = question.question_type or 'mcq'
-        was_correct = False
-
-        if question_type in ('mcq', 'code-correction'):
-            was_correct = isinstance(answer, int) and question.correct_index == answer
-        elif question_type == 'coding':
-            was_correct = isinstance(answer, dict) and answer.get('allPassed', False)
-
-        if not was_correct:
-            failed_question_ids.append(q_id)
-
-    # Queue failed questions for SRS review
-    for q_id in failed_question_ids:
-        existing_review = db.query(UserQuestionReview).filter(
-            UserQuestionReview.user_id == user.id,
-            UserQuestionReview.question_id == q_id
-        ).first()
-
-        if existing_review:
-            # Reset interval for re-failed question
-            existing_review.interval_index = 0
-            existing_review.success_count = 0
-            existing_review.due_date = datetime.utcnow() + timedelta(days=SRS_INTERVALS[0])
-            existing_review.is_mastered = False
-        else:
-            # Create new review entry
-            new_review = UserQuestionReview(
-                user_id=user.id,
-                question_id=q_id,
-                interval_index=0,
-                due_date=datetime.utcnow() + timedelta(days=SRS_INTERVALS[0]),
-                success_count=0,
-                is_mastered=False
-            )
-            db.add(new_review)
-    # --- End SRS Auto-Queueing ---
-
-    # Award XP (e.g., 10 XP base + score)
-    xp_gained = 10 + score
-    user.xp += xp_gained
+    # Award XP (base + score)
+    xp_gained = QUIZ_BASE_XP + score
+    db.flush()  # Assigns result.id for the ledger event key
+    record_best_score(db, result)
+    quiz_xp, _ = credit(db, user, f"quiz-result:{result.id}", "quiz", xp=xp_gained)
+    record_daily_activity(db, user.id, datetime.utcnow().date(), quiz_xp=quiz_xp, xp=quiz_xp)
 
     # Check for quiz achievements
     achievements_unlocked = []
@@ -310,7 +381,7 @@ def submit_quiz(submission: QuizSubmission, user: User = Depends(get_current_use
         if awarded:
             achievements_unlocked.append("a-quiz-master")
             xp_gained += ach_xp
-            user.xp += ach_xp
+            credit(db, user, achievement_event("a-quiz-master"), "achievement", xp=ach_xp)
 
     # Quiz count achievements
     quiz_count = db.query(func.count(QuizResult.id)).filter(
@@ -322,7 +393,7 @@ def submit_quiz(submission: QuizSubmission, user: User = Depends(get_current_use
         if awarded:
             achievements_unlocked.append("a-quiz-streak")
             xp_gained += ach_xp
-            user.xp += ach_xp
+            credit(db, user, achievement_event("a-quiz-streak"), "achievement", xp=ach_xp)
 
     # --- Phase 2: Quiz → Task Completion Hook ---
     # If user passes quiz (≥70%), mark the corresponding task as complete
@@ -332,23 +403,13 @@ def submit_quiz(submission: QuizSubmission, user: User = Depends(get_current_use
     passing_threshold = 0.7
     
     if total_questions > 0 and (score / total_questions) >= passing_threshold:
-        # Extract day number from quiz_id (e.g., "day-5" -> 5)
-        try:
-            day_num = int(submission.quiz_id.replace("day-", "").split("-")[0])
-            # Convert to task_id format: "w{week}-d{day_of_week}"
-            week = (day_num - 1) // 7 + 1
-            day_of_week = ((day_num - 1) % 7) + 1
-            task_id = f"w{week}-d{day_of_week}"
-            
-            # Import and call task completion internal function
-            from .tasks import _complete_task_internal
-            task_result = _complete_task_internal(db, user, task_id, skip_xp=True, commit=False)
-            
-            if not task_result.get("error") and not task_result.get("already_completed"):
-                task_completed = True
-        except (ValueError, AttributeError):
-            # If quiz_id doesn't match expected format, skip task completion
-            pass
+        # Quizzes are linked to their task at seed time (quiz_tasks); unlinked quizzes complete nothing
+        task_pk = get_curriculum(db).quiz_tasks.get(submission.quiz_id)
+        task = db.get(Task, task_pk) if task_pk is not None else None
+        if task is not None:
+            task_id = task.task_id
+            task_result = _complete_loaded_task(db, user, task, skip_xp=True, commit=False)
+            task_completed = not task_result.get("already_completed")
     # --- End Quiz → Task Completion Hook ---
 
     db.commit()
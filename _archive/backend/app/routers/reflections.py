@@ -1,34 +1,96 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 
 from ..database import get_db
 from ..models import Reflection, Week, User
 from ..schemas import ReflectionCreate, ReflectionResponse
 from ..auth import get_current_user
+from ..utils.search import index_reflection
+from ..utils.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, parse_cursor_datetime
 
 router = APIRouter()
 
 
-@router.get("", response_model=List[ReflectionResponse])
-def get_reflections(user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    """Get all reflections for the authenticated user."""
-    reflections = db.query(Reflection).filter(
-        Reflection.user_id == user.id
-    ).order_by(Reflection.created_at.desc()).all()
+REFLECTION_FIELDS = set(ReflectionResponse.model_fields)
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+
+@router.get(
+    "",
+    response_model=List[ReflectionResponse],
+    response_model_exclude_unset=True,
+)
+def get_reflections(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the authenticated user's reflections, newest first.
+
+    Keyset-paginated on (created_at, id): when more rows exist, the
+    X-Next-Cursor response header holds the cursor for the next page.
+    ``fields`` is a comma-separated field list; the ``content`` body is only
+    loaded and returned when it is listed (or when ``fields`` is omitted).
+    """
+    include_content = True
+    if fields is not None:
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = requested - REFLECTION_FIELDS
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+        include_content = "content" in requested
+
+    columns = [
+        Reflection.id,
+        Reflection.week_id,
+        Reflection.created_at,
+        Reflection.updated_at,
+        Week.week_number,
+        Week.title,
+    ]
+    if include_content:
+        columns.append(Reflection.content)
+
+    query = (
+        db.query(*columns)
+        .outerjoin(Week, Week.id == Reflection.week_id)
+        .filter(Reflection.user_id == user.id)
+    )
+    if cursor:
+        created_at, reflection_id = decode_cursor(cursor, 2)
+        created_at = parse_cursor_datetime(created_at)
+        if not isinstance(reflection_id, int):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(or_(
+            Reflection.created_at < created_at,
+            and_(Reflection.created_at == created_at, Reflection.id < reflection_id),
+        ))
+
+    rows = query.order_by(Reflection.created_at.desc(), Reflection.id.desc()).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].created_at, rows[-1].id)
 
     result = []
-    for ref in reflections:
-        week = db.query(Week).filter(Week.id == ref.week_id).first()
-        result.append({
-            "id": ref.id,
-            "week_id": ref.week_id,
-            "week_number": week.week_number if week else 0,
-            "week_title": week.title if week else "Unknown",
-            "content": ref.content,
-            "created_at": ref.created_at,
-            "updated_at": ref.updated_at
-        })
+    for row in rows:
+        item = {
+            "id": row.id,
+            "week_id": row.week_id,
+            "week_number": row.week_number if row.week_number is not None else 0,
+            "week_title": row.title if row.title is not None else "Unknown",
+            "created_at": row.created_at,
+            "updated_at": row.updated_at
+        }
+        if include_content:
+            item["content"] = row.content
+        result.append(item)
 
     return result
 
@@ -74,6 +136,7 @@ def create_or_update_reflection(data: ReflectionCreate, user: User = Depends(get
     if existing:
         # Update existing reflection
         existing.content = data.content
+        index_reflection(db, existing, week)
         db.commit()
         db.refresh(existing)
         reflection = existing
@@ -85,6 +148,8 @@ def create_or_update_reflection(data: ReflectionCreate, user: User = Depends(get
             content=data.content
         )
         db.add(reflection)
+        db.flush()  # Assigns reflection.id for the search index
+        index_reflection(db, reflection, week)
         db.commit()
         db.refresh(reflection)
 
@@ -1,21 +1,24 @@
 from datetime import datetime
+from uuid import uuid4
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func, update
 from sqlalchemy.orm import Session, joinedload
 
 from ..database import get_db
 from ..models import (
     User,
     UserQuest,
-    UserChallenge,
 )
 from ..schemas import RPGState, RPGQuestState, RPGChallengeState
 from ..utils.gamification import (
     level_from_xp,
     next_level_requirement,
-    refresh_focus_points,
-    check_penalty,
+    resolve_vitals,
+    settle_vitals,
     FOCUS_CAP,
 )
+from ..utils.challenges import active_user_challenges
+from ..utils.ledger import charge, credit
 from ..auth import get_current_user
 
 router = APIRouter()
@@ -26,6 +29,7 @@ SHOP_ITEMS = {
     "potion_focus": {"cost": 20, "description": "Refills focus points to max"},
     "heart_refill": {"cost": 100, "description": "Restores one heart"},
 }
+MAX_HEARTS = 3
 
 def get_active_quest(db: Session, user_id: int) -> UserQuest | None:
     return (
@@ -36,21 +40,15 @@ def get_active_quest(db: Session, user_id: int) -> UserQuest | None:
     )
 
 
-def get_active_challenges(db: Session, user_id: int):
-    return (
-        db.query(UserChallenge)
-        .options(joinedload(UserChallenge.challenge))
-        .filter(UserChallenge.user_id == user_id)
-        .all()
-    )
-
-
 @router.get("/state", response_model=RPGState)
 def get_rpg_state(user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    """Return consolidated RPG state for the authenticated user."""
-    refresh_focus_points(user)
-    check_penalty(user)
-    db.commit()
+    """
+    Return consolidated RPG state for the authenticated user.
+
+    Read-only: the daily focus refill and missed-day penalties are derived
+    from timestamps here and persisted by the user's next write.
+    """
+    vitals = resolve_vitals(user)
 
     active_quest = get_active_quest(db, user.id)
     quest_payload = None
@@ -64,11 +62,7 @@ def get_rpg_state(user: User = Depends(get_current_user), db: Session = Depends(
         )
 
     challenges_payload = []
-    for uc in get_active_challenges(db, user.id):
-        if not uc.challenge:
-            continue
-        if uc.completed_at:
-            continue
+    for uc in active_user_challenges(db, user.id):
         challenges_payload.append(
             RPGChallengeState(
                 id=uc.challenge.id,
@@ -84,13 +78,13 @@ def get_rpg_state(user: User = Depends(get_current_user), db: Session = Depends(
         "level": level_from_xp(user.xp),
         "next_level_xp": next_level_requirement(user.xp),
         "gold": user.gold,
-        "streak": user.streak,
-        "focus_points": user.focus_points,
+        "streak": vitals.streak,
+        "focus_points": vitals.focus_points,
         "focus_cap": FOCUS_CAP,
         "active_quest": quest_payload,
         "active_challenges": challenges_payload,
-        "hearts": user.hearts,
-        "streak_freeze_count": user.streak_freeze_count,
+        "hearts": vitals.hearts,
+        "streak_freeze_count": vitals.streak_freeze_count,
     }
 
 
@@ -103,7 +97,8 @@ def award_xp(amount: int, user: User = Depends(get_current_user), db: Session =
         raise HTTPException(status_code=400, detail="XP amount too large (max 1000 per request)")
 
     old_level = level_from_xp(user.xp)
-    user.xp += amount
+    # Each award is its own ledger event, so one can be told apart (and reversed) from another
+    credit(db, user, f"manual-award:{uuid4().hex}", "award", xp=amount)
     new_level = level_from_xp(user.xp)
 
     db.commit()
@@ -116,6 +111,27 @@ def award_xp(amount: int, user: User = Depends(get_current_user), db: Session =
     }
 
 
+def _increment_user_column(
+    db: Session, user: User, column: str, amount: int = 1, below: int | None = None
+) -> bool:
+    """
+    Atomic ``column = column + amount`` on the user's row, then reload that
+    attribute. With ``below``, only rows where the column is still under that
+    cap are updated; returns False when the row was already at the cap.
+    """
+    target = getattr(User, column)
+    statement = update(User).where(User.id == user.id)
+    if below is not None:
+        statement = statement.where(func.coalesce(target, 0) < below)
+    updated = db.execute(
+        statement
+        .values({target: func.coalesce(target, 0) + amount})
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.refresh(user, [column])
+    return updated > 0
+
+
 @router.post("/buy/{item_id}")
 def buy_item(item_id: str, user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Buy an item from the shop."""
@@ -126,25 +142,27 @@ def buy_item(item_id: str, user: User = Depends(get_current_user), db: Session =
     item = SHOP_ITEMS[item_id]
     cost = item["cost"]
 
-    # Check gold
-    if user.gold < cost:
+    # Settle pending refills/penalties first so the item applies on top of them
+    settle_vitals(user)
+    db.flush()
+
+    # The cap is checked by the increment itself, so concurrent refills cannot
+    # overfill; nothing has been charged yet when it is already full
+    if item_id == "heart_refill" and not _increment_user_column(db, user, "hearts", below=MAX_HEARTS):
+        raise HTTPException(status_code=400, detail="Hearts already full")
+
+    # Conditional debit (gold >= cost) so concurrent purchases cannot overspend
+    if not charge(db, user, f"shop:{item_id}", "shop", gold=cost):
+        db.rollback()  # Undo the heart added above
         raise HTTPException(status_code=400, detail="Not enough gold")
 
     # Apply item effect
     if item_id == "streak_freeze":
-        user.gold -= cost
-        user.streak_freeze_count += 1
+        _increment_user_column(db, user, "streak_freeze_count")
 
     elif item_id == "potion_focus":
-        user.gold -= cost
         user.focus_points = FOCUS_CAP
         user.focus_refreshed_at = datetime.utcnow()
 
-    elif item_id == "heart_refill":
-        if user.hearts >= 3:
-            raise HTTPException(status_code=400, detail="Hearts already full")
-        user.gold -= cost
-        user.hearts += 1
-
     db.commit()
     return {"message": f"Bought {item_id}", "gold": user.gold}
@@ -0,0 +1,50 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from ..database import get_db
+from ..models import User
+from ..schemas import SearchResponse
+from ..auth import get_current_user
+from ..utils.search import SEARCH_KINDS, search
+
+router = APIRouter()
+
+MAX_PAGE_SIZE = 50
+
+
+@router.get("", response_model=SearchResponse)
+def search_content(
+    q: str = Query(..., min_length=1, max_length=200),
+    kind: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0, le=1000),
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Ranked full-text search over the user's reflections and the question bank.
+
+    ``kind`` restricts results to "reflection" or "question". Results are
+    ordered by relevance; ``next_offset`` is set while more results remain.
+    """
+    if kind is not None and kind not in SEARCH_KINDS:
+        raise HTTPException(status_code=400, detail=f"kind must be one of: {', '.join(SEARCH_KINDS)}")
+
+    hits = search(db, user.id, q, kind=kind, limit=limit + 1, offset=offset)
+    has_more = len(hits) > limit
+    return {
+        "query": q,
+        "results": [
+            {
+                "kind": hit.kind,
+                "id": hit.ref_id,
+                "parent": hit.parent,
+                "title": hit.title,
+                "snippet": hit.snippet,
+                "score": hit.score,
+            }
+            for hit in hits[:limit]
+        ],
+        "next_offset": offset + limit if has_more else None,
+    }
@@ -1,5 +1,4 @@
 """Spaced Repetition System (SRS) router for daily review questions."""
-import json
 from datetime import datetime, timedelta
 from typing import List
 
@@ -10,6 +9,10 @@ from pydantic import BaseModel
 from ..database import get_db
 from ..models import User, Question, UserQuestionReview
 from ..auth import get_current_user
+from ..utils.daily_activity import record_daily_activity
+from ..utils.gamification import REVIEW_MASTERY_XP, REVIEW_XP
+from ..utils.ledger import credit
+from ..utils.question_cache import get_quiz_payloads
 
 router = APIRouter(tags=["Spaced Repetition"])
 
@@ -65,9 +68,10 @@ def get_daily_review(
     """
     now = datetime.utcnow()
 
-    # Query due reviews (not mastered, due <= now)
+    # Query due reviews (not mastered, due <= now) with each question's quiz_id
     due_reviews = (
-        db.query(UserQuestionReview)
+        db.query(UserQuestionReview, Question.quiz_id)
+        .outerjoin(Question, Question.id == UserQuestionReview.question_id)
         .filter(
             UserQuestionReview.user_id == user.id,
             UserQuestionReview.due_date <= now,
@@ -78,32 +82,22 @@ def get_daily_review(
         .all()
     )
 
-    # Build response with question data
+    # Build response with question data, already parsed in the question cache
+    payloads = get_quiz_payloads(db, {quiz_id for _, quiz_id in due_reviews if quiz_id})
     questions = []
-    for review in due_reviews:
-        q = review.question
+    for review, quiz_id in due_reviews:
+        q = payloads[quiz_id].questions.get(review.question_id) if quiz_id else None
         if q:
-            # Parse options/test_cases JSON strings to lists
-            try:
-                options_list = json.loads(q.options) if q.options else []
-            except (json.JSONDecodeError, TypeError):
-                options_list = []
-
-            try:
-                test_cases_list = json.loads(q.test_cases) if q.test_cases else None
-            except (json.JSONDecodeError, TypeError):
-                test_cases_list = None
-
-            questions.append(ReviewQuestionOut(
-                id=review.id,
-                question_id=q.id,
-                text=q.text,
-                question_type=q.question_type or "mcq",
-                code=q.code,
-                options=options_list,
-                starter_code=q.starter_code,
-                test_cases=test_cases_list,
-                topic_tag=q.topic_tag,
+            questions.append(ReviewQuestionOut(
+                id=review.id,
+                question_id=q.id,
+                text=q.text,
+                question_type=q.question_type,
+                code=q.code,
+                options=list(q.options),
+                starter_code=q.starter_code,
+                test_cases=q.test_cases,
+                topic_tag=q.topic_tag,
                 interval_index=review.interval_index,
                 success_count=review.success_count
             ))
@@ -158,11 +152,11 @@ def submit_review_result(
         # Check for mastery (3+ consecutive successes at max interval)
         if review.success_count >= 3 and review.interval_index == len(SRS_INTERVALS) - 1:
             review.is_mastered = True
-            xp_awarded = 100  # Mastery bonus
-            message = "🏆 Concept Mastered! +100 XP"
+            xp_awarded = REVIEW_MASTERY_XP  # Mastery bonus
+            message = f"🏆 Concept Mastered! +{REVIEW_MASTERY_XP} XP"
         else:
-            xp_awarded = 10
-            message = f"✅ Correct! Next review in {interval_days} days. +10 XP"
+            xp_awarded = REVIEW_XP
+            message = f"✅ Correct! Next review in {interval_days} days. +{REVIEW_XP} XP"
     else:
         # Incorrect: reset to interval 0 and clear success count
         review.interval_index = 0
@@ -174,7 +168,8 @@ def submit_review_result(
     review.last_reviewed_at = datetime.utcnow()
 
     # Award XP to user
-    user.xp += xp_awarded
+    xp_applied, _ = credit(db, user, f"srs-review:{review.id}", "review", xp=xp_awarded)
+    record_daily_activity(db, user.id, now.date(), reviews=1, xp=xp_applied)
 
     db.commit()
     db.refresh(review)
@@ -1,7 +1,7 @@
-from datetime import datetime, timedelta
+from collections import Counter
+from datetime import date, datetime, time
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
 
 from ..database import get_db
 from ..models import (
@@ -9,20 +9,26 @@ from ..models import (
     UserTaskStatus,
     User,
     UserQuest,
-    UserChallenge,
-    Badge,
-    UserBadge,
-    Week,
-    Achievement,
-    UserAchievement,
 )
-from ..schemas import TaskResponse, TaskCompletionResult
+from ..schemas import (
+    TaskResponse,
+    TaskCompletionResult,
+    TaskBatchCompleteRequest,
+    TaskBatchCompletionResult,
+)
 from ..auth import get_current_user
 from ..utils.gamification import (
     level_from_xp,
-    refresh_focus_points,
+    settle_vitals,
     update_streak,
 )
+from ..utils.activity import clear_active_day_if_idle, load_activity, mark_active_day
+from ..utils.challenges import active_user_challenges
+from ..utils.daily_activity import record_daily_activity
+from ..utils.ledger import credit, credit_many, reverse_event, task_event
+from ..utils.progress_counters import adjust_week_progress
+from ..utils.rewards import evaluate_rewards
+from ..utils.user_stats import adjust_user_stats
 
 
 router = APIRouter()
@@ -34,20 +40,6 @@ DIFFICULTY_MULTIPLIER = {
     "hard": 1.5,
     "boss": 2.0,
 }
-STREAK_BADGES = {
-    3: "b-streak-3",
-    7: "b-streak-7",
-    14: "b-streak-14",
-    30: "b-streak-30",
-}
-REWARD_MULTIPLIER = {
-    "trivial": 1.0,
-    "normal": 1.0,
-    "hard": 1.5,
-    "epic": 2.0,
-}
-
-
 
 
 def active_user_quest(db: Session, user_id: int) -> UserQuest | None:
@@ -75,19 +67,11 @@ def apply_quest_damage(db: Session, user_quest: UserQuest, damage: int) -> tuple
     return new_hp, boss_defeated
 
 
-def apply_challenge_progress(db: Session, user_id: int) -> list[dict]:
+def apply_challenge_progress(db: Session, user_id: int, amount: int = 1) -> list[dict]:
     """Increment progress for all active challenges; return progress snapshots."""
     updates = []
-    active = (
-        db.query(UserChallenge)
-        .options(joinedload(UserChallenge.challenge))
-        .filter(UserChallenge.user_id == user_id)
-        .all()
-    )
-    for uc in active:
-        if uc.completed_at or not uc.challenge:
-            continue
-        uc.progress = min(uc.challenge.goal_count, uc.progress + 1)
+    for uc in active_user_challenges(db, user_id):
+        uc.progress = min(uc.challenge.goal_count, uc.progress + amount)
         if uc.progress >= uc.challenge.goal_count:
             uc.completed_at = datetime.utcnow()
         updates.append(
@@ -101,154 +85,22 @@ def apply_challenge_progress(db: Session, user_id: int) -> list[dict]:
     return updates
 
 
-def award_badge(db: Session, user_id: int, badge_id: str) -> tuple[bool, int, int]:
-    """Ensure a user earns a badge by badge_id. Returns (awarded, xp_bonus, gold_bonus)."""
-    badge = db.query(Badge).filter(Badge.badge_id == badge_id).first()
-    if not badge:
-        return False, 0, 0
-    existing = (
-        db.query(UserBadge)
-        .filter(UserBadge.user_id == user_id, UserBadge.badge_id == badge.id)
-        .first()
-    )
-    if existing:
-        return False, 0, 0
-    db.add(UserBadge(user_id=user_id, badge_id=badge.id))
-    multiplier = REWARD_MULTIPLIER.get(badge.difficulty or "normal", 1.0)
-    xp_bonus = int(badge.xp_value * multiplier)
-    gold_bonus = xp_bonus // 10
-    return True, xp_bonus, gold_bonus
-
-
-def award_achievement(db: Session, user_id: int, achievement_ref: str) -> tuple[bool, int, int]:
-    """Ensure a user earns an achievement by achievement_id. Returns (awarded, xp_bonus, gold_bonus)."""
-    achievement = db.query(Achievement).filter(Achievement.achievement_id == achievement_ref).first()
-    if not achievement:
-        return False, 0, 0
-    existing = (
-        db.query(UserAchievement)
-        .filter(UserAchievement.user_id == user_id, UserAchievement.achievement_id == achievement.id)
-        .first()
-    )
-    if existing:
-        return False, 0, 0
-    db.add(UserAchievement(user_id=user_id, achievement_id=achievement.id))
-    multiplier = REWARD_MULTIPLIER.get(achievement.difficulty or "normal", 1.0)
-    xp_bonus = int(achievement.xp_value * multiplier)
-    gold_bonus = xp_bonus // 10
-    return True, xp_bonus, gold_bonus
-
-
-def check_week_completion(db: Session, week_id: int, user_id: int) -> bool:
-    tasks_total = db.query(Task).filter(Task.week_id == week_id).count()
-    tasks_completed = (
-        db.query(UserTaskStatus)
-        .join(Task)
-        .filter(
-            Task.week_id == week_id,
-            UserTaskStatus.user_id == user_id,
-            UserTaskStatus.completed,
-        )
-        .count()
-    )
-    return tasks_total > 0 and tasks_completed == tasks_total
-
-
-def check_all_weeks_completed(db: Session, user_id: int) -> bool:
-    tasks_total = db.query(Task).count()
-    tasks_completed = (
-        db.query(UserTaskStatus)
-        .filter(UserTaskStatus.user_id == user_id, UserTaskStatus.completed)
-        .count()
-    )
-    return tasks_total > 0 and tasks_completed == tasks_total
-
-
-def total_tasks_completed(db: Session, user_id: int) -> int:
-    return (
-        db.query(UserTaskStatus)
-        .filter(UserTaskStatus.user_id == user_id, UserTaskStatus.completed)
-        .count()
-    )
-
+def _recalculate_streak(db: Session, user: User, uncompleted_on: date | None) -> None:
+    """Clear the uncompleted day from the activity bitmap and re-derive the streak from it."""
+    if uncompleted_on:
+        bitmap = clear_active_day_if_idle(db, user.id, uncompleted_on)
+    else:
+        bitmap = load_activity(db, user.id)
 
-def _remove_user_badge(db: Session, user: User, badge_code: str) -> None:
-    badge = db.query(Badge).filter(Badge.badge_id == badge_code).first()
-    if not badge:
-        return
-    user_badge = (
-        db.query(UserBadge)
-        .filter(UserBadge.user_id == user.id, UserBadge.badge_id == badge.id)
-        .first()
-    )
-    if not user_badge:
-        return
-    db.delete(user_badge)
-    multiplier = REWARD_MULTIPLIER.get(badge.difficulty or "normal", 1.0)
-    xp_bonus = int(badge.xp_value * multiplier)
-    gold_bonus = xp_bonus // 10
-    user.xp = max(0, user.xp - xp_bonus)
-    user.gold = max(0, user.gold - gold_bonus)
-
-
-def _remove_user_achievement(db: Session, user: User, achievement_code: str) -> None:
-    achievement = (
-        db.query(Achievement)
-        .filter(Achievement.achievement_id == achievement_code)
-        .first()
-    )
-    if not achievement:
-        return
-    user_achievement = (
-        db.query(UserAchievement)
-        .filter(UserAchievement.user_id == user.id, UserAchievement.achievement_id == achievement.id)
-        .first()
-    )
-    if not user_achievement:
-        return
-    db.delete(user_achievement)
-    multiplier = REWARD_MULTIPLIER.get(achievement.difficulty or "normal", 1.0)
-    xp_bonus = int(achievement.xp_value * multiplier)
-    gold_bonus = xp_bonus // 10
-    user.xp = max(0, user.xp - xp_bonus)
-    user.gold = max(0, user.gold - gold_bonus)
-
-
-def _recalculate_streak(db: Session, user: User) -> None:
-    completed_dates = (
-        db.query(func.date(UserTaskStatus.completed_at))
-        .filter(
-            UserTaskStatus.user_id == user.id,
-            UserTaskStatus.completed,
-            UserTaskStatus.completed_at.isnot(None),
-        )
-        .distinct()
-        .all()
-    )
-    if not completed_dates:
+    last_active = bitmap.last_active_day()
+    if last_active is None:
         user.streak = 0
         user.last_checkin_at = None
         return
 
-    date_set = {row[0] for row in completed_dates if row[0]}
-    most_recent = max(date_set)
-    streak = 1
-    cursor = most_recent
-    while (cursor - timedelta(days=1)) in date_set:
-        cursor -= timedelta(days=1)
-        streak += 1
-
-    user.streak = streak
-    latest_completion = (
-        db.query(func.max(UserTaskStatus.completed_at))
-        .filter(
-            UserTaskStatus.user_id == user.id,
-            UserTaskStatus.completed,
-            UserTaskStatus.completed_at.isnot(None),
-        )
-        .scalar()
-    )
-    user.last_checkin_at = latest_completion
+    user.streak = bitmap.current_run()
+    if not user.last_checkin_at or user.last_checkin_at.date() != last_active:
+        user.last_checkin_at = datetime.combine(last_active, time.min)
     user.best_streak = max(user.best_streak or 0, user.streak)
 
 
@@ -272,54 +124,24 @@ def _rollback_active_quest(
 
 
 def _rollback_challenge_progress(db: Session, user_id: int) -> None:
-    active = (
-        db.query(UserChallenge)
-        .options(joinedload(UserChallenge.challenge))
-        .filter(UserChallenge.user_id == user_id, UserChallenge.completed_at.is_(None))
-        .all()
-    )
-    for uc in active:
+    for uc in active_user_challenges(db, user_id):
         if uc.progress and uc.progress > 0:
             uc.progress = max(0, uc.progress - 1)
             db.add(uc)
 
 
-def _complete_task_internal(
-    db: Session,
-    user: User,
-    task_id: str,
-    skip_xp: bool = False,
-    commit: bool = True
-) -> dict:
-    """
-    Internal task completion logic. Can be called from quiz flow with skip_xp=True.
-    
-    Args:
-        db: Database session
-        user: User completing the task
-        task_id: Task ID string (e.g., "w1-d1")
-        skip_xp: If True, skips XP/gold award (for quiz-triggered completion)
-        commit: If True, commits the transaction
-    
-    Returns:
-        Dict with completion result data
-    """
-    task = db.query(Task).filter(Task.task_id == task_id).first()
-    if not task:
-        return {"error": "Task not found", "task_id": task_id}
-
-    status = db.query(UserTaskStatus).filter(
-        UserTaskStatus.task_id == task.id,
-        UserTaskStatus.user_id == user.id
-    ).first()
+def _task_xp(task: Task) -> int:
+    difficulty_multiplier = DIFFICULTY_MULTIPLIER.get(task.difficulty or "normal", 1.0)
+    return int(task.xp_reward * difficulty_multiplier)
 
-    if status and status.completed:
-        return {
-            "already_completed": True,
-            "task_id": task.task_id,
-            "completed_at": status.completed_at
-        }
 
+def _mark_task_completed(
+    db: Session,
+    user: User,
+    task: Task,
+    status: UserTaskStatus | None
+) -> UserTaskStatus:
+    """Flip (or create) the user's status row for a task to completed."""
     if not status:
         status = UserTaskStatus(
             user_id=user.id,
@@ -330,28 +152,43 @@ def _complete_task_internal(
 
     status.completed = True
     status.completed_at = datetime.utcnow()
+    return status
+
+
+def _apply_completion_rewards(
+    db: Session,
+    user: User,
+    tasks: list[Task],
+    skip_xp: bool = False
+) -> dict:
+    """
+    Apply streak, XP, quest, challenge, badge and achievement effects for a set
+    of newly completed tasks. Reward thresholds are evaluated once for the whole
+    set, so batch completion costs the same reward checks as a single task.
+    """
+    for week_id, count in Counter(task.week_id for task in tasks).items():
+        adjust_week_progress(db, user.id, week_id, count)
+    adjust_user_stats(db, user.id, tasks_completed=len(tasks))
 
-    refresh_focus_points(user)
+    # Persist any refill/penalty the read path only derived, before the streak moves on
+    settle_vitals(user)
     update_streak(user)
+    today = datetime.utcnow().date()
+    mark_active_day(db, user.id, today)
 
     xp_gained = 0
     gold_gained = 0
-    xp_bonus_total = 0
-    gold_bonus_total = 0
-    badges_unlocked = []
-    achievements_unlocked = []
     level_before = level_from_xp(user.xp)
 
     if not skip_xp:
-        difficulty_multiplier = DIFFICULTY_MULTIPLIER.get(task.difficulty or "normal", 1.0)
-        xp_gained = int(task.xp_reward * difficulty_multiplier)
-        gold_gained = xp_gained // 10
-        user.xp += xp_gained
-        user.gold += gold_gained
+        xp_gained, gold_gained = credit_many(db, user, [
+            (task_event(task.id), "task", _task_xp(task), _task_xp(task) // 10) for task in tasks
+        ])
+    record_daily_activity(db, user.id, today, tasks=len(tasks), xp=xp_gained)
 
     user.level = level_from_xp(user.xp)
     level_up = user.level > level_before
-    user.focus_points = min(FOCUS_CAP, (user.focus_points or 0) + 1)
+    user.focus_points = min(FOCUS_CAP, (user.focus_points or 0) + len(tasks))
 
     # Apply quest damage if not skipping XP
     quest = active_user_quest(db, user.id)
@@ -361,106 +198,28 @@ def _complete_task_internal(
     if quest and not skip_xp:
         boss_hp_remaining, boss_defeated = apply_quest_damage(db, quest, boss_damage)
         if boss_defeated and quest.quest and quest.quest.reward_xp_bonus:
-            user.xp += quest.quest.reward_xp_bonus
+            credit(db, user, f"quest:{quest.quest_id}", "quest", xp=quest.quest.reward_xp_bonus)
             user.level = level_from_xp(user.xp)
             level_up = user.level > level_before
 
     # Advance challenges
-    challenge_updates = apply_challenge_progress(db, user.id)
-
-    # Award badges: streak thresholds
-    if user.streak in STREAK_BADGES:
-        awarded, bonus_xp, bonus_gold = award_badge(db, user.id, STREAK_BADGES[user.streak])
-        if awarded:
-            xp_bonus_total += bonus_xp
-            gold_bonus_total += bonus_gold
-            badges_unlocked.append(STREAK_BADGES[user.streak])
-
-    # Award week completion badge
-    if check_week_completion(db, task.week_id, user.id):
-        week = db.query(Week).filter(Week.id == task.week_id).first()
-        if week:
-            badge_code = f"b-week-{week.week_number}"
-            awarded, bonus_xp, bonus_gold = award_badge(db, user.id, badge_code)
-            if awarded:
-                xp_bonus_total += bonus_xp
-                gold_bonus_total += bonus_gold
-                badges_unlocked.append(badge_code)
-
-    # Award bootcamp finisher
-    if check_all_weeks_completed(db, user.id):
-        awarded, bonus_xp, bonus_gold = award_badge(db, user.id, "b-bootcamp-finish")
-        if awarded:
-            xp_bonus_total += bonus_xp
-            gold_bonus_total += bonus_gold
-            badges_unlocked.append("b-bootcamp-finish")
-        awarded_ach, ach_xp, ach_gold = award_achievement(db, user.id, "a-all-weeks")
-        if awarded_ach:
-            xp_bonus_total += ach_xp
-            gold_bonus_total += ach_gold
-            achievements_unlocked.append("a-all-weeks")
-
-    # Task count achievements
-    tasks_done = total_tasks_completed(db, user.id)
-    task_thresholds = [(1, "a-first-task"), (10, "a-ten-tasks"), (50, "a-fifty-tasks"), (100, "a-hundred-tasks")]
-    for threshold, ach_code in task_thresholds:
-        if tasks_done >= threshold:
-            awarded, ach_xp, ach_gold = award_achievement(db, user.id, ach_code)
-            if awarded:
-                xp_bonus_total += ach_xp
-                gold_bonus_total += ach_gold
-                achievements_unlocked.append(ach_code)
-
-    # Quest badge and next quest
-    if boss_defeated and quest and quest.quest and quest.quest.reward_badge_id:
-        awarded, bonus_xp, bonus_gold = award_badge(db, user.id, quest.quest.reward_badge_id)
-        if awarded:
-            xp_bonus_total += bonus_xp
-            gold_bonus_total += bonus_gold
-            badges_unlocked.append(quest.quest.reward_badge_id)
-        awarded_ach, ach_xp, ach_gold = award_achievement(db, user.id, "a-boss-first")
-        if awarded_ach:
-            xp_bonus_total += ach_xp
-            gold_bonus_total += ach_gold
-            achievements_unlocked.append("a-boss-first")
+    challenge_updates = apply_challenge_progress(db, user.id, amount=len(tasks))
+
+    if boss_defeated:
         from ..utils.quest_manager import assign_next_quest
-        assign_next_quest(db, user.id)
-
-    # Challenge badges
-    for update in challenge_updates:
-        if update.get("progress") == update.get("goal"):
-            uc = (
-                db.query(UserChallenge)
-                .options(joinedload(UserChallenge.challenge))
-                .filter(UserChallenge.user_id == user.id, UserChallenge.challenge_id == update["challenge_id"])
-                .first()
-            )
-            if uc and uc.challenge and uc.challenge.reward_badge_id:
-                awarded, bonus_xp, bonus_gold = award_badge(db, user.id, uc.challenge.reward_badge_id)
-                if awarded:
-                    xp_bonus_total += bonus_xp
-                    gold_bonus_total += bonus_gold
-                    badges_unlocked.append(uc.challenge.reward_badge_id)
-
-    # Apply bonuses
+        assign_next_quest(db, user.id, after=quest)
+
+    # Badges and achievements: one snapshot, every rule evaluated in memory
+    rewards = evaluate_rewards(db, user, grant=True, credit=not skip_xp)
     if not skip_xp:
-        user.xp += xp_bonus_total
-        user.gold += gold_bonus_total
         user.level = level_from_xp(user.xp)
         level_up = user.level > level_before or level_up
 
-    if commit:
-        db.commit()
-        db.refresh(status)
-        db.refresh(user)
-
     return {
-        "task": task,
-        "status": status,
         "xp_gained": xp_gained,
         "gold_gained": gold_gained,
-        "xp_bonus": xp_bonus_total,
-        "gold_bonus": gold_bonus_total,
+        "xp_bonus": rewards["xp_bonus"],
+        "gold_bonus": rewards["gold_bonus"],
         "level_up": level_up,
         "new_level": user.level,
         "streak": user.streak,
@@ -468,10 +227,68 @@ def _complete_task_internal(
         "boss_damage": boss_damage if quest and not skip_xp else 0,
         "boss_hp_remaining": boss_hp_remaining,
         "challenge_updates": challenge_updates,
-        "badges_unlocked": badges_unlocked,
-        "achievements_unlocked": achievements_unlocked,
+        "badges_unlocked": rewards["badges_unlocked"],
+        "achievements_unlocked": rewards["achievements_unlocked"],
     }
 
+
+def _complete_task_internal(
+    db: Session,
+    user: User,
+    task_id: str,
+    skip_xp: bool = False,
+    commit: bool = True
+) -> dict:
+    """
+    Internal task completion logic. Can be called from quiz flow with skip_xp=True.
+    
+    Args:
+        db: Database session
+        user: User completing the task
+        task_id: Task ID string (e.g., "w1-d1")
+        skip_xp: If True, skips XP/gold award (for quiz-triggered completion)
+        commit: If True, commits the transaction
+    
+    Returns:
+        Dict with completion result data
+    """
+    task = db.query(Task).filter(Task.task_id == task_id).first()
+    if not task:
+        return {"error": "Task not found", "task_id": task_id}
+    return _complete_loaded_task(db, user, task, skip_xp=skip_xp, commit=commit)
+
+
+def _complete_loaded_task(
+    db: Session,
+    user: User,
+    task: Task,
+    skip_xp: bool = False,
+    commit: bool = True
+) -> dict:
+    """_complete_task_internal for a Task row the caller already holds."""
+    status = db.query(UserTaskStatus).filter(
+        UserTaskStatus.task_id == task.id,
+        UserTaskStatus.user_id == user.id
+    ).first()
+
+    if status and status.completed:
+        return {
+            "already_completed": True,
+            "task_id": task.task_id,
+            "completed_at": status.completed_at
+        }
+
+    status = _mark_task_completed(db, user, task, status)
+    rewards = _apply_completion_rewards(db, user, [task], skip_xp=skip_xp)
+
+    if commit:
+        db.commit()
+        db.refresh(status)
+        db.refresh(user)
+
+    return {"task": task, "status": status, **rewards}
+
+
 @router.post("/{task_id}/complete", response_model=TaskCompletionResult)
 def complete_task(task_id: str, user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """
@@ -548,6 +365,100 @@ def complete_task(task_id: str, user: User = Depends(get_current_user), db: Sess
     )
 
 
+MAX_BATCH_TASKS = 100
+
+
+@router.post("/complete-batch", response_model=TaskBatchCompletionResult)
+def complete_tasks_batch(
+    request: TaskBatchCompleteRequest,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Complete many tasks in one transaction (offline catch-up, backfills).
+
+    Streak, quest, challenge, badge, achievement and level evaluation run once
+    for the whole batch instead of once per task. Unknown and already-completed
+    task IDs are reported back rather than failing the batch.
+    """
+    requested = list(dict.fromkeys(request.task_ids))
+    if len(requested) > MAX_BATCH_TASKS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many tasks in one batch (max {MAX_BATCH_TASKS})"
+        )
+
+    tasks_by_code = {
+        task.task_id: task
+        for task in db.query(Task).filter(Task.task_id.in_(requested)).all()
+    }
+    statuses = {
+        status.task_id: status
+        for status in db.query(UserTaskStatus).filter(
+            UserTaskStatus.user_id == user.id,
+            UserTaskStatus.task_id.in_([task.id for task in tasks_by_code.values()])
+        ).all()
+    }
+
+    newly_completed = []
+    completed_statuses = []
+    already_completed = []
+    not_found = []
+    for code in requested:
+        task = tasks_by_code.get(code)
+        if not task:
+            not_found.append(code)
+            continue
+        status = statuses.get(task.id)
+        if status and status.completed:
+            already_completed.append(code)
+            continue
+        completed_statuses.append(_mark_task_completed(db, user, task, status))
+        newly_completed.append(task)
+
+    rewards = {}
+    if newly_completed:
+        rewards = _apply_completion_rewards(db, user, newly_completed)
+        db.commit()
+        db.refresh(user)
+
+    return TaskBatchCompletionResult(
+        completed=[
+            TaskResponse(
+                id=task.id,
+                task_id=task.task_id,
+                week_id=task.week_id,
+                day=task.day,
+                description=task.description,
+                type=task.type,
+                xp_reward=task.xp_reward,
+                badge_reward=task.badge_reward,
+                difficulty=task.difficulty,
+                category=task.category,
+                is_boss_task=task.is_boss_task,
+                completed=True,
+                completed_at=status.completed_at,
+            )
+            for task, status in zip(newly_completed, completed_statuses)
+        ],
+        already_completed=already_completed,
+        not_found=not_found,
+        xp_gained=rewards.get("xp_gained", 0),
+        gold_gained=rewards.get("gold_gained", 0),
+        xp_bonus=rewards.get("xp_bonus", 0),
+        gold_bonus=rewards.get("gold_bonus", 0),
+        level_up=rewards.get("level_up", False),
+        new_level=level_from_xp(user.xp),
+        streak=user.streak,
+        focus_points=user.focus_points,
+        boss_damage=rewards.get("boss_damage", 0),
+        boss_hp_remaining=rewards.get("boss_hp_remaining"),
+        challenge_updates=rewards.get("challenge_updates", []),
+        badges_unlocked=rewards.get("badges_unlocked", []),
+        achievements_unlocked=rewards.get("achievements_unlocked", []),
+    )
+
+
 @router.post("/{task_id}/uncomplete", response_model=TaskCompletionResult)
 def uncomplete_task(task_id: str, user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Unmark a task as completed. Removes XP from user."""
@@ -573,45 +484,25 @@ def uncomplete_task(task_id: str, user: User = Depends(get_current_user), db: Se
         level_before = user.level
         completed_at = status.completed_at
 
-        # Remove XP from user
-        difficulty_multiplier = DIFFICULTY_MULTIPLIER.get(task.difficulty or "normal", 1.0)
-        xp_delta = int(task.xp_reward * difficulty_multiplier)
-        gold_delta = xp_delta // 10
-        user.xp = max(0, user.xp - xp_delta)
-        user.gold = max(0, user.gold - gold_delta)
+        # Reverse exactly what this task's completion credited (nothing for
+        # quiz-triggered completions, which award no task XP)
+        xp_delta, _ = reverse_event(db, user, task_event(task.id))
 
         # Mark as incomplete
         status.completed = False
         status.completed_at = None
+        adjust_week_progress(db, user.id, task.week_id, -1)
+        adjust_user_stats(db, user.id, tasks_completed=-1)
+        if completed_at:
+            record_daily_activity(db, user.id, completed_at.date(), tasks=-1, xp=xp_delta)
         db.flush()
 
-        _rollback_active_quest(db, user, xp_delta, completed_at)
+        _rollback_active_quest(db, user, -xp_delta, completed_at)
         _rollback_challenge_progress(db, user.id)
-        _recalculate_streak(db, user)
-
-        if not check_week_completion(db, task.week_id, user.id):
-            week = db.query(Week).filter(Week.id == task.week_id).first()
-            if week:
-                _remove_user_badge(db, user, f"b-week-{week.week_number}")
-
-        if not check_all_weeks_completed(db, user.id):
-            _remove_user_badge(db, user, "b-bootcamp-finish")
-            _remove_user_achievement(db, user, "a-all-weeks")
-
-        tasks_done = total_tasks_completed(db, user.id)
-        task_achievements = [
-            (1, "a-first-task"),
-            (10, "a-ten-tasks"),
-            (50, "a-fifty-tasks"),
-            (100, "a-hundred-tasks"),
-        ]
-        for threshold, achievement_code in task_achievements:
-            if tasks_done < threshold:
-                _remove_user_achievement(db, user, achievement_code)
-
-        for threshold, badge_code in STREAK_BADGES.items():
-            if user.streak < threshold:
-                _remove_user_badge(db, user, badge_code)
+        _recalculate_streak(db, user, completed_at.date() if completed_at else None)
+
+        # Revoke rewards whose rules no longer hold
+        evaluate_rewards(db, user, grant=False, revoke=True)
 
         user.level = level_from_xp(user.xp)
         level_up = user.level > level_before
@@ -1,22 +1,19 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from ..database import get_db
 from ..models import Week, Task, UserTaskStatus, User
 from ..schemas import WeekResponse, WeekSummary
 from ..auth import get_current_user
+from ..utils.curriculum import get_curriculum
+from ..utils.progress_counters import user_week_progress
 
 router = APIRouter()
 
 
-def get_task_with_status(task: Task, db: Session, user_id: int) -> dict:
-    """Get task data with completion status for a user."""
-    status = db.query(UserTaskStatus).filter(
-        UserTaskStatus.task_id == task.id,
-        UserTaskStatus.user_id == user_id
-    ).first()
-
+def get_task_with_status(task: Task, status: UserTaskStatus | None) -> dict:
+    """Get task data with the user's completion status (if any)."""
     return {
         "id": task.id,
         "task_id": task.task_id,
@@ -31,19 +28,44 @@ def get_task_with_status(task: Task, db: Session, user_id: int) -> dict:
     }
 
 
+def week_with_statuses(db: Session, week: Week, user_id: int) -> dict:
+    """
+    Build the week payload from an eager-loaded week plus one query for the
+    user's statuses on its tasks (instead of one status query per task).
+    """
+    statuses = {
+        status.task_id: status
+        for status in db.query(UserTaskStatus)
+        .join(Task, Task.id == UserTaskStatus.task_id)
+        .filter(UserTaskStatus.user_id == user_id, Task.week_id == week.id)
+    }
+    tasks_with_status = [get_task_with_status(task, statuses.get(task.id)) for task in week.tasks]
+    tasks_completed = sum(1 for t in tasks_with_status if t["completed"])
+
+    return {
+        "id": week.id,
+        "week_number": week.week_number,
+        "title": week.title,
+        "focus": week.focus,
+        "milestone": week.milestone,
+        "checkin_prompt": week.checkin_prompt,
+        "tasks": tasks_with_status,
+        "tasks_completed": tasks_completed,
+        "tasks_total": len(week.tasks)
+    }
+
+
 @router.get("", response_model=List[WeekSummary])
 def get_all_weeks(user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Get all weeks with task completion summary."""
     weeks = db.query(Week).order_by(Week.week_number).all()
+    week_task_totals = get_curriculum(db).week_task_totals
+    completed_by_week = user_week_progress(db, user.id)
     result = []
 
     for week in weeks:
-        tasks_total = len(week.tasks)
-        tasks_completed = db.query(UserTaskStatus).join(Task).filter(
-            Task.week_id == week.id,
-            UserTaskStatus.user_id == user.id,
-            UserTaskStatus.completed
-        ).count()
+        tasks_total = week_task_totals.get(week.id, 0)
+        tasks_completed = completed_by_week.get(week.id, 0)
 
         result.append({
             "id": week.id,
@@ -62,46 +84,25 @@ def get_all_weeks(user: User = Depends(get_current_user), db: Session = Depends(
 @router.get("/{week_id}", response_model=WeekResponse)
 def get_week(week_id: int, user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Get a specific week with all its tasks and completion status."""
-    week = db.query(Week).filter(Week.id == week_id).first()
+    week = db.query(Week).options(selectinload(Week.tasks)).filter(Week.id == week_id).first()
 
     if not week:
         raise HTTPException(status_code=404, detail="Week not found")
 
-    tasks_with_status = [get_task_with_status(task, db, user.id) for task in week.tasks]
-    tasks_completed = sum(1 for t in tasks_with_status if t["completed"])
-
-    return {
-        "id": week.id,
-        "week_number": week.week_number,
-        "title": week.title,
-        "focus": week.focus,
-        "milestone": week.milestone,
-        "checkin_prompt": week.checkin_prompt,
-        "tasks": tasks_with_status,
-        "tasks_completed": tasks_completed,
-        "tasks_total": len(week.tasks)
-    }
+    return week_with_statuses(db, week, user.id)
 
 
 @router.get("/number/{week_number}", response_model=WeekResponse)
 def get_week_by_number(week_number: int, user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Get a specific week by its week number."""
-    week = db.query(Week).filter(Week.week_number == week_number).first()
+    week = (
+        db.query(Week)
+        .options(selectinload(Week.tasks))
+        .filter(Week.week_number == week_number)
+        .first()
+    )
 
     if not week:
         raise HTTPException(status_code=404, detail="Week not found")
 
-    tasks_with_status = [get_task_with_status(task, db, user.id) for task in week.tasks]
-    tasks_completed = sum(1 for t in tasks_with_status if t["completed"])
-
-    return {
-        "id": week.id,
-        "week_number": week.week_number,
-        "title": week.title,
-        "focus": week.focus,
-        "milestone": week.milestone,
-        "checkin_prompt": week.checkin_prompt,
-        "tasks": tasks_with_status,
-        "tasks_completed": tasks_completed,
-        "tasks_total": len(week.tasks)
-    }
+    return week_with_statuses(db, week, user.id)
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional, List, Any, Union, Dict
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 # Task schemas
@@ -69,7 +69,7 @@ class ReflectionResponse(BaseModel):
     week_id: int
     week_number: int
     week_title: str
-    content: str
+    content: Optional[str] = None  # Omitted by list views that ask for fields without it
     created_at: datetime
     updated_at: datetime
 
@@ -119,6 +119,7 @@ class ProgressResponse(BaseModel):
     badges_total: int
     achievements_earned: int = 0
     achievements_total: int = 0
+    quizzes_completed: int = 0
     xp_to_next_level: int = 100
     level_progress: float = 0.0
 
@@ -186,6 +187,30 @@ class TaskCompletionResult(TaskResponse):
     achievements_unlocked: List[str] = []
 
 
+class TaskBatchCompleteRequest(BaseModel):
+    task_ids: List[str]
+
+
+class TaskBatchCompletionResult(BaseModel):
+    """Aggregated result of completing several tasks in one transaction."""
+    completed: List[TaskResponse] = []
+    already_completed: List[str] = []
+    not_found: List[str] = []
+    xp_gained: int = 0
+    gold_gained: int = 0
+    xp_bonus: int = 0
+    gold_bonus: int = 0
+    level_up: bool = False
+    new_level: int = 1
+    streak: int = 0
+    focus_points: int = 0
+    boss_damage: int = 0
+    boss_hp_remaining: Optional[int] = None
+    challenge_updates: List[dict] = []
+    badges_unlocked: List[str] = []
+    achievements_unlocked: List[str] = []
+
+
 # User schemas
 class UserResponse(BaseModel):
     id: int
@@ -245,10 +270,30 @@ class AnswerSubmission(BaseModel):
     answer: Any  # int for MCQ, dict for coding
 
 
+class AnswerBatchSubmission(BaseModel):
+    """Several answers verified in one request."""
+    answers: List[AnswerSubmission] = Field(..., min_length=1, max_length=50)
+
+
 class AnswerVerifyResponse(BaseModel):
     """Response after verifying an answer."""
     question_id: int
     is_correct: bool
     correct_index: Optional[int] = None  # For MCQ/code-correction
     explanation: Optional[str] = None
-
+    test_results: Optional[List[Dict[str, Any]]] = None  # Per-test results when the server ran the code
+
+# Search schemas
+class SearchResult(BaseModel):
+    kind: str  # "reflection" or "question"
+    id: int  # Reflection.id or Question.id
+    parent: Optional[str] = None  # Week id (reflections) or quiz_id (questions)
+    title: Optional[str] = None
+    snippet: str  # HTML-escaped text with matches wrapped in <mark></mark>
+    score: float
+
+
+class SearchResponse(BaseModel):
+    query: str
+    results: List[SearchResult]
+    next_offset: Optional[int] = None
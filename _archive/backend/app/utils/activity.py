@@ -0,0 +1,177 @@
+"""
+Activity Bitmap
+===============
+One bit per calendar day (UTC) on which a user completed at least one task,
+stored per user as bytes with bit 0 = ``origin`` (the first active day).
+
+Streaks, best streak and calendar runs are derived with integer bit
+operations on the whole bitmap (two years is ~92 bytes), so nothing scans
+user_task_statuses on the read path. The bitmap is kept in step by the task
+completion and uncomplete paths; rebuild_activity() recomputes it from
+user_task_statuses for repairs and backfills.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..models import UserActivityBitmap, UserTaskStatus
+
+
+@dataclass
+class ActivityBitmap:
+    origin: Optional[date] = None
+    bits: int = 0
+
+    @classmethod
+    def from_days(cls, days: Iterable[date]) -> "ActivityBitmap":
+        bitmap = cls()
+        for day in sorted(set(days)):
+            bitmap.mark(day)
+        return bitmap
+
+    def mark(self, day: date) -> None:
+        if self.origin is None:
+            self.origin = day
+        elif day < self.origin:
+            self.bits <<= (self.origin - day).days
+            self.origin = day
+        self.bits |= 1 << (day - self.origin).days
+
+    def clear(self, day: date) -> None:
+        if self.origin is None or day < self.origin:
+            return
+        self.bits &= ~(1 << (day - self.origin).days)
+        if not self.bits:
+            self.origin = None
+        elif not self.bits & 1:
+            # Keep bit 0 on the first active day
+            shift = (self.bits & -self.bits).bit_length() - 1
+            self.bits >>= shift
+            self.origin += timedelta(days=shift)
+
+    def is_active(self, day: date) -> bool:
+        if self.origin is None or day < self.origin:
+            return False
+        return bool(self.bits >> (day - self.origin).days & 1)
+
+    def last_active_day(self) -> Optional[date]:
+        if not self.bits:
+            return None
+        return self.origin + timedelta(days=self.bits.bit_length() - 1)
+
+    def current_run(self) -> int:
+        """Length of the run of active days ending on the last active day."""
+        if not self.bits:
+            return 0
+        top = self.bits.bit_length()
+        # Inverting the bits below the top turns the run into leading zeros
+        gaps = self.bits ^ ((1 << top) - 1)
+        return top - gaps.bit_length()
+
+    def runs(self, since: Optional[date] = None) -> List[Tuple[date, int]]:
+        """Run-length encoding: (first_day, length) per run of active days, oldest first."""
+        result = []
+        bits, offset = self.bits, 0
+        while bits:
+            start = (bits & -bits).bit_length() - 1
+            bits >>= start
+            length = ((bits + 1) & ~bits).bit_length() - 1
+            result.append((self.origin + timedelta(days=offset + start), length))
+            bits >>= length
+            offset += start + length
+        if since is not None:
+            result = [
+                (max(first, since), length - max(0, (since - first).days))
+                for first, length in result
+                if first + timedelta(days=length) > since
+            ]
+        return result
+
+    def longest_run(self) -> int:
+        return max((length for _, length in self.runs()), default=0)
+
+    def to_bytes(self) -> bytes:
+        return self.bits.to_bytes((self.bits.bit_length() + 7) // 8, "little")
+
+
+def load_activity(db: Session, user_id: int) -> ActivityBitmap:
+    row = db.execute(
+        select(UserActivityBitmap.origin, UserActivityBitmap.bits).where(
+            UserActivityBitmap.user_id == user_id
+        )
+    ).first()
+    if not row or not row.origin:
+        return ActivityBitmap()
+    return ActivityBitmap(origin=row.origin, bits=int.from_bytes(row.bits or b"", "little"))
+
+
+def save_activity(db: Session, user_id: int, bitmap: ActivityBitmap) -> None:
+    """Write the bitmap with one upsert, so two first completions cannot race on the key."""
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    values = {"origin": bitmap.origin, "bits": bitmap.to_bytes()}
+    stmt = dialect.insert(UserActivityBitmap).values(user_id=user_id, **values)
+    db.execute(stmt.on_conflict_do_update(index_elements=["user_id"], set_=values))
+
+
+def mark_active_day(db: Session, user_id: int, day: date) -> ActivityBitmap:
+    bitmap = load_activity(db, user_id)
+    if not bitmap.is_active(day):
+        bitmap.mark(day)
+        save_activity(db, user_id, bitmap)
+    return bitmap
+
+
+def clear_active_day_if_idle(db: Session, user_id: int, day: date) -> ActivityBitmap:
+    """Clear ``day`` unless the user still has a completion on it. Call after flushing the uncomplete."""
+    bitmap = load_activity(db, user_id)
+    if not bitmap.is_active(day):
+        return bitmap
+    start = datetime.combine(day, time.min)
+    still_active = db.execute(
+        select(UserTaskStatus.id).where(
+            UserTaskStatus.user_id == user_id,
+            UserTaskStatus.completed,
+            UserTaskStatus.completed_at >= start,
+            UserTaskStatus.completed_at < start + timedelta(days=1),
+        ).limit(1)
+    ).first()
+    if not still_active:
+        bitmap.clear(day)
+        save_activity(db, user_id, bitmap)
+    return bitmap
+
+
+def _as_date(value) -> date:
+    # SQLite returns func.date() as an ISO string, PostgreSQL as a date
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def rebuild_activity(db: Session, user_id: Optional[int] = None) -> int:
+    """Recompute bitmaps from user_task_statuses. Returns users written; the caller commits."""
+    day = func.date(UserTaskStatus.completed_at)
+    query = (
+        select(UserTaskStatus.user_id, day)
+        .where(UserTaskStatus.completed, UserTaskStatus.completed_at.isnot(None))
+        .group_by(UserTaskStatus.user_id, day)
+        .order_by(UserTaskStatus.user_id)
+    )
+    clear = delete(UserActivityBitmap)
+    if user_id is not None:
+        query = query.where(UserTaskStatus.user_id == user_id)
+        clear = clear.where(UserActivityBitmap.user_id == user_id)
+
+    bitmaps = {}
+    for uid, value in db.execute(query):
+        if value:
+            bitmaps.setdefault(uid, ActivityBitmap()).mark(_as_date(value))
+
+    db.execute(clear)
+    db.add_all(
+        UserActivityBitmap(user_id=uid, origin=bitmap.origin, bits=bitmap.to_bytes())
+        for uid, bitmap in bitmaps.items()
+    )
+    return len(bitmaps)
@@ -0,0 +1,87 @@
+"""
+Commit-time invalidation hooks for the in-process caches.
+
+Each cache registers the models it is derived from. When a session flushes
+inserts/updates/deletes of those models (including Query.update/delete bulk
+writes), the cache is invalidated once that transaction commits. Rollbacks
+discard the pending invalidation. Caches shared across processes can also have
+a version stamp written in the same transaction (stamp_on_commit): a row per
+kind of content in content_versions that every process compares on lookup.
+"""
+from datetime import datetime
+from itertools import chain
+from typing import Callable, Iterable
+
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..models import ContentVersion
+
+
+def content_version(db: Session, name: str) -> int:
+    """Current stamp of a kind of content (0 before its first write)."""
+    return db.execute(
+        select(ContentVersion.version).where(ContentVersion.name == name)
+    ).scalar() or 0
+
+
+def bump_content_version(db: Session, name: str) -> None:
+    """Advance a content stamp inside the caller's transaction."""
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    now = datetime.utcnow()
+    stmt = dialect.insert(ContentVersion).values(name=name, version=1, updated_at=now)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["name"],
+        set_={"version": ContentVersion.version + 1, "updated_at": now},
+    ))
+
+
+def _watch_writes(models: tuple, flag: str) -> None:
+    """Set ``session.info[flag]`` whenever a flush or bulk write touches ``models``."""
+    def _track_writes(session, flush_context):
+        for obj in chain(session.new, session.dirty, session.deleted):
+            if isinstance(obj, models):
+                session.info[flag] = True
+                return
+
+    def _track_bulk_writes(update_context):
+        if issubclass(update_context.mapper.class_, models):
+            update_context.session.info[flag] = True
+
+    def _after_rollback(session):
+        session.info.pop(flag, None)
+
+    event.listen(Session, "after_flush", _track_writes)
+    event.listen(Session, "after_bulk_update", _track_bulk_writes)
+    event.listen(Session, "after_bulk_delete", _track_bulk_writes)
+    event.listen(Session, "after_rollback", _after_rollback)
+
+
+def invalidate_on_commit(models: Iterable[type], invalidate: Callable[[], None]) -> None:
+    """Call ``invalidate`` after any commit that wrote one of ``models`` through the ORM."""
+    flag = f"cache_dirty:{invalidate.__module__}.{invalidate.__qualname__}"
+    _watch_writes(tuple(models), flag)
+
+    def _after_commit(session):
+        if session.info.pop(flag, False):
+            invalidate()
+
+    event.listen(Session, "after_commit", _after_commit)
+
+
+def stamp_on_commit(models: Iterable[type], stamp: Callable[[Session], None]) -> None:
+    """
+    Call ``stamp(session)`` inside any transaction that wrote one of ``models``,
+    just before it commits, so the stamp lands atomically with the writes.
+    Other processes compare the stamp to notice changes they did not make.
+    """
+    flag = f"stamp_pending:{stamp.__module__}.{stamp.__qualname__}"
+    _watch_writes(tuple(models), flag)
+
+    def _before_commit(session):
+        session.flush()  # Pending writes only reach after_flush here
+        if session.info.pop(flag, False):
+            stamp(session)
+
+    event.listen(Session, "before_commit", _before_commit)
@@ -0,0 +1,119 @@
+"""
+Reward Catalog Cache
+====================
+In-process cache of the Badge and Achievement catalogs keyed by their string
+codes (e.g. "b-week-1", "a-first-task"), with REWARD_MULTIPLIER pre-applied.
+
+The catalog only changes when seed scripts or admin tooling write to the
+badges/achievements tables, usually from another process. Every ORM commit
+that writes those rows also bumps the "reward_catalog" stamp in
+content_versions, and each lookup reloads the catalog when the stamp has
+moved, so no process keeps serving row ids that were replaced elsewhere.
+Writes made outside the ORM (raw SQL scripts) need an explicit
+bump_content_version(db, CATALOG) or a process restart.
+"""
+import hashlib
+from dataclasses import dataclass
+from itertools import chain
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..models import Achievement, Badge
+from .cache_events import bump_content_version, content_version, invalidate_on_commit, stamp_on_commit
+from .gamification import REWARD_MULTIPLIER
+
+CATALOG = "reward_catalog"
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    """Immutable snapshot of a Badge or Achievement row."""
+    id: int  # Primary key used by UserBadge/UserAchievement foreign keys
+    code: str
+    name: str
+    description: Optional[str]
+    xp_value: int
+    difficulty: str
+    xp_bonus: int  # xp_value with REWARD_MULTIPLIER applied
+    gold_bonus: int
+
+
+@dataclass(frozen=True)
+class RewardCatalog:
+    version: str
+    badges: Dict[str, CatalogEntry]
+    achievements: Dict[str, CatalogEntry]
+
+
+_catalog: Optional[Tuple[int, RewardCatalog]] = None  # (content stamp, catalog)
+_catalog_lock = Lock()
+
+
+def _to_entry(row, code: str) -> CatalogEntry:
+    difficulty = row.difficulty or "normal"
+    xp_value = row.xp_value or 0
+    xp_bonus = int(xp_value * REWARD_MULTIPLIER.get(difficulty, 1.0))
+    return CatalogEntry(
+        id=row.id,
+        code=code,
+        name=row.name,
+        description=row.description,
+        xp_value=xp_value,
+        difficulty=difficulty,
+        xp_bonus=xp_bonus,
+        gold_bonus=xp_bonus // 10,
+    )
+
+
+def _version_of(badges: Dict[str, CatalogEntry], achievements: Dict[str, CatalogEntry]) -> str:
+    """Content hash so the version is stable across processes serving the same data."""
+    digest = hashlib.sha1()
+    for entry in chain(
+        sorted(badges.values(), key=lambda e: e.id),
+        sorted(achievements.values(), key=lambda e: e.id),
+    ):
+        digest.update(repr(entry).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def load_catalog(db: Session) -> RewardCatalog:
+    """Read both catalog tables from the database (two queries)."""
+    badges = {b.badge_id: _to_entry(b, b.badge_id) for b in db.query(Badge).all()}
+    achievements = {
+        a.achievement_id: _to_entry(a, a.achievement_id) for a in db.query(Achievement).all()
+    }
+    return RewardCatalog(
+        version=_version_of(badges, achievements),
+        badges=badges,
+        achievements=achievements,
+    )
+
+
+def get_catalog(db: Session) -> RewardCatalog:
+    """Return the cached catalog, reloading it when the catalog stamp has moved."""
+    global _catalog
+    stamp = content_version(db, CATALOG)
+    cached = _catalog
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    with _catalog_lock:
+        if _catalog is None or _catalog[0] != stamp:
+            _catalog = (stamp, load_catalog(db))
+        return _catalog[1]
+
+
+def invalidate_catalog() -> None:
+    """Drop the cached catalog; the next get_catalog() call reloads it."""
+    global _catalog
+    with _catalog_lock:
+        _catalog = None
+
+
+def _bump_catalog_version(db: Session) -> None:
+    bump_content_version(db, CATALOG)
+
+
+invalidate_on_commit((Badge, Achievement), invalidate_catalog)
+stamp_on_commit((Badge, Achievement), _bump_catalog_version)
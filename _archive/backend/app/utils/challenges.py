@@ -0,0 +1,73 @@
+"""
+Challenges
+==========
+Active challenge lookups and expiry.
+
+A user challenge is active while it is neither completed nor expired and its
+Challenge has not passed ``ends_at``. active_user_challenges() applies all of
+that in SQL against the partial ix_user_challenges_active index, so task
+completion only touches the user's open challenges however long their history
+is. expire_challenges() is the batch job that stamps ``expired_at`` on open
+rows whose challenge has ended; until it runs, the ``ends_at`` filter already
+keeps those rows out of progress updates.
+"""
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session, contains_eager
+
+from ..models import Challenge, UserChallenge
+
+_OPEN = (UserChallenge.completed_at.is_(None), UserChallenge.expired_at.is_(None))
+
+
+def active_user_challenges(db: Session, user_id: int, now: Optional[datetime] = None) -> List[UserChallenge]:
+    """The user's open, unexpired challenges with their Challenge loaded (one query)."""
+    now = now or datetime.utcnow()
+    return (
+        db.query(UserChallenge)
+        .join(UserChallenge.challenge)
+        .options(contains_eager(UserChallenge.challenge))
+        .filter(
+            UserChallenge.user_id == user_id,
+            *_OPEN,
+            or_(Challenge.ends_at.is_(None), Challenge.ends_at > now),
+        )
+        .order_by(UserChallenge.id)
+        .all()
+    )
+
+
+def expire_challenges(
+    db: Session,
+    now: Optional[datetime] = None,
+    batch_size: int = 1000,
+    commit: bool = True,
+) -> int:
+    """
+    Close open user challenges whose Challenge ended at or before ``now``,
+    ``batch_size`` rows per UPDATE, committing each batch unless ``commit``
+    is False. Idempotent. Returns the number of rows expired.
+    """
+    now = now or datetime.utcnow()
+    ended = select(Challenge.id).where(Challenge.ends_at.isnot(None), Challenge.ends_at <= now)
+    expired = 0
+    while True:
+        ids = db.execute(
+            select(UserChallenge.id)
+            .where(UserChallenge.challenge_id.in_(ended), *_OPEN)
+            .order_by(UserChallenge.id)
+            .limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            return expired
+        db.execute(
+            update(UserChallenge)
+            .where(UserChallenge.id.in_(ids))
+            .values(expired_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        expired += len(ids)
+        if commit:
+            db.commit()
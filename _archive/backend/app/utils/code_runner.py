@@ -0,0 +1,638 @@
+"""
+Code Runner
+===========
+Server-side execution of answers to coding questions against their test cases.
+
+A SandboxPool keeps a fixed set of long-lived worker processes, started
+through a forkserver so they carry none of the API process's memory. Each
+worker imports the standard modules submissions commonly use once, then
+forks a throwaway child per submission. The child:
+
+- closes every descriptor except its result pipe;
+- clears its environment and moves into an empty, read-only directory;
+- when the API runs as root, switches to the unprivileged CODE_SANDBOX_USER
+  account (the pool refuses to start as root without one);
+- lowers its resource limits: CPU seconds, address space, no new processes,
+  no file writes, no core dumps;
+- installs a seccomp filter that makes the kernel refuse sockets, new
+  processes and programs (fork, clone, execve), tracing and signalling other
+  processes. It also holds for code that bypasses the os module, such as
+  _posixsubprocess.fork_exec, so the child has no network access;
+- installs an audit hook that refuses sockets, subprocesses, signals,
+  ctypes, filesystem writes and reads outside the Python installation;
+- runs the tests one by one in fresh namespaces, writing one result line per
+  test.
+
+Each worker checks at start-up that a child can enter the sandbox; a pool
+whose workers cannot (no seccomp, unknown architecture, failing user switch)
+refuses to start. The sandbox user needs read access to the Python
+installation, since modules a submission imports that the worker has not
+loaded yet are read from disk after the switch.
+
+The worker enforces the wall-clock limit and kills the child when it runs
+out. Tests that never reported come back as timed out or not run. Forking a
+warm worker takes about a millisecond; no interpreter is started per test or
+per submission.
+
+A call that finds every worker busy waits for one to free up. At most
+``max_queue`` calls may wait at once. Further calls raise SandboxBusy
+immediately, so overload turns into 503 responses instead of piling up
+request threads.
+
+Test cases use the format of the client-side runner: a JSON list of
+{"function_call" (or "input"), "expected"} entries, where the return value is
+compared as a string. An "expected_output" entry compares printed output
+instead. A JSON string holds an assertion script run after the code.
+
+The pool is off unless CODE_SANDBOX_WORKERS is set, and always off on
+non-POSIX platforms. The seccomp filter covers Linux on x86_64 and aarch64;
+elsewhere the pool refuses to start. While it is off, coding answers are
+still scored from the client's allPassed flag.
+"""
+import builtins
+import ctypes
+import errno
+import io
+import json
+import math
+import multiprocessing
+import os
+import queue
+import select
+import signal
+import struct
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from dataclasses import asdict, dataclass
+from threading import Lock
+from typing import Any, Callable, List, Optional
+
+try:
+    import pwd
+    import resource
+except ImportError:  # Windows: no rlimits, the pool stays disabled
+    pwd = resource = None
+
+SANDBOX_WORKERS = int(os.environ.get("CODE_SANDBOX_WORKERS", "0"))
+SANDBOX_TIME_LIMIT = float(os.environ.get("CODE_SANDBOX_TIME_LIMIT", "2"))  # Seconds per submission
+SANDBOX_MEMORY_MB = int(os.environ.get("CODE_SANDBOX_MEMORY_MB", "256"))
+SANDBOX_MAX_QUEUE = int(os.environ.get("CODE_SANDBOX_MAX_QUEUE", "32"))
+SANDBOX_USER = os.environ.get("CODE_SANDBOX_USER") or None  # Account children switch to when the API runs as root
+
+MAX_CODE_CHARS = 20_000
+
+# Audit events a submission may not raise (prefix match)
+_BLOCKED_EVENTS = (
+    "socket.", "subprocess.", "os.system", "os.exec", "os.posix_spawn", "os.spawn",
+    "os.fork", "os.forkpty", "os.kill", "os.killpg", "pty.", "signal.", "ctypes.",
+    "os.remove", "os.unlink", "os.rename", "os.rmdir", "os.mkdir", "os.chmod", "os.chown",
+    "os.symlink", "os.link", "os.truncate", "os.putenv", "os.unsetenv", "shutil.",
+    "resource.setrlimit", "resource.prlimit", "sys.addaudithook",
+)
+_WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_CREAT | os.O_TRUNC | os.O_APPEND
+# Submissions may only read the interpreter's own files (stdlib, site-packages)
+_READ_ROOTS = tuple({
+    os.path.realpath(prefix)
+    for prefix in (sys.prefix, sys.base_prefix, sys.exec_prefix, sys.base_exec_prefix)
+})
+
+# seccomp: AUDIT_ARCH value and the syscalls the child may not make, per machine
+_SECCOMP_ARCHES = {
+    "x86_64": (0xC000003E, (
+        41, 53, 56, 57, 58, 59, 62,  # socket, socketpair, clone, fork, vfork, execve, kill
+        101, 165, 200, 248, 249, 250,  # ptrace, mount, tkill, add_key, request_key, keyctl
+        272, 298, 308, 310, 311,  # unshare, perf_event_open, setns, process_vm_readv/writev
+        321, 322, 323, 425, 435,  # bpf, execveat, userfaultfd, io_uring_setup, clone3
+    )),
+    "aarch64": (0xC00000B7, (
+        40, 97, 117, 129, 130,  # mount, unshare, ptrace, kill, tkill
+        198, 199, 217, 218, 219, 220, 221,  # socket, socketpair, add_key, request_key, keyctl, clone, execve
+        241, 268, 270, 271, 280, 281, 282,  # perf_event_open, setns, process_vm_readv/writev, bpf, execveat, userfaultfd
+        425, 435,  # io_uring_setup, clone3
+    )),
+}
+_X32_SYSCALL_BIT = 0x40000000
+_BPF_LD_ABS, _BPF_JEQ, _BPF_JGE, _BPF_RET = 0x20, 0x15, 0x35, 0x06
+_SECCOMP_RET_KILL_PROCESS, _SECCOMP_RET_ERRNO, _SECCOMP_RET_ALLOW = 0x80000000, 0x00050000, 0x7FFF0000
+_PR_SET_NO_NEW_PRIVS, _PR_SET_SECCOMP, _SECCOMP_MODE_FILTER = 38, 22, 2
+
+
+class SandboxError(Exception):
+    """The code could not be run (worker failure or overload)."""
+
+
+class SandboxBusy(SandboxError):
+    """Every worker is busy and the wait queue is full."""
+
+
+@dataclass(frozen=True)
+class SandboxLimits:
+    time_limit: float = 2.0  # Wall-clock seconds for all tests of one submission
+    memory_mb: int = 256  # Address-space limit of the child
+    max_output: int = 10_000  # Characters kept per actual value / error
+
+
+@dataclass(frozen=True)
+class _Jail:
+    """Where and as whom the child runs, plus its seccomp program."""
+    cwd: str
+    seccomp: bytes
+    uid: Optional[int] = None
+    gid: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class CaseResult:
+    passed: bool
+    input: str
+    expected: Any
+    actual: Optional[str] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass(frozen=True)
+class RunResult:
+    results: List[CaseResult]
+    timed_out: bool = False
+
+    @property
+    def all_passed(self) -> bool:
+        return bool(self.results) and all(result.passed for result in self.results)
+
+
+# =============================================================================
+# Test cases
+# =============================================================================
+def parse_test_cases(raw) -> List[dict]:
+    """
+    Normalize stored test cases (JSON text or already parsed) into run specs:
+    {"kind": "call" | "output" | "script", "source", "expected"} or, for
+    entries that cannot run, {"kind": "invalid", "source", "expected", "error"}.
+    """
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except json.JSONDecodeError:
+            pass  # A bare assertion script
+    if isinstance(raw, str):
+        if not raw.strip():
+            return [{"kind": "invalid", "source": "Assertion Script", "expected": None, "error": "Empty test script"}]
+        return [{"kind": "script", "source": raw, "expected": "All assertions pass"}]
+    if not isinstance(raw, list):
+        return []
+
+    tests = []
+    for case in raw:
+        call = case.get("function_call", case.get("input")) if isinstance(case, dict) else None
+        if not isinstance(call, str) or not call.strip():
+            tests.append({"kind": "invalid", "source": str(call), "expected": None, "error": "Malformed test case"})
+        elif "expected" in case:
+            tests.append({"kind": "call", "source": call, "expected": str(case["expected"])})
+        elif "expected_output" in case:
+            tests.append({"kind": "output", "source": call, "expected": str(case["expected_output"])})
+        else:
+            tests.append({"kind": "invalid", "source": call, "expected": None, "error": "Test case has no expected value"})
+    return tests
+
+
+def _truncate(text: Optional[str], limit: int) -> Optional[str]:
+    if text is None or len(text) <= limit:
+        return text
+    return text[:limit] + "... (truncated)"
+
+
+def run_cases(code: str, tests: List[dict], max_output: int, emit: Callable[[dict], None]) -> None:
+    """Run each test in a fresh namespace and ``emit`` its outcome (runs inside the sandboxed child)."""
+    try:
+        compiled = compile(code, "<submission>", "exec")
+    except SyntaxError as exc:
+        for _ in tests:
+            emit({"passed": False, "actual": None, "error": f"SyntaxError: {exc}"})
+        return
+
+    for test in tests:
+        if test["kind"] == "invalid":
+            emit({"passed": False, "actual": None, "error": test["error"]})
+            continue
+        namespace = {"__name__": "__main__", "__builtins__": builtins}
+        captured = io.StringIO()
+        value = None
+        error = None
+        try:
+            with redirect_stdout(io.StringIO()):  # Output of the module body is not part of the result
+                exec(compiled, namespace)
+            with redirect_stdout(captured):
+                if test["kind"] == "script":
+                    exec(compile(test["source"], "<tests>", "exec"), namespace)
+                else:
+                    value = eval(compile(test["source"], "<test>", "eval"), namespace)
+        except BaseException as exc:  # noqa: BLE001 - the submission may raise anything, including SystemExit
+            error = f"{type(exc).__name__}: {exc}"
+
+        if test["kind"] == "script":
+            actual = "Passed" if error is None else None
+            passed = error is None
+        else:
+            actual = None if error else (captured.getvalue() if test["kind"] == "output" else str(value))
+            passed = error is None and actual.strip() == test["expected"].strip()
+        emit({"passed": passed, "actual": _truncate(actual, max_output), "error": _truncate(error, max_output)})
+
+
+# =============================================================================
+# Worker and sandboxed child (run in the pool's processes)
+# =============================================================================
+def _readable(path) -> bool:
+    real = os.path.realpath(os.fsdecode(path))
+    return any(real == root or real.startswith(root + os.sep) for root in _READ_ROOTS)
+
+
+def _audit(event: str, args) -> None:
+    if event.startswith(_BLOCKED_EVENTS):
+        raise PermissionError(f"{event} is not allowed in the code runner")
+    if event == "open":
+        path, mode, flags = args
+        if (isinstance(mode, str) and any(flag in mode for flag in "wax+")) or (flags or 0) & _WRITE_FLAGS:
+            raise PermissionError("Writing files is not allowed in the code runner")
+        if not isinstance(path, int) and not _readable(path):
+            raise PermissionError("Reading files is not allowed in the code runner")
+    elif event in ("os.listdir", "os.scandir") and not _readable(args[0] if args[0] is not None else "."):
+        raise PermissionError("Listing directories is not allowed in the code runner")
+
+
+def _seccomp_program() -> Optional[bytes]:
+    """The child's seccomp filter as a BPF program; None on machines without a syscall table here."""
+    arch = _SECCOMP_ARCHES.get(os.uname().machine) if hasattr(os, "uname") else None
+    if arch is None:
+        return None
+    audit_arch, syscalls = arch
+
+    def op(code, k, jt=0, jf=0):
+        return struct.pack("HBBI", code, jt, jf, k)
+
+    deny = op(_BPF_RET, _SECCOMP_RET_ERRNO | errno.EPERM)
+    program = [
+        op(_BPF_LD_ABS, 4),  # seccomp_data.arch
+        op(_BPF_JEQ, audit_arch, jt=1),
+        op(_BPF_RET, _SECCOMP_RET_KILL_PROCESS),
+        op(_BPF_LD_ABS, 0),  # seccomp_data.nr
+    ]
+    if audit_arch == _SECCOMP_ARCHES["x86_64"][0]:
+        program += [op(_BPF_JGE, _X32_SYSCALL_BIT, jf=1), deny]  # The x32 ABI reaches the same calls
+    for nr in syscalls:
+        program += [op(_BPF_JEQ, nr, jf=1), deny]
+    program.append(op(_BPF_RET, _SECCOMP_RET_ALLOW))
+    return b"".join(program)
+
+
+def _install_seccomp(program: bytes) -> None:
+    class SockFprog(ctypes.Structure):
+        _fields_ = [("len", ctypes.c_ushort), ("filter", ctypes.c_void_p)]
+
+    libc = ctypes.CDLL(None, use_errno=True)
+    buffer = ctypes.create_string_buffer(program, len(program))
+    fprog = SockFprog(len(program) // 8, ctypes.addressof(buffer))
+    if libc.prctl(_PR_SET_NO_NEW_PRIVS, 1, 0, 0, 0) or libc.prctl(
+        _PR_SET_SECCOMP, _SECCOMP_MODE_FILTER, ctypes.byref(fprog), 0, 0
+    ):
+        raise OSError(ctypes.get_errno(), "Could not install the seccomp filter")
+
+
+def _confine(limits: SandboxLimits, jail: _Jail) -> None:
+    """Drop everything the child could reach outside its own computation (before the audit hook)."""
+    os.environ.clear()
+    os.chdir(jail.cwd)
+    if jail.uid is not None:
+        os.setgroups([])
+        os.setgid(jail.gid)
+        os.setuid(jail.uid)
+
+    cpu = max(1, math.ceil(limits.time_limit))
+    memory = limits.memory_mb * 1024 * 1024
+    for limit, value in (
+        (resource.RLIMIT_CPU, (cpu, cpu + 1)),
+        (resource.RLIMIT_AS, (memory, memory)),
+        (resource.RLIMIT_FSIZE, (0, 0)),
+        (resource.RLIMIT_NPROC, (0, 0)),
+        (resource.RLIMIT_CORE, (0, 0)),
+    ):
+        resource.setrlimit(limit, value)
+    _install_seccomp(jail.seccomp)
+
+
+def _enter_sandbox(result_fd: int, limits: SandboxLimits, jail: _Jail) -> None:
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    max_fd = os.sysconf("SC_OPEN_MAX") if hasattr(os, "sysconf") else 1024
+    os.closerange(3, result_fd)
+    os.closerange(result_fd + 1, max_fd)
+    sys.stdin = io.StringIO()
+    sys.dont_write_bytecode = True
+
+    _confine(limits, jail)
+    sys.addaudithook(_audit)
+
+
+def _probe_sandbox(limits: SandboxLimits, jail: _Jail) -> Optional[str]:
+    """Check in a throwaway child that the sandbox can be entered and holds; returns an error or None."""
+    import _socket
+    pid = os.fork()
+    if pid == 0:  # Child: never returns
+        status = 3
+        try:
+            _confine(limits, jail)
+            status = 2 if jail.uid is not None and os.geteuid() != jail.uid else 4
+            _socket.socket()
+        except PermissionError:
+            status = 0 if status == 4 else status
+        finally:
+            os._exit(status)
+    _, status = os.waitpid(pid, 0)
+    code = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -1
+    return {
+        0: None,
+        2: "Could not switch to the sandbox user",
+        4: "The seccomp filter did not block sockets",
+    }.get(code, "Could not enter the sandbox (seccomp or resource limits unavailable)")
+
+
+def _run_forked(job: dict, limits: SandboxLimits, jail: _Jail) -> dict:
+    """Run one submission in a forked child; returns raw per-test outcomes in test order."""
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # Child: never returns
+        status = 1
+        try:
+            os.close(read_fd)
+            _enter_sandbox(write_fd, limits, jail)
+
+            def emit(outcome):
+                os.write(write_fd, (json.dumps(outcome) + "\n").encode("utf-8"))
+
+            run_cases(job["code"], job["tests"], limits.max_output, emit)
+            status = 0
+        finally:
+            os._exit(status)
+
+    os.close(write_fd)
+    deadline = time.monotonic() + limits.time_limit
+    max_bytes = (limits.max_output * 2 + 200) * max(1, len(job["tests"]))
+    data = bytearray()
+    timed_out = False
+    while True:
+        remaining = deadline - time.monotonic()
+        ready = select.select([read_fd], [], [], remaining)[0] if remaining > 0 else []
+        if not ready:
+            timed_out = True
+            break
+        chunk = os.read(read_fd, 65536)
+        if not chunk:
+            break
+        data += chunk
+        if len(data) > max_bytes:  # Flooding the pipe: stop reading, the child is killed below
+            break
+    os.close(read_fd)
+    try:
+        os.kill(pid, signal.SIGKILL)  # Harmless if it already exited
+    except ProcessLookupError:
+        pass
+    _, status = os.waitpid(pid, 0)
+
+    outcomes = []
+    for line in data.decode("utf-8", "replace").splitlines():
+        try:
+            outcomes.append(json.loads(line))
+        except json.JSONDecodeError:
+            break
+    crashed = None
+    if not timed_out and len(outcomes) < len(job["tests"]):
+        if os.WIFSIGNALED(status) and os.WTERMSIG(status) == signal.SIGXCPU:
+            timed_out = True
+        elif os.WIFSIGNALED(status) and os.WTERMSIG(status) != signal.SIGKILL:
+            crashed = f"Killed by signal {os.WTERMSIG(status)}"
+        else:
+            crashed = "Execution stopped before this test ran"
+    return {"outcomes": outcomes[:len(job["tests"])], "timed_out": timed_out, "crashed": crashed}
+
+
+def _worker_main(conn, limits: SandboxLimits, jail: _Jail) -> None:
+    """Pool worker loop: report whether the sandbox works, then run each job in a forked child."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Shut down by the pool, not the terminal
+    # Warm the imports submissions commonly use so every forked child inherits them
+    import collections, datetime, functools, itertools, random, re, string  # noqa: E401,F401
+    conn.send(_probe_sandbox(limits, jail))
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        if job is None:
+            return
+        conn.send(_run_forked(job, limits, jail))
+
+
+# =============================================================================
+# Pool (runs in the API process)
+# =============================================================================
+class _Worker:
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.jobs = 0
+
+
+class SandboxPool:
+    """Fixed pool of pre-started sandbox workers with a bounded wait queue."""
+
+    def __init__(
+        self,
+        workers: int,
+        limits: SandboxLimits = SandboxLimits(),
+        max_queue: int = 32,
+        queue_timeout: float = 10.0,
+        max_jobs_per_worker: int = 500,
+        user: Optional[str] = None,
+    ):
+        """``user`` is the account children switch to; required when running as root, ignored otherwise."""
+        if resource is None or not hasattr(os, "fork"):
+            raise SandboxError("The code runner needs a POSIX platform")
+        seccomp = _seccomp_program()
+        if seccomp is None:
+            raise SandboxError("The code runner has no seccomp filter for this machine")
+        uid = gid = None
+        if os.geteuid() == 0:
+            if not user:
+                raise SandboxError("Refusing to run submissions as root; set CODE_SANDBOX_USER")
+            try:
+                account = pwd.getpwnam(user)
+            except KeyError:
+                raise SandboxError(f"Unknown sandbox user {user!r}")
+            if account.pw_uid == 0:
+                raise SandboxError("The sandbox user must not be root")
+            uid, gid = account.pw_uid, account.pw_gid
+        methods = multiprocessing.get_all_start_methods()
+        self._context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        self.limits = limits
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self._idle: "queue.LifoQueue[_Worker]" = queue.LifoQueue()
+        self._waiting = 0
+        self._lock = Lock()
+        self._closed = False
+        cwd = tempfile.mkdtemp(prefix="code-runner-")
+        os.chmod(cwd, 0o555)  # Empty and read-only for the sandbox user
+        self._jail = _Jail(cwd=cwd, seccomp=seccomp, uid=uid, gid=gid)
+        try:
+            for _ in range(workers):
+                self._idle.put(self._start_worker())
+        except BaseException:
+            self.close()
+            raise
+
+    def _start_worker(self) -> _Worker:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main, args=(child_conn, self.limits, self._jail), name="code-runner", daemon=True
+        )
+        process.start()
+        child_conn.close()
+        worker = _Worker(process, parent_conn)
+        try:
+            error = parent_conn.recv() if parent_conn.poll(30) else "Code runner worker did not start"
+        except (EOFError, OSError) as exc:
+            error = f"Code runner worker failed to start: {exc}"
+        if error:
+            self._stop_worker(worker)
+            raise SandboxError(error)
+        return worker
+
+    @staticmethod
+    def _stop_worker(worker: _Worker) -> None:
+        try:
+            worker.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        worker.process.join(timeout=1)
+        if worker.process.is_alive():
+            worker.process.kill()
+            worker.process.join()
+        worker.conn.close()
+
+    def _acquire(self) -> _Worker:
+        if self._closed:
+            raise SandboxError("The code runner is shut down")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._waiting >= self.max_queue:
+                raise SandboxBusy("Too many submissions are waiting for the code runner")
+            self._waiting += 1
+        try:
+            return self._idle.get(timeout=self.queue_timeout)
+        except queue.Empty:
+            raise SandboxBusy("Timed out waiting for a code runner worker")
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+    def run(self, code: str, test_cases) -> RunResult:
+        """Run ``code`` against stored ``test_cases`` and return one result per test."""
+        tests = parse_test_cases(test_cases)
+        if not tests:
+            return RunResult(results=[])
+        if len(code) > MAX_CODE_CHARS:
+            return RunResult(results=[
+                CaseResult(False, test["source"], test["expected"], error="Submission is too long") for test in tests
+            ])
+
+        worker = self._acquire()
+        healthy = False
+        try:
+            worker.conn.send({"code": code, "tests": tests})
+            # The worker enforces the time limit itself; this only catches a wedged worker
+            if not worker.conn.poll(self.limits.time_limit + 5):
+                raise SandboxError("Code runner worker did not answer")
+            reply = worker.conn.recv()
+            worker.jobs += 1
+            healthy = True
+        except (EOFError, OSError) as exc:
+            raise SandboxError(f"Code runner worker failed: {exc}")
+        finally:
+            if healthy and worker.jobs < self.max_jobs_per_worker and not self._closed:
+                self._idle.put(worker)
+            else:
+                self._stop_worker(worker)
+                if not self._closed:
+                    self._idle.put(self._start_worker())
+
+        results = []
+        outcomes = reply["outcomes"]
+        for index, test in enumerate(tests):
+            if index < len(outcomes):
+                outcome = outcomes[index]
+                results.append(CaseResult(
+                    passed=bool(outcome.get("passed")),
+                    input=test["source"],
+                    expected=test["expected"],
+                    actual=outcome.get("actual"),
+                    error=outcome.get("error"),
+                ))
+            else:
+                if reply["timed_out"]:
+                    error = "Timed out" if index == len(outcomes) else "Not run (time limit reached)"
+                else:
+                    error = reply["crashed"]
+                results.append(CaseResult(False, test["source"], test["expected"], error=error))
+        return RunResult(results=results, timed_out=reply["timed_out"])
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                self._stop_worker(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            os.rmdir(self._jail.cwd)
+        except OSError:
+            pass
+
+
+_pool: Optional[SandboxPool] = None
+_pool_lock = Lock()
+
+
+def get_sandbox_pool() -> Optional[SandboxPool]:
+    """The shared pool, started on first use; None when the code runner is disabled."""
+    global _pool
+    if SANDBOX_WORKERS <= 0 or resource is None:
+        return None
+    pool = _pool
+    if pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = SandboxPool(
+                    SANDBOX_WORKERS,
+                    SandboxLimits(time_limit=SANDBOX_TIME_LIMIT, memory_mb=SANDBOX_MEMORY_MB),
+                    max_queue=SANDBOX_MAX_QUEUE,
+                    user=SANDBOX_USER,
+                )
+            pool = _pool
+    return pool
+
+
+def shutdown_sandbox_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
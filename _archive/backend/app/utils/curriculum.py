@@ -0,0 +1,108 @@
+"""
+Curriculum Cache
+================
+In-process snapshot of the week/task structure used by completion checks,
+plus the quiz -> task mapping used by the quiz completion hook. Weeks, tasks
+and quiz links only change at seed time, usually from another process. Every
+ORM commit that writes Week, Task or QuizTask rows bumps the "curriculum"
+stamp in content_versions, and each lookup reloads the snapshot when the
+stamp has moved.
+"""
+import re
+from dataclasses import dataclass
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..models import Question, QuizTask, Task, Week
+from .cache_events import bump_content_version, content_version, invalidate_on_commit, stamp_on_commit
+
+CURRICULUM = "curriculum"
+
+
+@dataclass(frozen=True)
+class Curriculum:
+    week_numbers: Dict[int, int]  # weeks.id -> week_number
+    week_task_totals: Dict[int, int]  # weeks.id -> number of tasks in that week
+    total_tasks: int
+    quiz_tasks: Dict[str, int]  # quiz_id -> tasks.id of the task the quiz completes
+
+
+_curriculum: Optional[Tuple[int, Curriculum]] = None  # (content stamp, curriculum)
+_curriculum_lock = Lock()
+
+
+def load_curriculum(db: Session) -> Curriculum:
+    """Read the week list, per-week task totals and quiz links (three queries)."""
+    week_numbers = {week_id: number for week_id, number in db.query(Week.id, Week.week_number)}
+    week_task_totals = {
+        week_id: count
+        for week_id, count in db.query(Task.week_id, func.count(Task.id)).group_by(Task.week_id)
+    }
+    return Curriculum(
+        week_numbers=week_numbers,
+        week_task_totals=week_task_totals,
+        total_tasks=sum(week_task_totals.values()),
+        quiz_tasks={quiz_id: task_id for quiz_id, task_id in db.query(QuizTask.quiz_id, QuizTask.task_id)},
+    )
+
+
+def get_curriculum(db: Session) -> Curriculum:
+    """Return the cached curriculum, reloading it when the curriculum stamp has moved."""
+    global _curriculum
+    stamp = content_version(db, CURRICULUM)
+    cached = _curriculum
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    with _curriculum_lock:
+        if _curriculum is None or _curriculum[0] != stamp:
+            _curriculum = (stamp, load_curriculum(db))
+        return _curriculum[1]
+
+
+def invalidate_curriculum() -> None:
+    """Drop the cached curriculum; the next get_curriculum() call reloads it."""
+    global _curriculum
+    with _curriculum_lock:
+        _curriculum = None
+
+
+# "day-5" and "day-5-practice" belong to day 5 of the bootcamp
+_DAY_QUIZ = re.compile(r"^day-(\d+)(?:-|$)")
+
+
+def day_task_id(quiz_id: str) -> Optional[str]:
+    """Task id ("w{week}-d{day}") of a day-N quiz under the 7-day week layout; None for other quiz ids."""
+    match = _DAY_QUIZ.match(quiz_id)
+    if not match or int(match.group(1)) < 1:
+        return None
+    day_num = int(match.group(1))
+    return f"w{(day_num - 1) // 7 + 1}-d{(day_num - 1) % 7 + 1}"
+
+
+def link_day_quizzes(db: Session) -> int:
+    """
+    Link every unlinked day-N quiz that has questions to its day's task.
+    Quizzes with other ids, or whose task does not exist, stay unlinked.
+    Returns the number of links added; the caller commits.
+    """
+    linked = {quiz_id for (quiz_id,) in db.query(QuizTask.quiz_id)}
+    task_ids = {task_id: pk for pk, task_id in db.query(Task.id, Task.task_id)}
+    added = 0
+    for (quiz_id,) in db.query(Question.quiz_id).distinct():
+        task_pk = task_ids.get(day_task_id(quiz_id))
+        if quiz_id not in linked and task_pk is not None:
+            db.add(QuizTask(quiz_id=quiz_id, task_id=task_pk))
+            added += 1
+    db.flush()
+    return added
+
+
+def _bump_curriculum_version(db: Session) -> None:
+    bump_content_version(db, CURRICULUM)
+
+
+invalidate_on_commit((Week, Task, QuizTask), invalidate_curriculum)
+stamp_on_commit((Week, Task, QuizTask), _bump_curriculum_version)
@@ -0,0 +1,220 @@
+"""
+Daily Activity Rollup
+=====================
+Maintains user_daily_activity, one row per user per UTC day with:
+
+    tasks     tasks completed that day
+    quiz_xp   XP credited for quiz submissions
+    reviews   SRS reviews submitted
+    xp        XP from tasks, quizzes and reviews (reward bonuses excluded)
+
+The task, quiz and review write paths call record_daily_activity() in the
+same transaction as the change they mirror; uncompleting a task subtracts
+from the day it was completed. Each call is one INSERT ... ON CONFLICT DO
+UPDATE, so the first two writes of a day cannot race each other. Readers
+fetch a date range with a primary-key range scan instead of grouping
+user_task_statuses by func.date().
+
+rebuild_daily_activity() re-derives the rows in batches of users from the
+source tables: tasks from user_task_statuses, quizzes from quiz_results and
+reviews from user_question_reviews. XP comes from each item's reward ledger
+event. Items from before the ledger use the amounts the app credited then:
+the ledger migration backfilled task events, quizzes earned QUIZ_BASE_XP +
+score, and a review schedule keeps only its latest review. Failed reviews
+post no ledger entry, so one is only counted when it is the latest review
+of a schedule that has no rewarded ones.
+"""
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Optional
+
+from sqlalchemy import case, delete, insert, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..models import (
+    QuizResult,
+    RewardLedgerEntry,
+    User,
+    UserDailyActivity,
+    UserQuestionReview,
+    UserTaskStatus,
+)
+from .gamification import QUIZ_BASE_XP, REVIEW_MASTERY_XP, REVIEW_XP
+
+DAILY_METRICS = ("tasks", "quiz_xp", "reviews", "xp")
+
+TASK_EVENT_PREFIX = "task:"
+QUIZ_EVENT_PREFIX = "quiz-result:"
+REVIEW_EVENT_PREFIX = "srs-review:"
+
+
+def record_daily_activity(db: Session, user_id: int, day: date, **deltas: int) -> None:
+    """Add deltas to one day's counters, e.g. ``record_daily_activity(db, 1, today, tasks=1, xp=10)``."""
+    unknown = set(deltas) - set(DAILY_METRICS)
+    if unknown:
+        raise ValueError(f"Unknown daily metrics: {', '.join(sorted(unknown))}")
+    values = {}
+    for name, delta in deltas.items():
+        if delta:
+            new_value = getattr(UserDailyActivity, name) + delta
+            values[name] = case((new_value < 0, 0), else_=new_value)
+    if not values:
+        return
+
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(UserDailyActivity).values(
+        user_id=user_id,
+        day=day,
+        **{name: max(0, delta) for name, delta in deltas.items()},
+    )
+    db.execute(stmt.on_conflict_do_update(index_elements=["user_id", "day"], set_=values))
+
+
+def daily_activity(
+    db: Session,
+    user_id: int,
+    metric: str,
+    start: date,
+    end: Optional[date] = None,
+) -> Dict[date, int]:
+    """Map of day -> ``metric`` for days in [start, end] where it is non-zero."""
+    if metric not in DAILY_METRICS:
+        raise ValueError(f"Unknown daily metric: {metric}")
+    column = getattr(UserDailyActivity, metric)
+    query = select(UserDailyActivity.day, column).where(
+        UserDailyActivity.user_id == user_id,
+        UserDailyActivity.day >= start,
+        column > 0,
+    )
+    if end is not None:
+        query = query.where(UserDailyActivity.day <= end)
+    return {day: value for day, value in db.execute(query.order_by(UserDailyActivity.day))}
+
+
+# =============================================================================
+# Backfill / rebuild
+# =============================================================================
+def _legacy_review_xp(success_count: Optional[int], is_mastered: Optional[bool]) -> int:
+    """XP the latest review of a schedule earned (a failed review resets success_count)."""
+    if not success_count:
+        return 0
+    return REVIEW_MASTERY_XP if is_mastered else REVIEW_XP
+
+
+def _rollup_users(db: Session, first_id: int, last_id: int) -> list:
+    """Derive rollup rows for users with first_id <= id <= last_id."""
+    days = defaultdict(lambda: dict.fromkeys(DAILY_METRICS, 0))
+
+    event_xp = defaultdict(int)  # (user_id, event_key) -> net XP of task and quiz events
+    review_entries = defaultdict(list)  # (user_id, event_key) -> [(xp_delta, created_at)]
+    for user_id, event_key, xp_delta, created_at in db.execute(
+        select(
+            RewardLedgerEntry.user_id,
+            RewardLedgerEntry.event_key,
+            RewardLedgerEntry.xp_delta,
+            RewardLedgerEntry.created_at,
+        ).where(
+            RewardLedgerEntry.user_id.between(first_id, last_id),
+            or_(
+                RewardLedgerEntry.event_key.startswith(TASK_EVENT_PREFIX),
+                RewardLedgerEntry.event_key.startswith(QUIZ_EVENT_PREFIX),
+                RewardLedgerEntry.event_key.startswith(REVIEW_EVENT_PREFIX),
+            ),
+        )
+    ):
+        if event_key.startswith(REVIEW_EVENT_PREFIX):
+            review_entries[(user_id, event_key)].append((xp_delta, created_at))
+        else:
+            event_xp[(user_id, event_key)] += xp_delta
+
+    # Task XP, credits and undos netted, counts on the day the task is completed now
+    for user_id, task_id, completed_at in db.execute(
+        select(UserTaskStatus.user_id, UserTaskStatus.task_id, UserTaskStatus.completed_at).where(
+            UserTaskStatus.user_id.between(first_id, last_id),
+            UserTaskStatus.completed,
+            UserTaskStatus.completed_at.isnot(None),
+        )
+    ):
+        counters = days[(user_id, completed_at.date())]
+        counters["tasks"] += 1
+        counters["xp"] += event_xp.get((user_id, f"{TASK_EVENT_PREFIX}{task_id}"), 0)
+
+    # Quiz results from before the ledger have no event; they earned QUIZ_BASE_XP + score
+    for result_id, user_id, score, completed_at in db.execute(
+        select(QuizResult.id, QuizResult.user_id, QuizResult.score, QuizResult.completed_at).where(
+            QuizResult.user_id.between(first_id, last_id),
+            QuizResult.completed_at.isnot(None),
+        )
+    ):
+        xp = event_xp.get((user_id, f"{QUIZ_EVENT_PREFIX}{result_id}"), QUIZ_BASE_XP + (score or 0))
+        counters = days[(user_id, completed_at.date())]
+        counters["quiz_xp"] += xp
+        counters["xp"] += xp
+
+    # Reviews: every rewarded one since the ledger, and the latest review of
+    # schedules the ledger has never seen (failed or from before it)
+    for (user_id, _), entries in review_entries.items():
+        for xp_delta, created_at in entries:
+            counters = days[(user_id, created_at.date())]
+            counters["xp"] += xp_delta
+            if xp_delta > 0:
+                counters["reviews"] += 1
+    for review_id, user_id, last_reviewed_at, success_count, is_mastered in db.execute(
+        select(
+            UserQuestionReview.id,
+            UserQuestionReview.user_id,
+            UserQuestionReview.last_reviewed_at,
+            UserQuestionReview.success_count,
+            UserQuestionReview.is_mastered,
+        ).where(
+            UserQuestionReview.user_id.between(first_id, last_id),
+            UserQuestionReview.last_reviewed_at.isnot(None),
+        )
+    ):
+        if (user_id, f"{REVIEW_EVENT_PREFIX}{review_id}") not in review_entries:
+            counters = days[(user_id, last_reviewed_at.date())]
+            counters["reviews"] += 1
+            counters["xp"] += _legacy_review_xp(success_count, is_mastered)
+
+    return [
+        {"user_id": user_id, "day": day, **{name: max(0, value) for name, value in counters.items()}}
+        for (user_id, day), counters in days.items()
+        if any(counters.values())
+    ]
+
+
+def rebuild_daily_activity(
+    db: Session,
+    user_id: Optional[int] = None,
+    batch_size: int = 500,
+    commit: bool = True,
+) -> int:
+    """
+    Recompute user_daily_activity for one user (or everyone, ``batch_size``
+    users at a time by id range). Each batch is committed unless ``commit``
+    is False, so a full backfill never holds one long transaction.
+    Returns the number of rows written.
+    """
+    written = 0
+    last_seen = 0
+    while True:
+        ids = select(User.id).order_by(User.id)
+        if user_id is not None:
+            ids = ids.where(User.id == user_id)
+        ids = db.execute(ids.where(User.id > last_seen).limit(batch_size)).scalars().all()
+        if not ids:
+            return written
+        first_id, last_seen = ids[0], ids[-1]
+
+        db.execute(
+            delete(UserDailyActivity)
+            .where(UserDailyActivity.user_id.between(first_id, last_seen))
+            .execution_options(synchronize_session=False)
+        )
+        rows = _rollup_users(db, first_id, last_seen)
+        if rows:
+            db.execute(insert(UserDailyActivity), rows)
+        written += len(rows)
+        if commit:
+            db.commit()
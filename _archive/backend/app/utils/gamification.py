@@ -4,15 +4,33 @@ Gamification Utilities
 Centralized module for XP, level, streak, and focus point calculations.
 All gamification logic should be imported from here to avoid duplication.
 """
+from bisect import bisect_right
+from dataclasses import dataclass
 from datetime import datetime, date
+from threading import Lock
+from typing import Iterable, List, Optional
 
 # =============================================================================
 # Constants
 # =============================================================================
 FOCUS_CAP = 5
+PENALTY_FREEZE = "freeze"  # A missed day consumes a streak freeze
+PENALTY_HEART = "heart"  # A missed day costs a heart and resets the streak
 XP_EXPONENT = 1.2
 XP_BASE = 100
 
+# Bonus multiplier applied to badge/achievement xp_value by difficulty
+REWARD_MULTIPLIER = {
+    "trivial": 1.0,
+    "normal": 1.0,
+    "hard": 1.5,
+    "epic": 2.0,
+}
+
+QUIZ_BASE_XP = 10  # A quiz submission credits QUIZ_BASE_XP + score
+REVIEW_XP = 10  # A correct SRS review
+REVIEW_MASTERY_XP = 100  # A correct SRS review of a mastered question
+
 
 # =============================================================================
 # XP and Level Functions
@@ -25,17 +43,46 @@ def xp_for_next_level(level: int) -> int:
     return int(XP_BASE * (level ** XP_EXPONENT))
 
 
+# Cumulative XP table: _CUMULATIVE_XP[i] is the total XP needed to reach level i + 1.
+# Grown lazily so lookups never re-walk the curve level by level.
+_CUMULATIVE_XP: List[int] = [0]
+_CUMULATIVE_XP_LOCK = Lock()
+
+
+def _extend_table(min_levels: int = 0, min_xp: int = -1) -> None:
+    """Grow the cumulative XP table to hold min_levels entries and exceed min_xp."""
+    with _CUMULATIVE_XP_LOCK:
+        while len(_CUMULATIVE_XP) < min_levels or _CUMULATIVE_XP[-1] <= min_xp:
+            level = len(_CUMULATIVE_XP)
+            _CUMULATIVE_XP.append(_CUMULATIVE_XP[-1] + xp_for_next_level(level))
+
+
+def _ensure_table_covers(xp: int) -> None:
+    """Make sure the table's last entry is beyond ``xp`` (cheap when already true)."""
+    if _CUMULATIVE_XP[-1] <= xp:
+        _extend_table(min_xp=xp)
+
+
 def level_from_xp(xp: int) -> int:
     """
     Calculate level based on total XP.
-    Iterates through levels until XP is exhausted.
+    Binary-searches the precomputed cumulative XP table.
+    """
+    _ensure_table_covers(xp)
+    return max(1, bisect_right(_CUMULATIVE_XP, xp))
+
+
+def levels_from_xp(xp_values: Iterable[int]) -> List[int]:
+    """
+    Batch variant of level_from_xp for leaderboards and bulk recomputes.
+    Grows the table once for the largest value, then bisects each entry.
     """
-    level = 1
-    remaining = xp
-    while remaining >= xp_for_next_level(level):
-        remaining -= xp_for_next_level(level)
-        level += 1
-    return level
+    values = list(xp_values)
+    if not values:
+        return []
+    _ensure_table_covers(max(values))
+    table = _CUMULATIVE_XP
+    return [max(1, bisect_right(table, xp)) for xp in values]
 
 
 def next_level_requirement(xp: int) -> int:
@@ -48,15 +95,20 @@ def cumulative_xp_to_level(level: int) -> int:
     """Calculate total XP required to reach a given level from level 1."""
     if level <= 1:
         return 0
-    total = 0
-    for i in range(1, level):
-        total += xp_for_next_level(i)
-    return total
+    if len(_CUMULATIVE_XP) < level:
+        _extend_table(min_levels=level)
+    return _CUMULATIVE_XP[level - 1]
 
 
 # =============================================================================
 # Focus Points Functions
 # =============================================================================
+def focus_refresh_due(user, today: Optional[date] = None) -> bool:
+    """True when the daily focus refill has not been applied yet today."""
+    today = today or date.today()
+    return not user.focus_refreshed_at or user.focus_refreshed_at.date() < today
+
+
 def refresh_focus_points(user, focus_cap: int = FOCUS_CAP) -> None:
     """
     Refresh focus points once per day.
@@ -66,8 +118,7 @@ def refresh_focus_points(user, focus_cap: int = FOCUS_CAP) -> None:
         user: User model instance with focus_points and focus_refreshed_at attributes
         focus_cap: Maximum focus points (default: 5)
     """
-    today = date.today()
-    if not user.focus_refreshed_at or user.focus_refreshed_at.date() < today:
+    if focus_refresh_due(user):
         user.focus_points = focus_cap
         user.focus_refreshed_at = datetime.utcnow()
 
@@ -103,6 +154,37 @@ def update_streak(user) -> None:
     user.last_checkin_at = datetime.utcnow()
 
 
+def pending_penalty(user, today: Optional[date] = None) -> Optional[str]:
+    """
+    The penalty check_penalty() would apply now, without applying it:
+    PENALTY_FREEZE, PENALTY_HEART or None.
+
+    Args:
+        user: User model instance with hearts, streak_freeze_count,
+              last_checkin_at, and last_heart_loss attributes
+    """
+    today = today or date.today()
+
+    # If never checked in, no penalty yet (grace period)
+    if not user.last_checkin_at:
+        return None
+
+    # Only a miss of more than 1 day (yesterday) is penalized
+    if (today - user.last_checkin_at.date()).days <= 1:
+        return None
+
+    # Only penalize once per inactive period:
+    # If last_heart_loss occurred AFTER last_checkin_at, we already penalized
+    if user.last_heart_loss and user.last_heart_loss >= user.last_checkin_at:
+        return None
+
+    if (user.streak_freeze_count or 0) > 0:
+        return PENALTY_FREEZE
+    if (user.hearts or 0) > 0:
+        return PENALTY_HEART
+    return None
+
+
 def check_penalty(user) -> None:
     """
     Check if user missed a day and apply penalty.
@@ -113,32 +195,59 @@ def check_penalty(user) -> None:
         user: User model instance with hearts, streak, streak_freeze_count,
               last_checkin_at, and last_heart_loss attributes
     """
-    today = date.today()
+    penalty = pending_penalty(user)
+    if penalty == PENALTY_FREEZE:
+        user.streak_freeze_count -= 1
+        # Mark penalty time to prevent multiple freeze consumptions
+        user.last_heart_loss = datetime.utcnow()
+    elif penalty == PENALTY_HEART:
+        user.hearts -= 1
+        user.last_heart_loss = datetime.utcnow()
+        # Reset streak on penalty
+        user.streak = 0
 
-    # If never checked in, no penalty yet (grace period)
-    if not user.last_checkin_at:
-        return
-
-    last_checkin_date = user.last_checkin_at.date()
-    days_since_checkin = (today - last_checkin_date).days
-
-    # If missed more than 1 day (yesterday), apply penalty
-    if days_since_checkin > 1:
-        # Only penalize once per inactive period:
-        # If last_heart_loss occurred AFTER last_checkin_at, we already penalized
-        if user.last_heart_loss and user.last_heart_loss >= user.last_checkin_at:
-            return
-
-        # Check if user has a streak freeze to consume
-        if user.streak_freeze_count > 0:
-            user.streak_freeze_count -= 1
-            # Mark penalty time to prevent multiple freeze consumptions
-            user.last_heart_loss = datetime.utcnow()
-            return
-
-        # No streak freeze available - apply full penalty
-        if user.hearts > 0:
-            user.hearts -= 1
-            user.last_heart_loss = datetime.utcnow()
-            # Reset streak on penalty
-            user.streak = 0
+
+# =============================================================================
+# Lazy State
+# =============================================================================
+@dataclass(frozen=True)
+class Vitals:
+    """Focus, hearts, streak and streak freezes as they stand today."""
+    focus_points: int
+    hearts: int
+    streak: int
+    streak_freeze_count: int
+    focus_refresh_due: bool
+    penalty: Optional[str]  # PENALTY_FREEZE / PENALTY_HEART not yet persisted
+
+
+def resolve_vitals(user, focus_cap: int = FOCUS_CAP, today: Optional[date] = None) -> Vitals:
+    """
+    Derive the user's current vitals from the stored values and timestamps
+    without modifying the user. Reads use this; settle_vitals() persists the
+    same result on the next write.
+    """
+    refresh_due = focus_refresh_due(user, today)
+    penalty = pending_penalty(user, today)
+    hearts = user.hearts or 0
+    streak = user.streak or 0
+    freezes = user.streak_freeze_count or 0
+    if penalty == PENALTY_FREEZE:
+        freezes -= 1
+    elif penalty == PENALTY_HEART:
+        hearts -= 1
+        streak = 0
+    return Vitals(
+        focus_points=focus_cap if refresh_due else (user.focus_points or 0),
+        hearts=hearts,
+        streak=streak,
+        streak_freeze_count=freezes,
+        focus_refresh_due=refresh_due,
+        penalty=penalty,
+    )
+
+
+def settle_vitals(user, focus_cap: int = FOCUS_CAP) -> None:
+    """Persist what resolve_vitals() reports: the daily focus refill and any missed-day penalty."""
+    refresh_focus_points(user, focus_cap)
+    check_penalty(user)
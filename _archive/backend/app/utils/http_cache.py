@@ -0,0 +1,39 @@
+"""
+Conditional GET helpers (ETag / If-None-Match).
+
+Endpoints build an ETag from cheap version inputs (cached catalog versions,
+per-user change markers) before doing the expensive part of the request, and
+return 304 Not Modified when the client already holds that representation.
+"""
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+CACHE_CONTROL = "private, no-cache"  # Clients may store responses but must revalidate
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag from the repr of ``parts`` (order matters)."""
+    digest = hashlib.sha1("|".join(repr(part) for part in parts).encode("utf-8"))
+    return f'"{digest.hexdigest()[:20]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates or "*" in candidates
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Set the ETag on ``response``; return a 304 response if the client's copy is
+    current, otherwise None so the endpoint builds the full body.
+    """
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    return None
@@ -0,0 +1,132 @@
+"""
+Leaderboards
+============
+Maintained tables behind the quiz and XP leaderboards.
+
+quiz_best_scores holds one row per (user, quiz) with the user's best attempt,
+updated by record_best_score() whenever a QuizResult is written, so the quiz
+leaderboard pages through ix_quiz_best_scores_rank with keyset cursors
+instead of sorting every attempt.
+
+The XP leaderboard pages users through ix_users_xp_rank. A user's rank is
+1 + the number of users with more XP. Counting those rows would walk every
+user above them, so xp_rank_buckets keeps a count of users per band of
+RANK_BUCKET_XP XP, moved by the ledger whenever a total crosses a band
+boundary. xp_rank() sums the bands above the user's own and counts only the
+users inside that band. Band 0 is never stored: users there are covered by the
+in-band count.
+"""
+from typing import Optional, Tuple
+
+from sqlalchemy import and_, case, delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..models import QuizBestScore, QuizResult, User, XpRankBucket
+
+RANK_BUCKET_XP = 100
+
+
+def record_best_score(db: Session, result: QuizResult) -> None:
+    """
+    Make ``result`` the user's best for its quiz if it beats the stored one.
+    Call after the result has been flushed (it needs id and completed_at).
+    Ties keep the earlier attempt.
+    """
+    values = {
+        "result_id": result.id,
+        "score": result.score or 0,
+        "total_questions": result.total_questions or 0,
+        "achieved_at": result.completed_at,
+    }
+    # One upsert: concurrent first results for the same quiz cannot collide on the key
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(QuizBestScore).values(user_id=result.user_id, quiz_id=result.quiz_id, **values)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["user_id", "quiz_id"],
+        set_={name: stmt.excluded[name] for name in values},
+        where=QuizBestScore.score < stmt.excluded.score,
+    ))
+
+
+def rebuild_best_scores(db: Session, user_id: Optional[int] = None) -> int:
+    """Recompute quiz_best_scores from quiz_results. Returns rows written; the caller commits."""
+    ranked = select(
+        QuizResult.user_id,
+        QuizResult.quiz_id,
+        QuizResult.id.label("result_id"),
+        func.coalesce(QuizResult.score, 0).label("score"),
+        func.coalesce(QuizResult.total_questions, 0).label("total_questions"),
+        QuizResult.completed_at.label("achieved_at"),
+        func.row_number().over(
+            partition_by=(QuizResult.user_id, QuizResult.quiz_id),
+            order_by=(QuizResult.score.desc(), QuizResult.completed_at, QuizResult.id),
+        ).label("position"),
+    )
+    clear = delete(QuizBestScore)
+    if user_id is not None:
+        ranked = ranked.where(QuizResult.user_id == user_id)
+        clear = clear.where(QuizBestScore.user_id == user_id)
+    ranked = ranked.subquery()
+
+    db.execute(clear)
+    columns = ["user_id", "quiz_id", "result_id", "score", "total_questions", "achieved_at"]
+    return db.execute(
+        insert(QuizBestScore).from_select(
+            columns,
+            select(*(ranked.c[name] for name in columns)).where(ranked.c.position == 1),
+        )
+    ).rowcount
+
+
+def _adjust_bucket(db: Session, bucket: int, delta: int) -> None:
+    if bucket < 1:
+        return
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    new_value = XpRankBucket.users + delta
+    stmt = dialect.insert(XpRankBucket).values(bucket=bucket, users=max(0, delta))
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["bucket"],
+        set_={"users": case((new_value < 0, 0), else_=new_value)},
+    ))
+
+
+def move_xp_bucket(db: Session, old_xp: int, new_xp: int) -> None:
+    """Keep xp_rank_buckets in step with one user's total going from old_xp to new_xp."""
+    old_bucket = (old_xp or 0) // RANK_BUCKET_XP
+    new_bucket = (new_xp or 0) // RANK_BUCKET_XP
+    if old_bucket != new_bucket:
+        _adjust_bucket(db, old_bucket, -1)
+        _adjust_bucket(db, new_bucket, 1)
+
+
+def rebuild_xp_rank_buckets(db: Session) -> int:
+    """Recount xp_rank_buckets from users.xp. Returns bands written; the caller commits."""
+    bucket = func.coalesce(User.xp, 0) // RANK_BUCKET_XP
+    db.execute(delete(XpRankBucket))
+    return db.execute(
+        insert(XpRankBucket).from_select(
+            ["bucket", "users"],
+            select(bucket, func.count(User.id))
+            .where(func.coalesce(User.xp, 0) >= RANK_BUCKET_XP)
+            .group_by(bucket),
+        )
+    ).rowcount
+
+
+def xp_rank(db: Session, user_id: int) -> Optional[Tuple[int, int]]:
+    """(xp, rank) for a user, rank 1 being the most XP (ties share a rank); None if unknown."""
+    xp = db.execute(select(func.coalesce(User.xp, 0)).where(User.id == user_id)).scalar()
+    if xp is None:
+        return None
+    bucket = xp // RANK_BUCKET_XP
+    above_bands = db.execute(
+        select(func.coalesce(func.sum(XpRankBucket.users), 0)).where(XpRankBucket.bucket > bucket)
+    ).scalar()
+    above_in_band = db.execute(
+        select(func.count(User.id)).where(and_(
+            User.xp > xp,
+            User.xp < (bucket + 1) * RANK_BUCKET_XP,
+        ))
+    ).scalar()
+    return xp, 1 + int(above_bands) + int(above_in_band)
@@ -0,0 +1,236 @@
+"""
+Reward Ledger
+=============
+Append-only record of every XP/gold change, keyed by the event that caused it.
+
+Event keys identify what a delta is for ("task:12", "badge:b-week-1",
+"quiz-result:40", ...). Undoing an event never edits history: it appends one
+compensating entry equal to minus the event's current net total, so repeating
+an undo is a no-op and re-earning the same reward later simply adds to it.
+
+users.xp / users.gold remain the fast-read totals; they always move together
+with a ledger entry, so they can be rebuilt with a single SUM and audited with
+verify_ledger(). Totals are changed with atomic in-database increments rather
+than ORM read-modify-write, so concurrent requests for the same user cannot
+lose updates or overspend gold. A total that crosses into another XP band
+also moves the user's count in xp_rank_buckets (see leaderboard.py).
+"""
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from ..models import RewardLedgerEntry, User
+from .leaderboard import move_xp_bucket, rebuild_xp_rank_buckets
+
+
+def task_event(task_id: int) -> str:
+    return f"task:{task_id}"
+
+
+def badge_event(code: str) -> str:
+    return f"badge:{code}"
+
+
+def achievement_event(code: str) -> str:
+    return f"achievement:{code}"
+
+
+def _add_to_totals(db: Session, user, xp: int, gold: int, guard: bool = True) -> bool:
+    """
+    Atomically add deltas to the user row (``xp = xp + :n``). With ``guard``,
+    debits only apply while the balance covers them (``WHERE gold >= :c``).
+    The returned totals are written back to ``user`` as committed state so a
+    later flush never overwrites the database value with a stale one.
+    """
+    stmt = update(User).where(User.id == user.id).values(
+        xp=func.coalesce(User.xp, 0) + xp,
+        gold=func.coalesce(User.gold, 0) + gold,
+    ).execution_options(synchronize_session=False)
+    if guard and xp < 0:
+        stmt = stmt.where(func.coalesce(User.xp, 0) >= -xp)
+    if guard and gold < 0:
+        stmt = stmt.where(func.coalesce(User.gold, 0) >= -gold)
+
+    if db.get_bind().dialect.update_returning:
+        totals = db.execute(stmt.returning(User.xp, User.gold)).first()
+    elif db.execute(stmt).rowcount:
+        totals = db.execute(select(User.xp, User.gold).where(User.id == user.id)).first()
+    else:
+        totals = None
+    if totals is None:
+        return False
+    move_xp_bucket(db, totals[0] - xp, totals[0])
+    set_committed_value(user, "xp", totals[0])
+    set_committed_value(user, "gold", totals[1])
+    return True
+
+
+def _post(
+    db: Session,
+    user,
+    entries: List[Tuple[str, str, int, int]],
+    clamp: bool = True,
+) -> Optional[Tuple[int, int]]:
+    """
+    Apply (event_key, source, xp, gold) deltas to the user's totals and append
+    them to the ledger. Returns the applied (xp, gold) deltas.
+
+    Debits that would take a total below zero are clamped (``clamp=True``,
+    used for undo) or rejected with None and nothing written (``clamp=False``,
+    used for spending). The ledger stores the delta actually applied so SUM()
+    always matches the user row.
+    """
+    entries = [entry for entry in entries if entry[2] or entry[3]]
+    if not entries:
+        return 0, 0
+    xp = sum(entry[2] for entry in entries)
+    gold = sum(entry[3] for entry in entries)
+
+    if not _add_to_totals(db, user, xp, gold):
+        if not clamp:
+            return None
+        # Rare path: lock the row and clamp entry by entry from its current totals
+        xp_total, gold_total = db.execute(
+            select(func.coalesce(User.xp, 0), func.coalesce(User.gold, 0))
+            .where(User.id == user.id)
+            .with_for_update()
+        ).one()
+        clamped = []
+        for event_key, source, entry_xp, entry_gold in entries:
+            entry_xp = max(-xp_total, entry_xp)
+            entry_gold = max(-gold_total, entry_gold)
+            xp_total += entry_xp
+            gold_total += entry_gold
+            if entry_xp or entry_gold:
+                clamped.append((event_key, source, entry_xp, entry_gold))
+        entries = clamped
+        xp = sum(entry[2] for entry in entries)
+        gold = sum(entry[3] for entry in entries)
+        if not entries:
+            return 0, 0
+        _add_to_totals(db, user, xp, gold, guard=False)
+
+    now = datetime.utcnow()
+    db.execute(insert(RewardLedgerEntry), [
+        {
+            "user_id": user.id,
+            "event_key": event_key,
+            "source": source,
+            "xp_delta": entry_xp,
+            "gold_delta": entry_gold,
+            "created_at": now,
+        }
+        for event_key, source, entry_xp, entry_gold in entries
+    ])
+    return xp, gold
+
+
+def credit(db: Session, user, event_key: str, source: str, xp: int = 0, gold: int = 0) -> Tuple[int, int]:
+    """Record one XP/gold change (negative values debit). Returns the applied deltas."""
+    return _post(db, user, [(event_key, source, xp, gold)])
+
+
+def charge(db: Session, user, event_key: str, source: str, xp: int = 0, gold: int = 0) -> bool:
+    """Spend XP/gold (positive amounts) only if the balance covers it. Returns False otherwise."""
+    return _post(db, user, [(event_key, source, -xp, -gold)], clamp=False) is not None
+
+
+def credit_many(db: Session, user, entries: Iterable[Tuple[str, str, int, int]]) -> Tuple[int, int]:
+    """Record several (event_key, source, xp, gold) changes with one INSERT."""
+    return _post(db, user, list(entries))
+
+
+def event_totals(db: Session, user_id: int, event_keys: Iterable[str]) -> Dict[str, Tuple[int, int]]:
+    """Net (xp, gold) per event key for one user."""
+    keys = list(event_keys)
+    if not keys:
+        return {}
+    rows = db.execute(
+        select(
+            RewardLedgerEntry.event_key,
+            func.sum(RewardLedgerEntry.xp_delta),
+            func.sum(RewardLedgerEntry.gold_delta),
+        )
+        .where(RewardLedgerEntry.user_id == user_id, RewardLedgerEntry.event_key.in_(keys))
+        .group_by(RewardLedgerEntry.event_key)
+    )
+    return {key: (int(xp or 0), int(gold or 0)) for key, xp, gold in rows}
+
+
+def reverse_events(db: Session, user, event_keys: Iterable[str], source: str = "undo") -> Tuple[int, int]:
+    """
+    Append compensating entries that bring each event's net total back to zero.
+    Returns the applied (xp, gold) deltas, which are zero or negative.
+    """
+    totals = event_totals(db, user.id, event_keys)
+    return _post(db, user, [
+        (key, source, -xp, -gold) for key, (xp, gold) in totals.items() if xp or gold
+    ])
+
+
+def reverse_event(db: Session, user, event_key: str, source: str = "undo") -> Tuple[int, int]:
+    return reverse_events(db, user, [event_key], source=source)
+
+
+# =============================================================================
+# Bulk verification / rebuild
+# =============================================================================
+def _ledger_sums():
+    return (
+        select(
+            RewardLedgerEntry.user_id.label("user_id"),
+            func.sum(RewardLedgerEntry.xp_delta).label("xp"),
+            func.sum(RewardLedgerEntry.gold_delta).label("gold"),
+        )
+        .group_by(RewardLedgerEntry.user_id)
+        .subquery()
+    )
+
+
+def verify_ledger(db: Session) -> List[dict]:
+    """Compare every user's xp/gold with the ledger in one query; return the drifted rows."""
+    sums = _ledger_sums()
+    ledger_xp = func.coalesce(sums.c.xp, 0)
+    ledger_gold = func.coalesce(sums.c.gold, 0)
+    rows = db.execute(
+        select(User.id, func.coalesce(User.xp, 0), func.coalesce(User.gold, 0), ledger_xp, ledger_gold)
+        .outerjoin(sums, sums.c.user_id == User.id)
+        .where((func.coalesce(User.xp, 0) != ledger_xp) | (func.coalesce(User.gold, 0) != ledger_gold))
+        .order_by(User.id)
+    )
+    return [
+        {
+            "user_id": user_id,
+            "xp": xp,
+            "ledger_xp": int(l_xp),
+            "gold": gold,
+            "ledger_gold": int(l_gold),
+        }
+        for user_id, xp, gold, l_xp, l_gold in rows
+    ]
+
+
+def rebuild_totals_from_ledger(db: Session, user_id: Optional[int] = None) -> int:
+    """
+    Overwrite users.xp/gold with their ledger sums and recount the XP rank
+    bands. Returns rows updated; the caller commits.
+    """
+    xp_sum = (
+        select(func.coalesce(func.sum(RewardLedgerEntry.xp_delta), 0))
+        .where(RewardLedgerEntry.user_id == User.id)
+        .scalar_subquery()
+    )
+    gold_sum = (
+        select(func.coalesce(func.sum(RewardLedgerEntry.gold_delta), 0))
+        .where(RewardLedgerEntry.user_id == User.id)
+        .scalar_subquery()
+    )
+    stmt = update(User).values(xp=xp_sum, gold=gold_sum).execution_options(synchronize_session=False)
+    if user_id is not None:
+        stmt = stmt.where(User.id == user_id)
+    rows = db.execute(stmt).rowcount
+    rebuild_xp_rank_buckets(db)
+    return rows
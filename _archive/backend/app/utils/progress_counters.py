@@ -0,0 +1,92 @@
+"""
+Progress Counters
+=================
+Maintains user_week_progress, a per-user/per-week count of completed tasks.
+
+Counters are adjusted with an in-database increment (one INSERT ... ON
+CONFLICT DO UPDATE, so a user's first write to a week cannot race another)
+in the same transaction as the UserTaskStatus change they mirror, so
+completion checks read a handful of primary-key rows instead of counting the
+user's whole completion history.
+rebuild_progress_counters() recomputes them from UserTaskStatus and is the
+reconciliation path if they are ever suspected to drift.
+"""
+from typing import Dict, Optional
+
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..models import Task, UserTaskStatus, UserWeekProgress
+
+
+def adjust_week_progress(db: Session, user_id: int, week_id: int, delta: int) -> None:
+    """Add ``delta`` (+1 on completion, -1 on uncomplete) to a user's week counter."""
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    new_value = UserWeekProgress.tasks_completed + delta
+    stmt = dialect.insert(UserWeekProgress).values(
+        user_id=user_id, week_id=week_id, tasks_completed=max(0, delta)
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["user_id", "week_id"],
+        set_={"tasks_completed": case((new_value < 0, 0), else_=new_value)},
+    ))
+
+
+def week_tasks_completed(db: Session, user_id: int, week_id: int) -> int:
+    """Completed task count for one week (primary-key read)."""
+    count = db.execute(
+        select(UserWeekProgress.tasks_completed).where(
+            UserWeekProgress.user_id == user_id, UserWeekProgress.week_id == week_id
+        )
+    ).scalar()
+    return count or 0
+
+
+def user_week_progress(db: Session, user_id: int) -> Dict[int, int]:
+    """Map of week_id -> completed task count for every week the user has touched."""
+    rows = db.execute(
+        select(UserWeekProgress.week_id, UserWeekProgress.tasks_completed).where(
+            UserWeekProgress.user_id == user_id
+        )
+    )
+    return {week_id: count for week_id, count in rows}
+
+
+def user_tasks_completed(db: Session, user_id: int) -> int:
+    """Total completed tasks across all weeks (sums at most one row per week)."""
+    total = db.execute(
+        select(func.sum(UserWeekProgress.tasks_completed)).where(
+            UserWeekProgress.user_id == user_id
+        )
+    ).scalar()
+    return int(total or 0)
+
+
+def rebuild_progress_counters(db: Session, user_id: Optional[int] = None) -> int:
+    """
+    Recompute counters from UserTaskStatus for one user (or everyone).
+    Returns the number of counter rows written. The caller commits.
+    """
+    clear = delete(UserWeekProgress)
+    source = (
+        select(
+            UserTaskStatus.user_id,
+            Task.week_id,
+            func.count(UserTaskStatus.id),
+        )
+        .join(Task, Task.id == UserTaskStatus.task_id)
+        .where(UserTaskStatus.completed)
+        .group_by(UserTaskStatus.user_id, Task.week_id)
+    )
+    if user_id is not None:
+        clear = clear.where(UserWeekProgress.user_id == user_id)
+        source = source.where(UserTaskStatus.user_id == user_id)
+
+    db.execute(clear.execution_options(synchronize_session=False))
+    result = db.execute(
+        insert(UserWeekProgress).from_select(
+            ["user_id", "week_id", "tasks_completed"], source
+        )
+    )
+    return result.rowcount
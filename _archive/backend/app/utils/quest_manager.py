@@ -1,38 +1,131 @@
 """
-Helper function to assign next quest when current one is completed.
+Quest Progression
+=================
+Quests form one ordered chain per course (Quest.course_id, NULL being the
+default chain), ordered by Quest.position with unpositioned quests last by id.
+The chains are cached like the curriculum: every ORM commit that writes Quest
+rows bumps the "quests" stamp in content_versions, and lookups reload the
+chains when the stamp has moved, whichever process made the change.
+
+Every UserQuest records the chain it came from and its index in that chain,
+so the quest after it is ``chain[chain_index + 1]``: a lookup in the cached
+list instead of collecting the user's completed quests and scanning quests
+with NOT IN.
 """
+from dataclasses import dataclass
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
+
 from ..models import Quest, UserQuest
+from .cache_events import bump_content_version, content_version, invalidate_on_commit, stamp_on_commit
+
+QUESTS = "quests"
+
+
+@dataclass(frozen=True)
+class QuestEntry:
+    id: int
+    boss_hp: int
+
+
+@dataclass(frozen=True)
+class QuestChain:
+    entries: Tuple[QuestEntry, ...]
+    index_of: Dict[int, int]  # quests.id -> position in entries
+
+
+EMPTY_CHAIN = QuestChain(entries=(), index_of={})
+
+_chains: Optional[Tuple[int, Dict[Optional[int], QuestChain]]] = None  # (content stamp, chains)
+_chains_lock = Lock()
+
 
+def load_quest_chains(db: Session) -> Dict[Optional[int], QuestChain]:
+    """Read every quest once and order it into per-course chains."""
+    rows = db.execute(select(Quest.id, Quest.course_id, Quest.position, Quest.boss_hp)).all()
+    by_course: Dict[Optional[int], list] = {}
+    for row in sorted(rows, key=lambda r: (r.position is None, r.position or 0, r.id)):
+        by_course.setdefault(row.course_id, []).append(QuestEntry(id=row.id, boss_hp=row.boss_hp or 0))
+    return {
+        course_id: QuestChain(
+            entries=tuple(entries),
+            index_of={entry.id: index for index, entry in enumerate(entries)},
+        )
+        for course_id, entries in by_course.items()
+    }
 
-def assign_next_quest(db: Session, user_id: int) -> UserQuest | None:
+
+def get_quest_chain(db: Session, course_id: Optional[int] = None) -> QuestChain:
+    """Return the cached chain for a course (None = default chain)."""
+    global _chains
+    stamp = content_version(db, QUESTS)
+    cached = _chains
+    if cached is None or cached[0] != stamp:
+        with _chains_lock:
+            if _chains is None or _chains[0] != stamp:
+                _chains = (stamp, load_quest_chains(db))
+            cached = _chains
+    return cached[1].get(course_id, EMPTY_CHAIN)
+
+
+def invalidate_quest_chains() -> None:
+    global _chains
+    with _chains_lock:
+        _chains = None
+
+
+def _bump_quest_version(db: Session) -> None:
+    bump_content_version(db, QUESTS)
+
+
+invalidate_on_commit((Quest,), invalidate_quest_chains)
+stamp_on_commit((Quest,), _bump_quest_version)
+
+
+def assign_next_quest(
+    db: Session,
+    user_id: int,
+    after: Optional[UserQuest] = None,
+    course_id: Optional[int] = None,
+) -> UserQuest | None:
     """
-    Assign the next available quest to a user.
-    Returns the new UserQuest if assigned, None if no more quests.
+    Assign the next quest in a chain to a user.
+
+    With ``after`` (the quest just completed) the next quest follows it in
+    its own chain. Without it, the user resumes after the furthest quest they
+    have completed in ``course_id``'s chain.
+    Returns the new UserQuest if assigned, None if the chain is finished.
     """
-    # Get all quests the user has completed
-    completed_quest_ids = [
-        uq.quest_id
-        for uq in db.query(UserQuest).filter(
-            UserQuest.user_id == user_id,
-            UserQuest.completed_at.isnot(None)
-        ).all()
-    ]
-
-    # Find the first quest not yet completed
-    query = db.query(Quest)
-    if completed_quest_ids:
-        query = query.filter(Quest.id.notin_(completed_quest_ids))
-
-    next_quest = query.order_by(Quest.id).first()
-
-    if not next_quest:
+    if after is not None:
+        course_id = after.course_id
+        chain = get_quest_chain(db, course_id)
+        index = after.chain_index
+        if index is None:
+            index = chain.index_of.get(after.quest_id, -1)
+        next_index = index + 1
+    else:
+        chain = get_quest_chain(db, course_id)
+        last_index = db.execute(
+            select(func.max(UserQuest.chain_index)).where(
+                UserQuest.user_id == user_id,
+                UserQuest.course_id == course_id,
+                UserQuest.completed_at.isnot(None),
+            )
+        ).scalar()
+        next_index = 0 if last_index is None else last_index + 1
+
+    if next_index >= len(chain.entries):
         return None
+    next_quest = chain.entries[next_index]
 
-    # Create new UserQuest
     new_user_quest = UserQuest(
         user_id=user_id,
         quest_id=next_quest.id,
+        course_id=course_id,
+        chain_index=next_index,
         boss_hp_remaining=next_quest.boss_hp,
     )
     db.add(new_user_quest)
@@ -0,0 +1,165 @@
+"""
+Question Cache
+==============
+In-process cache of each quiz's public question payload: options and test
+cases parsed from their JSON columns once, answers and explanations left out,
+and the full response body pre-serialized. The quiz endpoint returns those
+bytes as-is and the daily review reads the parsed questions.
+
+Question content only changes when seed scripts or migrations rewrite the
+questions table, usually from another process. Every ORM commit that writes
+Question rows therefore also bumps the "questions" row in content_versions in
+the same transaction. Each lookup reads that stamp (one primary-key query)
+and drops the whole cache when it has moved; commits in this process drop it
+straight away. Writes made outside the ORM (raw SQL) need an explicit
+bump_content_version(db, QUESTIONS) or a process restart.
+"""
+import hashlib
+import json
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..models import Question
+from ..schemas import QuestionPublicResponse
+from .cache_events import bump_content_version, content_version, invalidate_on_commit, stamp_on_commit
+
+QUESTIONS = "questions"
+
+
+@dataclass(frozen=True)
+class PublicQuestion:
+    """Immutable snapshot of a question without its answer fields."""
+    id: int
+    quiz_id: str
+    question_type: str
+    text: str
+    code: Optional[str]
+    options: Tuple[str, ...]
+    starter_code: Optional[str]
+    test_cases: Any  # Parsed test cases (treat as read-only), None if absent
+    difficulty: Optional[str]
+    topic_tag: Optional[str]
+
+
+@dataclass(frozen=True)
+class QuizPayload:
+    quiz_id: str
+    version: str  # Content hash of body
+    body: bytes  # JSON array of QuestionPublicResponse
+    questions: Dict[int, PublicQuestion]  # questions.id -> question, in id order
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    stamp: int
+    payloads: Dict[str, QuizPayload]
+
+
+_snapshot: Optional[_Snapshot] = None
+_snapshot_lock = Lock()
+
+
+def _parse_json(raw: Optional[str], default):
+    try:
+        return json.loads(raw) if raw else default
+    except (json.JSONDecodeError, TypeError):
+        return default
+
+
+def load_quiz_payload(db: Session, quiz_id: str) -> QuizPayload:
+    """Read, parse and serialize one quiz's public questions (one query)."""
+    rows = db.execute(
+        select(
+            Question.id, Question.quiz_id, Question.question_type, Question.text, Question.code,
+            Question.options, Question.starter_code, Question.test_cases, Question.difficulty,
+            Question.topic_tag,
+        )
+        .where(Question.quiz_id == quiz_id)
+        .order_by(Question.id)
+    ).all()
+
+    public = [
+        QuestionPublicResponse(
+            id=row.id,
+            quiz_id=row.quiz_id,
+            question_type=row.question_type or "mcq",
+            text=row.text,
+            code=row.code,  # For code-correction questions
+            options=_parse_json(row.options, []),
+            starter_code=row.starter_code,
+            test_cases=_parse_json(row.test_cases, None),
+            difficulty=row.difficulty,
+            topic_tag=row.topic_tag,
+        )
+        for row in rows
+    ]
+    # Same separators as FastAPI's JSONResponse, so cached bytes match what it would render
+    body = json.dumps(
+        [question.model_dump() for question in public],
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    questions = {
+        question.id: PublicQuestion(**{**question.model_dump(), "options": tuple(question.options)})
+        for question in public
+    }
+    return QuizPayload(
+        quiz_id=quiz_id,
+        version=hashlib.sha1(body).hexdigest()[:16],
+        body=body,
+        questions=questions,
+    )
+
+
+def get_quiz_payloads(db: Session, quiz_ids: Iterable[str]) -> Dict[str, QuizPayload]:
+    """
+    Cached payloads for ``quiz_ids``, loading any missing ones. Reads the
+    content stamp once; unknown quizzes get an empty payload that is not cached.
+    """
+    global _snapshot
+    quiz_ids = set(quiz_ids)
+    stamp = content_version(db, QUESTIONS)
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.stamp == stamp and quiz_ids <= snapshot.payloads.keys():
+        return {quiz_id: snapshot.payloads[quiz_id] for quiz_id in quiz_ids}
+
+    with _snapshot_lock:
+        snapshot = _snapshot
+        if snapshot is None or snapshot.stamp != stamp:
+            snapshot = _Snapshot(stamp=stamp, payloads={})
+        result = {}
+        loaded = {}
+        for quiz_id in quiz_ids:
+            payload = snapshot.payloads.get(quiz_id)
+            if payload is None:
+                payload = load_quiz_payload(db, quiz_id)
+                if payload.questions:
+                    loaded[quiz_id] = payload
+            result[quiz_id] = payload
+        # Copy on write so lock-free readers always see a consistent snapshot
+        _snapshot = _Snapshot(stamp=stamp, payloads={**snapshot.payloads, **loaded})
+        return result
+
+
+def get_quiz_payload(db: Session, quiz_id: str) -> QuizPayload:
+    return get_quiz_payloads(db, [quiz_id])[quiz_id]
+
+
+def invalidate_question_cache() -> None:
+    """Drop every cached payload; the next lookup reloads from the database."""
+    global _snapshot
+    with _snapshot_lock:
+        _snapshot = None
+
+
+def _bump_question_version(db: Session) -> None:
+    bump_content_version(db, QUESTIONS)
+
+
+invalidate_on_commit((Question,), invalidate_question_cache)
+stamp_on_commit((Question,), _bump_question_version)
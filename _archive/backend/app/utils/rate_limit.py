@@ -0,0 +1,61 @@
+"""
+Per-user rate limiting.
+
+Token buckets held in process memory: each key (a user id) may spend up to
+``burst`` units at once and earns ``rate`` units back per second. Callers pick
+the cost, so a batch endpoint can charge per item and share a budget with its
+single-item counterpart. Limits are per process, like the other in-process
+caches; idle buckets are dropped once they have refilled.
+"""
+import time
+from math import ceil
+from threading import Lock
+from typing import Dict, Hashable, Tuple
+
+from fastapi import HTTPException
+
+
+class RateLimiter:
+    def __init__(self, rate: float, burst: int, max_keys: int = 10_000):
+        self.rate = rate  # Units refilled per second
+        self.burst = burst  # Bucket capacity
+        self.max_keys = max_keys
+        self._buckets: Dict[Hashable, Tuple[float, float]] = {}  # key -> (tokens, updated_at)
+        self._lock = Lock()
+
+    def hit(self, key: Hashable, cost: int = 1) -> float:
+        """Spend ``cost`` units for ``key``. Returns 0 if allowed, else the seconds until it would be."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+            if tokens < cost:
+                self._buckets[key] = (tokens, now)
+                return (cost - tokens) / self.rate
+            self._buckets[key] = (tokens - cost, now)
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+            return 0.0
+
+    def _prune(self, now: float) -> None:
+        full_after = self.burst / self.rate
+        for key, (_, updated_at) in list(self._buckets.items()):
+            if now - updated_at >= full_after:
+                del self._buckets[key]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+def enforce(limiter: RateLimiter, key: Hashable, cost: int = 1) -> None:
+    """Spend from ``limiter`` or raise 429 with a Retry-After header."""
+    if cost > limiter.burst:
+        raise HTTPException(status_code=400, detail=f"At most {limiter.burst} items per request")
+    wait = limiter.hit(key, cost)
+    if wait:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests, please slow down",
+            headers={"Retry-After": str(ceil(wait))},
+        )
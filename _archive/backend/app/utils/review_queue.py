@@ -0,0 +1,50 @@
+"""
+Review Queue
+============
+Bulk queueing of questions for spaced repetition.
+
+queue_reviews() puts a set of questions (back) at the start of a user's SRS
+schedule with one ``INSERT ... ON CONFLICT (user_id, question_id) DO UPDATE``
+against the ix_user_question_reviews_user_question unique index: new questions
+get a review row and existing ones are reset, whatever their state, without
+reading them first. SQLite (3.24+) and PostgreSQL share the same syntax.
+"""
+from datetime import datetime
+from typing import Iterable
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..models import UserQuestionReview
+
+
+def queue_reviews(db: Session, user_id: int, question_ids: Iterable[int], due_date: datetime) -> int:
+    """Schedule each question for review at ``due_date`` from interval 0. Returns questions queued."""
+    question_ids = list(dict.fromkeys(question_ids))  # One row per question per statement
+    if not question_ids:
+        return 0
+
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    now = datetime.utcnow()
+    stmt = dialect.insert(UserQuestionReview).values([
+        {
+            "user_id": user_id,
+            "question_id": question_id,
+            "interval_index": 0,
+            "due_date": due_date,
+            "success_count": 0,
+            "is_mastered": False,
+            "created_at": now,
+        }
+        for question_id in question_ids
+    ])
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["user_id", "question_id"],
+        set_={
+            "interval_index": 0,
+            "success_count": 0,
+            "is_mastered": False,
+            "due_date": stmt.excluded.due_date,
+        },
+    ))
+    return len(question_ids)
@@ -0,0 +1,324 @@
+"""
+Reward Rule Engine
+==================
+Badge and achievement rules expressed as data and evaluated in memory against
+a snapshot of the user's state.
+
+A rule grants a catalog reward when ``snapshot.metrics[metric] >= threshold``.
+Static rules live in REWARD_RULES; per-week, per-quest and per-challenge rules
+are generated from the curriculum, quest and challenge tables and cached per
+process until a commit from any process bumps the "reward_rules" stamp in
+content_versions. Evaluation loads one snapshot (a fixed handful of queries however many
+rules exist), diffs it against the rules, and applies the resulting grants and
+revocations with bulk INSERT/DELETE statements.
+"""
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from ..models import (
+    Achievement,
+    Badge,
+    Challenge,
+    Quest,
+    Task,
+    UserAchievement,
+    UserBadge,
+    UserChallenge,
+    UserQuest,
+    Week,
+)
+from .cache_events import bump_content_version, content_version, invalidate_on_commit, stamp_on_commit
+from .catalog import get_catalog
+from .curriculum import get_curriculum
+from .ledger import achievement_event, badge_event, credit_many, reverse_events
+from .progress_counters import user_week_progress
+from .user_stats import adjust_user_stats
+
+REWARD_RULES_STAMP = "reward_rules"
+BADGE = "badge"
+ACHIEVEMENT = "achievement"
+
+STREAK_BADGES = {
+    3: "b-streak-3",
+    7: "b-streak-7",
+    14: "b-streak-14",
+    30: "b-streak-30",
+}
+TASK_COUNT_ACHIEVEMENTS = {
+    1: "a-first-task",
+    10: "a-ten-tasks",
+    50: "a-fifty-tasks",
+    100: "a-hundred-tasks",
+}
+
+
+@dataclass(frozen=True)
+class RewardRule:
+    reward_type: str  # BADGE or ACHIEVEMENT
+    code: str  # badge_id / achievement_id in the catalog
+    metric: str  # key into UserRewardSnapshot.metrics
+    threshold: int = 1
+    revocable: bool = True  # Revoked on uncomplete once the metric drops below threshold
+
+
+REWARD_RULES: Tuple[RewardRule, ...] = (
+    *(RewardRule(BADGE, code, "streak", days) for days, code in STREAK_BADGES.items()),
+    RewardRule(BADGE, "b-bootcamp-finish", "all_weeks_completed"),
+    RewardRule(ACHIEVEMENT, "a-all-weeks", "all_weeks_completed"),
+    *(
+        RewardRule(ACHIEVEMENT, code, "tasks_completed", count)
+        for count, code in TASK_COUNT_ACHIEVEMENTS.items()
+    ),
+    RewardRule(ACHIEVEMENT, "a-boss-first", "quests_defeated", revocable=False),
+)
+
+
+@dataclass
+class UserRewardSnapshot:
+    user_id: int
+    metrics: Dict[str, int]
+    badges: FrozenSet[str]
+    achievements: FrozenSet[str]
+
+
+@dataclass
+class RewardDiff:
+    grant_badges: List[str] = field(default_factory=list)
+    grant_achievements: List[str] = field(default_factory=list)
+    revoke_badges: List[str] = field(default_factory=list)
+    revoke_achievements: List[str] = field(default_factory=list)
+
+
+# =============================================================================
+# Rule set (static rules + rules generated from curriculum/quests/challenges)
+# =============================================================================
+_rules: Optional[Tuple[int, Tuple[RewardRule, ...]]] = None  # (content stamp, rules)
+_rules_lock = Lock()
+
+
+def _generated_rules(db: Session) -> List[RewardRule]:
+    rules = [
+        RewardRule(BADGE, f"b-week-{week_number}", f"week_complete:{week_id}")
+        for week_id, week_number in sorted(
+            get_curriculum(db).week_numbers.items(), key=lambda item: item[1]
+        )
+    ]
+    for quest_id, badge_code in db.query(Quest.id, Quest.reward_badge_id).order_by(Quest.id):
+        if badge_code:
+            rules.append(RewardRule(BADGE, badge_code, f"quest_defeated:{quest_id}", revocable=False))
+    for challenge_id, badge_code in db.query(Challenge.id, Challenge.reward_badge_id).order_by(Challenge.id):
+        if badge_code:
+            rules.append(
+                RewardRule(BADGE, badge_code, f"challenge_completed:{challenge_id}", revocable=False)
+            )
+    return rules
+
+
+def get_reward_rules(db: Session) -> Tuple[RewardRule, ...]:
+    """Return the full rule set, rebuilding the generated part when its stamp has moved."""
+    global _rules
+    stamp = content_version(db, REWARD_RULES_STAMP)
+    cached = _rules
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    with _rules_lock:
+        if _rules is None or _rules[0] != stamp:
+            _rules = (stamp, REWARD_RULES + tuple(_generated_rules(db)))
+        return _rules[1]
+
+
+def invalidate_reward_rules() -> None:
+    global _rules
+    with _rules_lock:
+        _rules = None
+
+
+def _bump_reward_rules_version(db: Session) -> None:
+    bump_content_version(db, REWARD_RULES_STAMP)
+
+
+invalidate_on_commit((Week, Task, Quest, Challenge), invalidate_reward_rules)
+stamp_on_commit((Week, Task, Quest, Challenge), _bump_reward_rules_version)
+
+
+# =============================================================================
+# Snapshot, evaluation and application
+# =============================================================================
+def load_snapshot(db: Session, user) -> UserRewardSnapshot:
+    """Load everything the rules need for one user in a fixed number of queries."""
+    # Pending quest/challenge/status changes must be visible to the queries below
+    db.flush()
+
+    curriculum = get_curriculum(db)
+    week_progress = user_week_progress(db, user.id)
+    metrics: Dict[str, int] = {
+        "streak": user.streak or 0,
+        "tasks_completed": sum(week_progress.values()),
+    }
+    for week_id, total in curriculum.week_task_totals.items():
+        metrics[f"week_complete:{week_id}"] = int(total > 0 and week_progress.get(week_id, 0) == total)
+    metrics["all_weeks_completed"] = int(
+        curriculum.total_tasks > 0 and metrics["tasks_completed"] == curriculum.total_tasks
+    )
+
+    defeated = db.execute(
+        select(UserQuest.quest_id).where(
+            UserQuest.user_id == user.id, UserQuest.completed_at.isnot(None)
+        )
+    ).scalars().all()
+    metrics["quests_defeated"] = len(defeated)
+    for quest_id in defeated:
+        metrics[f"quest_defeated:{quest_id}"] = 1
+
+    for (challenge_id,) in db.execute(
+        select(UserChallenge.challenge_id).where(
+            UserChallenge.user_id == user.id, UserChallenge.completed_at.isnot(None)
+        )
+    ):
+        metrics[f"challenge_completed:{challenge_id}"] = 1
+
+    badges = db.execute(
+        select(Badge.badge_id).join(UserBadge, UserBadge.badge_id == Badge.id).where(
+            UserBadge.user_id == user.id
+        )
+    ).scalars().all()
+    achievements = db.execute(
+        select(Achievement.achievement_id)
+        .join(UserAchievement, UserAchievement.achievement_id == Achievement.id)
+        .where(UserAchievement.user_id == user.id)
+    ).scalars().all()
+
+    return UserRewardSnapshot(
+        user_id=user.id,
+        metrics=metrics,
+        badges=frozenset(badges),
+        achievements=frozenset(achievements),
+    )
+
+
+def evaluate_rules(
+    rules: Tuple[RewardRule, ...],
+    snapshot: UserRewardSnapshot,
+    grant: bool = True,
+    revoke: bool = False,
+) -> RewardDiff:
+    """Pure in-memory evaluation of the rule set against a snapshot."""
+    diff = RewardDiff()
+    for rule in rules:
+        earned = snapshot.metrics.get(rule.metric, 0) >= rule.threshold
+        if rule.reward_type == BADGE:
+            owned, grants, revokes = snapshot.badges, diff.grant_badges, diff.revoke_badges
+        else:
+            owned, grants, revokes = (
+                snapshot.achievements, diff.grant_achievements, diff.revoke_achievements
+            )
+        if grant and earned and rule.code not in owned and rule.code not in grants:
+            grants.append(rule.code)
+        elif revoke and rule.revocable and not earned and rule.code in owned and rule.code not in revokes:
+            revokes.append(rule.code)
+    return diff
+
+
+def apply_reward_diff(db: Session, user, diff: RewardDiff, credit: bool = True) -> dict:
+    """
+    Persist a diff with bulk statements and post the catalog bonuses to the
+    ledger. Revocations reverse whatever the ledger holds for that reward, so a
+    reward granted without credit is revoked without a deduction. Codes missing
+    from the catalog are skipped. Returns the applied codes and totals.
+    """
+    catalog = get_catalog(db)
+    granted_badges = [code for code in diff.grant_badges if code in catalog.badges]
+    granted_achievements = [code for code in diff.grant_achievements if code in catalog.achievements]
+    revoked_badges = [code for code in diff.revoke_badges if code in catalog.badges]
+    revoked_achievements = [code for code in diff.revoke_achievements if code in catalog.achievements]
+
+    if granted_badges:
+        db.execute(insert(UserBadge), [
+            {"user_id": user.id, "badge_id": catalog.badges[code].id} for code in granted_badges
+        ])
+    if granted_achievements:
+        db.execute(insert(UserAchievement), [
+            {"user_id": user.id, "achievement_id": catalog.achievements[code].id}
+            for code in granted_achievements
+        ])
+    badges_removed = achievements_removed = 0
+    if revoked_badges:
+        badges_removed = db.execute(
+            delete(UserBadge)
+            .where(
+                UserBadge.user_id == user.id,
+                UserBadge.badge_id.in_([catalog.badges[code].id for code in revoked_badges]),
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+    if revoked_achievements:
+        achievements_removed = db.execute(
+            delete(UserAchievement)
+            .where(
+                UserAchievement.user_id == user.id,
+                UserAchievement.achievement_id.in_(
+                    [catalog.achievements[code].id for code in revoked_achievements]
+                ),
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+    adjust_user_stats(
+        db,
+        user.id,
+        badges_earned=len(granted_badges) - badges_removed,
+        achievements_earned=len(granted_achievements) - achievements_removed,
+    )
+
+    xp_bonus = gold_bonus = 0
+    if credit and (granted_badges or granted_achievements):
+        xp_bonus, gold_bonus = credit_many(db, user, [
+            (badge_event(code), BADGE, catalog.badges[code].xp_bonus, catalog.badges[code].gold_bonus)
+            for code in granted_badges
+        ] + [
+            (
+                achievement_event(code),
+                ACHIEVEMENT,
+                catalog.achievements[code].xp_bonus,
+                catalog.achievements[code].gold_bonus,
+            )
+            for code in granted_achievements
+        ])
+
+    xp_removed = gold_removed = 0
+    if revoked_badges or revoked_achievements:
+        xp_delta, gold_delta = reverse_events(
+            db,
+            user,
+            [badge_event(code) for code in revoked_badges]
+            + [achievement_event(code) for code in revoked_achievements],
+            source="revoke",
+        )
+        xp_removed, gold_removed = -xp_delta, -gold_delta
+
+    return {
+        "badges_unlocked": granted_badges,
+        "achievements_unlocked": granted_achievements,
+        "badges_revoked": revoked_badges,
+        "achievements_revoked": revoked_achievements,
+        "xp_bonus": xp_bonus,
+        "gold_bonus": gold_bonus,
+        "xp_removed": xp_removed,
+        "gold_removed": gold_removed,
+    }
+
+
+def evaluate_rewards(
+    db: Session,
+    user,
+    grant: bool = True,
+    revoke: bool = False,
+    credit: bool = True,
+) -> dict:
+    """Snapshot the user, evaluate every rule, and apply the diff."""
+    snapshot = load_snapshot(db, user)
+    diff = evaluate_rules(get_reward_rules(db), snapshot, grant=grant, revoke=revoke)
+    return apply_reward_diff(db, user, diff, credit=credit)
@@ -0,0 +1,261 @@
+"""
+Full-Text Search
+================
+One search index over the user's reflections and the shared question bank.
+
+SQLite uses an FTS5 virtual table; PostgreSQL uses a plain table with a
+generated, weighted tsvector column and a GIN index. Both expose the same
+columns, so indexing code is shared and only DDL and the ranking query are
+dialect-specific:
+
+    doc_id   reflection id * 2, question id * 2 + 1 (FTS5 rowid / PG primary key)
+    kind     "reflection" | "question"
+    ref_id   id in the source table
+    owner    "u<user_id>" for reflections, "questions" for the shared bank
+    parent   week id (reflections) or quiz_id (questions), for linking
+    title    week title / topic tag        (weight A)
+    body     reflection content / question text (weight B, used for snippets)
+    extra    question explanation          (weight C, searchable, never shown:
+                                            explanations reveal answers)
+
+The index lives outside Base.metadata (FTS5 tables can't be declared there);
+ensure_search_index() creates it and is called from startup, the migration and
+the maintenance rebuild. Reflections are re-indexed on create/update, questions
+when seeded; rebuild_search_index() re-derives everything with INSERT...SELECT.
+"""
+import html
+import re
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+REFLECTION = "reflection"
+QUESTION = "question"
+SEARCH_KINDS = (REFLECTION, QUESTION)
+QUESTIONS_OWNER = "questions"
+
+MAX_QUERY_TERMS = 8
+_HIGHLIGHT_OPEN, _HIGHLIGHT_CLOSE = "\x02", "\x03"
+
+_SQLITE_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+        kind UNINDEXED, ref_id UNINDEXED, owner, parent UNINDEXED,
+        title, body, extra,
+        tokenize = 'porter unicode61'
+    )
+    """,
+)
+_POSTGRES_DDL = (
+    """
+    CREATE TABLE IF NOT EXISTS search_index (
+        doc_id BIGINT PRIMARY KEY,
+        kind VARCHAR(20) NOT NULL,
+        ref_id INTEGER NOT NULL,
+        owner VARCHAR(30) NOT NULL,
+        parent VARCHAR(50),
+        title TEXT,
+        body TEXT,
+        extra TEXT,
+        document TSVECTOR GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(body, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(extra, '')), 'C')
+        ) STORED
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_search_index_document ON search_index USING GIN (document)",
+    "CREATE INDEX IF NOT EXISTS ix_search_index_owner ON search_index (owner)",
+)
+
+_SQLITE_SEARCH = """
+    SELECT kind, ref_id, parent, title,
+           snippet(search_index, 5, char(2), char(3), '…', 16) AS snippet,
+           -bm25(search_index, 0, 0, 0, 0, 3.0, 1.0, 0.5) AS score
+    FROM search_index
+    WHERE search_index MATCH :match {kind_filter}
+    ORDER BY score DESC, rowid
+    LIMIT :limit OFFSET :offset
+"""
+_POSTGRES_SEARCH = """
+    SELECT kind, ref_id, parent, title,
+           ts_headline('english', coalesce(body, ''), query,
+                       'StartSel=' || chr(2) || ', StopSel=' || chr(3) ||
+                       ', MaxWords=24, MinWords=8, MaxFragments=1') AS snippet,
+           ts_rank_cd(document, query) AS score
+    FROM search_index, to_tsquery('english', :match) AS query
+    WHERE document @@ query AND owner IN (:owner, :questions) {kind_filter}
+    ORDER BY score DESC, doc_id
+    LIMIT :limit OFFSET :offset
+"""
+
+
+@dataclass
+class SearchHit:
+    kind: str
+    ref_id: int
+    parent: Optional[str]
+    title: Optional[str]
+    snippet: str
+    score: float
+
+
+def _is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _doc_id(kind: str, ref_id: int) -> int:
+    return ref_id * 2 + (1 if kind == QUESTION else 0)
+
+
+def ensure_search_index(bind) -> None:
+    """Create the search index if it does not exist. ``bind`` is an Engine, Connection or Session."""
+    if isinstance(bind, Engine):
+        with bind.begin() as connection:
+            ensure_search_index(connection)
+        return
+    dialect = (bind.get_bind() if isinstance(bind, Session) else bind).dialect
+    for statement in _POSTGRES_DDL if dialect.name == "postgresql" else _SQLITE_DDL:
+        bind.execute(text(statement))
+
+
+def drop_search_index(engine: Engine) -> None:
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE IF EXISTS search_index"))
+
+
+# =============================================================================
+# Indexing
+# =============================================================================
+def _write_documents(db: Session, documents: List[dict]) -> None:
+    if not documents:
+        return
+    doc_ids = [doc["doc_id"] for doc in documents]
+    key = "doc_id" if _is_postgres(db) else "rowid"
+    # Delete-then-insert works for both backends (FTS5 has no upsert)
+    db.execute(
+        text(f"DELETE FROM search_index WHERE {key} = :doc_id"),
+        [{"doc_id": doc_id} for doc_id in doc_ids],
+    )
+    db.execute(
+        text(
+            f"INSERT INTO search_index ({key}, kind, ref_id, owner, parent, title, body, extra) "
+            "VALUES (:doc_id, :kind, :ref_id, :owner, :parent, :title, :body, :extra)"
+        ),
+        documents,
+    )
+
+
+def index_reflection(db: Session, reflection, week) -> None:
+    """(Re)index one reflection; call after flush so it has an id, before commit."""
+    _write_documents(db, [{
+        "doc_id": _doc_id(REFLECTION, reflection.id),
+        "kind": REFLECTION,
+        "ref_id": reflection.id,
+        "owner": f"u{reflection.user_id}",
+        "parent": str(reflection.week_id),
+        "title": f"Week {week.week_number}: {week.title}" if week else None,
+        "body": reflection.content,
+        "extra": None,
+    }])
+
+
+def index_questions(db: Session, questions: Iterable) -> None:
+    """(Re)index questions in bulk; call after flush so they have ids."""
+    _write_documents(db, [
+        {
+            "doc_id": _doc_id(QUESTION, question.id),
+            "kind": QUESTION,
+            "ref_id": question.id,
+            "owner": QUESTIONS_OWNER,
+            "parent": question.quiz_id,
+            "title": question.topic_tag,
+            "body": question.text,
+            "extra": question.explanation,
+        }
+        for question in questions
+    ])
+
+
+def rebuild_search_index(db: Session) -> int:
+    """Re-derive the whole index from reflections and questions. Returns documents indexed."""
+    ensure_search_index(db)
+    key = "doc_id" if _is_postgres(db) else "rowid"
+    db.execute(text("DELETE FROM search_index"))
+    db.execute(text(f"""
+        INSERT INTO search_index ({key}, kind, ref_id, owner, parent, title, body, extra)
+        SELECT r.id * 2, '{REFLECTION}', r.id, 'u' || r.user_id, CAST(r.week_id AS VARCHAR(20)),
+               'Week ' || w.week_number || ': ' || w.title, r.content, NULL
+        FROM reflections r LEFT JOIN weeks w ON w.id = r.week_id
+    """))
+    db.execute(text(f"""
+        INSERT INTO search_index ({key}, kind, ref_id, owner, parent, title, body, extra)
+        SELECT q.id * 2 + 1, '{QUESTION}', q.id, '{QUESTIONS_OWNER}', q.quiz_id,
+               q.topic_tag, q.text, q.explanation
+        FROM questions q
+    """))
+    return db.execute(text("SELECT COUNT(*) FROM search_index")).scalar()
+
+
+# =============================================================================
+# Querying
+# =============================================================================
+def query_terms(query: str) -> List[str]:
+    """Split free text into at most MAX_QUERY_TERMS lowercase word tokens (no operators)."""
+    return re.findall(r"\w+", query.lower())[:MAX_QUERY_TERMS]
+
+
+def _highlight(snippet: Optional[str]) -> str:
+    """Escape the source text, then turn the sentinel markers into <mark> tags."""
+    escaped = html.escape(snippet or "")
+    return escaped.replace(_HIGHLIGHT_OPEN, "<mark>").replace(_HIGHLIGHT_CLOSE, "</mark>")
+
+
+def search(
+    db: Session,
+    user_id: int,
+    query: str,
+    kind: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> List[SearchHit]:
+    """
+    Ranked search over the user's reflections and the question bank. Every
+    term must match; the last one also matches as a prefix (search-as-you-type).
+    """
+    terms = query_terms(query)
+    if not terms:
+        return []
+    params = {"limit": limit, "offset": offset}
+    kind_filter = ""
+    if kind:
+        params["kind"] = kind
+        kind_filter = "AND kind = :kind"
+
+    if _is_postgres(db):
+        params.update(
+            match=" & ".join(terms[:-1] + [f"{terms[-1]}:*"]),
+            owner=f"u{user_id}",
+            questions=QUESTIONS_OWNER,
+        )
+        sql = _POSTGRES_SEARCH.format(kind_filter=kind_filter)
+    else:
+        phrase = " ".join(f'"{term}"' for term in terms) + "*"
+        params["match"] = f"owner : (u{user_id} OR {QUESTIONS_OWNER}) AND {{title body extra}} : ({phrase})"
+        sql = _SQLITE_SEARCH.format(kind_filter=kind_filter)
+
+    rows = db.execute(text(sql), params)
+    return [
+        SearchHit(
+            kind=row.kind,
+            ref_id=int(row.ref_id),
+            parent=row.parent,
+            title=row.title,
+            snippet=_highlight(row.snippet),
+            score=round(float(row.score), 6),
+        )
+        for row in rows
+    ]
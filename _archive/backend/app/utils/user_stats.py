@@ -0,0 +1,129 @@
+"""
+User Stats
+==========
+Maintains user_stats, one row per user with the totals /api/progress reports:
+completed tasks, earned badges and achievements, and completed quizzes.
+
+Every write path that inserts or deletes the rows behind a total calls
+adjust_user_stats() in the same transaction, so the progress endpoint reads a
+single primary-key row instead of counting four tables. Catalog-wide totals
+(tasks, badges, achievements) come from the stamped curriculum and reward
+catalog caches. rebuild_user_stats() recomputes the rows from the source
+tables and verify_user_stats() reports any drift between the two.
+"""
+from typing import List, Optional
+
+from sqlalchemy import case, delete, func, insert, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..models import QuizResult, User, UserAchievement, UserBadge, UserStats, UserTaskStatus
+
+STAT_FIELDS = ("tasks_completed", "badges_earned", "achievements_earned", "quizzes_completed")
+
+
+def _live_stats_select(user_id: Optional[int] = None):
+    """One row per user with each total counted from its source table."""
+    def _count(model, *criteria):
+        return (
+            select(func.count(model.id))
+            .where(model.user_id == User.id, *criteria)
+            .scalar_subquery()
+        )
+
+    query = select(
+        User.id.label("user_id"),
+        _count(UserTaskStatus, UserTaskStatus.completed).label("tasks_completed"),
+        _count(UserBadge).label("badges_earned"),
+        _count(UserAchievement).label("achievements_earned"),
+        _count(QuizResult).label("quizzes_completed"),
+    )
+    if user_id is not None:
+        query = query.where(User.id == user_id)
+    return query
+
+
+def adjust_user_stats(db: Session, user_id: int, **deltas: int) -> None:
+    """
+    Add deltas to a user's totals, e.g. ``adjust_user_stats(db, 1, badges_earned=2)``.
+    Call after the change being mirrored has been added to the session: a
+    user without a row yet gets one seeded from live counts (flushed first, so
+    they already include that change) instead of the deltas.
+    """
+    unknown = set(deltas) - set(STAT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown user stats: {', '.join(sorted(unknown))}")
+    values = {}
+    for name, delta in deltas.items():
+        if delta:
+            new_value = getattr(UserStats, name) + delta
+            values[name] = case((new_value < 0, 0), else_=new_value)
+    if not values:
+        return
+
+    # One upsert, so two first writes for the same user cannot race on the key
+    db.flush()
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    db.execute(
+        dialect.insert(UserStats)
+        .from_select(["user_id", *STAT_FIELDS], _live_stats_select(user_id))
+        .on_conflict_do_update(index_elements=["user_id"], set_=values)
+    )
+
+def get_user_stats(db: Session, user_id: int):
+    """
+    The user's totals as a row with STAT_FIELDS attributes (primary-key read).
+    Users without a row yet are counted live; nothing is written.
+    """
+    row = db.execute(
+        select(*(getattr(UserStats, name) for name in STAT_FIELDS)).where(
+            UserStats.user_id == user_id
+        )
+    ).one_or_none()
+    if row is None:
+        row = db.execute(_live_stats_select(user_id)).one_or_none()
+    return row
+
+
+def rebuild_user_stats(db: Session, user_id: Optional[int] = None) -> int:
+    """
+    Recompute user_stats from the source tables for one user (or everyone).
+    Returns the number of rows written. The caller commits.
+    """
+    clear = delete(UserStats)
+    if user_id is not None:
+        clear = clear.where(UserStats.user_id == user_id)
+    db.execute(clear.execution_options(synchronize_session=False))
+    result = db.execute(
+        insert(UserStats).from_select(["user_id", *STAT_FIELDS], _live_stats_select(user_id))
+    )
+    return result.rowcount
+
+
+def verify_user_stats(db: Session, user_id: Optional[int] = None) -> List[dict]:
+    """
+    Compare user_stats against live counts. Returns one entry per drifted user:
+    ``{"user_id": 3, "tasks_completed": (stored, live), ...}`` listing only the
+    fields that differ. Users without a row yet are not drift: get_user_stats()
+    serves them live counts until the row is created.
+    """
+    live = _live_stats_select(user_id).subquery()
+    stored = {name: func.coalesce(getattr(UserStats, name), 0) for name in STAT_FIELDS}
+    rows = db.execute(
+        select(
+            live,
+            *(column.label(f"stored_{name}") for name, column in stored.items()),
+        )
+        .join(UserStats, UserStats.user_id == live.c.user_id)
+        .where(or_(*(column != live.c[name] for name, column in stored.items())))
+        .order_by(live.c.user_id)
+    ).mappings()
+
+    drift = []
+    for row in rows:
+        entry = {"user_id": row["user_id"]}
+        for name in STAT_FIELDS:
+            if row[f"stored_{name}"] != row[name]:
+                entry[name] = (row[f"stored_{name}"], row[name])
+        drift.append(entry)
+    return drift
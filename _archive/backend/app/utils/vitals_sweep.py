@@ -0,0 +1,120 @@
+"""
+Vitals Sweep
+============
+Set-wise version of settle_vitals() for every user, meant to run nightly
+(``maintenance.py sweep-vitals`` from cron) so inactive users' hearts, streaks
+and focus points are current without them making a request.
+
+Users are processed in batches by id range. Each batch is three bulk UPDATEs
+expressing the same rules as gamification.focus_refresh_due() and
+pending_penalty(): refill focus, consume a streak freeze, or take a heart and
+reset the streak. Each batch commits on its own.
+
+The sweep is idempotent: the focus refill is keyed on focus_refreshed_at and
+the penalties on last_heart_loss >= last_checkin_at (the same once-per-
+inactive-period guard the per-user path uses), so rerunning it, or resuming
+it from any id with ``start_after``, never applies a rule twice.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from time import perf_counter
+from typing import Callable, List, Optional
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from ..models import User
+from .gamification import FOCUS_CAP
+
+
+@dataclass
+class SweepBatch:
+    first_id: int
+    last_id: int
+    users: int
+    focus_refreshed: int
+    freezes_used: int
+    hearts_lost: int
+    seconds: float
+
+
+def _update(db: Session, first_id: int, last_id: int, criteria, values) -> int:
+    return db.execute(
+        update(User)
+        .where(User.id.between(first_id, last_id), *criteria)
+        .values(values)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def sweep_batch(db: Session, first_id: int, last_id: int, today: date, now: datetime) -> tuple:
+    """Apply the focus and penalty rules to users in [first_id, last_id]. Returns the three row counts."""
+    focus_refreshed = _update(
+        db, first_id, last_id,
+        [or_(User.focus_refreshed_at.is_(None), User.focus_refreshed_at < datetime.combine(today, time.min))],
+        {User.focus_points: FOCUS_CAP, User.focus_refreshed_at: now},
+    )
+
+    # Last check-in before yesterday, and not yet penalized for this inactive period
+    unpenalized_miss = and_(
+        User.last_checkin_at.isnot(None),
+        User.last_checkin_at < datetime.combine(today - timedelta(days=1), time.min),
+        or_(User.last_heart_loss.is_(None), User.last_heart_loss < User.last_checkin_at),
+    )
+    freezes = func.coalesce(User.streak_freeze_count, 0)
+    hearts = func.coalesce(User.hearts, 0)
+
+    # Freezes first: they stamp last_heart_loss, which excludes those users from the heart update
+    freezes_used = _update(
+        db, first_id, last_id,
+        [unpenalized_miss, freezes > 0],
+        {User.streak_freeze_count: freezes - 1, User.last_heart_loss: now},
+    )
+    hearts_lost = _update(
+        db, first_id, last_id,
+        [unpenalized_miss, freezes <= 0, hearts > 0],
+        {User.hearts: hearts - 1, User.last_heart_loss: now, User.streak: 0},
+    )
+    return focus_refreshed, freezes_used, hearts_lost
+
+
+def sweep_vitals(
+    db: Session,
+    batch_size: int = 1000,
+    start_after: int = 0,
+    today: Optional[date] = None,
+    on_batch: Optional[Callable[[SweepBatch], None]] = None,
+) -> List[SweepBatch]:
+    """
+    Sweep all users with id > ``start_after``, ``batch_size`` at a time,
+    committing after each batch. ``on_batch`` is called with each batch's
+    report (its ``last_id`` is the resume point if the run is interrupted).
+    """
+    today = today or date.today()
+    now = datetime.utcnow()
+    reports = []
+    last_seen = start_after
+    while True:
+        ids = db.execute(
+            select(User.id).where(User.id > last_seen).order_by(User.id).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            return reports
+
+        started = perf_counter()
+        first_id, last_seen = ids[0], ids[-1]
+        focus_refreshed, freezes_used, hearts_lost = sweep_batch(db, first_id, last_seen, today, now)
+        db.commit()
+
+        report = SweepBatch(
+            first_id=first_id,
+            last_id=last_seen,
+            users=len(ids),
+            focus_refreshed=focus_refreshed,
+            freezes_used=freezes_used,
+            hearts_lost=hearts_lost,
+            seconds=perf_counter() - started,
+        )
+        reports.append(report)
+        if on_batch:
+            on_batch(report)
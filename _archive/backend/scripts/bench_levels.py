@@ -0,0 +1,79 @@
+"""
+Benchmark the cumulative-XP table lookups against the original level-walking loop.
+
+Verifies both implementations agree on every sampled XP value before timing them.
+
+Usage (from the _archive directory):
+    python backend/scripts/bench_levels.py [--users 10000] [--max-xp 500000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from backend.app.utils.gamification import (  # noqa: E402
+    cumulative_xp_to_level,
+    level_from_xp,
+    levels_from_xp,
+    xp_for_next_level,
+)
+
+
+def legacy_level_from_xp(xp: int) -> int:
+    level = 1
+    remaining = xp
+    while remaining >= xp_for_next_level(level):
+        remaining -= xp_for_next_level(level)
+        level += 1
+    return level
+
+
+def legacy_cumulative_xp_to_level(level: int) -> int:
+    if level <= 1:
+        return 0
+    total = 0
+    for i in range(1, level):
+        total += xp_for_next_level(i)
+    return total
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--max-xp", type=int, default=500_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    samples = [rng.randint(0, args.max_xp) for _ in range(args.users)]
+    # Always include the exact level boundaries and their neighbours
+    top_level = legacy_level_from_xp(args.max_xp)
+    for level in range(1, top_level + 1):
+        boundary = legacy_cumulative_xp_to_level(level)
+        samples.extend([boundary - 1, boundary, boundary + 1])
+
+    legacy, legacy_time = _timed(lambda: [legacy_level_from_xp(xp) for xp in samples])
+    single, single_time = _timed(lambda: [level_from_xp(xp) for xp in samples])
+    batch, batch_time = _timed(lambda: levels_from_xp(samples))
+
+    assert legacy == single == batch, "level lookup diverged from the legacy loop"
+    for level in range(1, top_level + 2):
+        assert cumulative_xp_to_level(level) == legacy_cumulative_xp_to_level(level)
+
+    print(f"Checked {len(samples)} XP values (levels 1-{top_level}): identical results")
+    print(f"  legacy loop      : {legacy_time * 1000:8.2f} ms")
+    print(f"  level_from_xp    : {single_time * 1000:8.2f} ms ({legacy_time / single_time:.1f}x)")
+    print(f"  levels_from_xp   : {batch_time * 1000:8.2f} ms ({legacy_time / batch_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Benchmark the full-text search index against a LIKE scan on a synthetic corpus.
+
+Builds a throwaway SQLite database with N reflections spread over many users,
+indexes it with rebuild_search_index(), then times ranked searches for one
+user against the equivalent ``content LIKE '%term%'`` scan. The LIKE scan is
+only a latency baseline: it is cheap while one user's reflections fit behind
+the user_id index, but has no ranking, stemming, prefix matching or snippets,
+and cannot cover the shared question bank without scanning all of it.
+
+Usage (from the _archive directory):
+    python backend/scripts/bench_search.py [--reflections 100000] [--users 500] [--queries 200]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from sqlalchemy import create_engine, insert, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from backend.app.database import Base  # noqa: E402
+from backend.app.models import Reflection, User, Week  # noqa: E402
+from backend.app.utils.search import rebuild_search_index, search  # noqa: E402
+
+VOCABULARY = (
+    "loop list dict function class variable string recursion api request json file "
+    "module import error exception test debug refactor async thread scrape pandas "
+    "plot flask django database query index sort search tuple set generator "
+    "decorator lambda comprehension today learned struggled finally understood "
+    "project practice challenge bug fix idea review notes progress week"
+).split()
+
+
+class Vocabulary:
+    """Topic words plus synthetic filler words with Zipf-like frequencies."""
+
+    def __init__(self, rng: random.Random, size: int):
+        letters = "abcdefghijklmnopqrstuvwxyz"
+        filler = {"".join(rng.choice(letters) for _ in range(rng.randint(4, 9))) for _ in range(size)}
+        self.words = VOCABULARY + sorted(filler)
+        rng.shuffle(self.words)
+        self.cum_weights = list(accumulate(1 / (rank + 1) for rank in range(len(self.words))))
+        self.rng = rng
+
+    def sample(self, k: int):
+        return self.rng.choices(self.words, cum_weights=self.cum_weights, k=k)
+
+    def paragraph(self, words: int) -> str:
+        return " ".join(self.sample(words)).capitalize() + "."
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def _time_queries(fn, workload):
+    timings = []
+    for user_id, query in workload:
+        start = time.perf_counter()
+        fn(user_id, query)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reflections", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--vocabulary", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = Vocabulary(rng, args.vocabulary)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench_search.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine, autoflush=False)()
+
+        weeks = 15
+        db.execute(insert(Week), [
+            {"id": n, "week_number": n, "title": f"Week {n}"} for n in range(1, weeks + 1)
+        ])
+        db.execute(insert(User), [
+            {"id": n, "username": f"user{n}"} for n in range(1, args.users + 1)
+        ])
+        base = datetime(2026, 1, 1)
+        db.execute(insert(Reflection), [
+            {
+                "user_id": rng.randint(1, args.users),
+                "week_id": rng.randint(1, weeks),
+                "content": " ".join(
+                    vocabulary.paragraph(rng.randint(20, 60)) for _ in range(rng.randint(1, 4))
+                ),
+                "created_at": base + timedelta(minutes=i),
+                "updated_at": base + timedelta(minutes=i),
+            }
+            for i in range(args.reflections)
+        ])
+        db.commit()
+
+        start = time.perf_counter()
+        documents = rebuild_search_index(db)
+        db.commit()
+        build_time = time.perf_counter() - start
+        print(f"Indexed {documents} documents in {build_time:.2f}s")
+
+        # One or two words per query, drawn from the same distribution as the text
+        workload = [
+            (rng.randint(1, args.users), " ".join(vocabulary.sample(rng.randint(1, 2))))
+            for _ in range(args.queries)
+        ]
+
+        def _like(user_id, query):
+            sql = "SELECT id FROM reflections WHERE user_id = :user_id"
+            params = {"user_id": user_id}
+            for i, term in enumerate(query.split()):
+                sql += f" AND content LIKE :t{i}"
+                params[f"t{i}"] = f"%{term}%"
+            db.execute(text(sql + " LIMIT 20"), params).all()
+
+        fts = _time_queries(lambda user_id, query: search(db, user_id, query, limit=20), workload)
+        like = _time_queries(_like, workload)
+
+        for label, samples in (("FTS (ranked, snippets)", fts), ("LIKE scan (unranked)", like)):
+            print(
+                f"  {label:24}: p50 {statistics.median(samples):7.2f} ms"
+                f"  p95 {_percentile(samples, 0.95):7.2f} ms"
+            )
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
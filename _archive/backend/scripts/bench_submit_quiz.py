@@ -0,0 +1,144 @@
+"""
+Benchmark submit_quiz latency against quiz size.
+
+Builds a throwaway SQLite database with one quiz per size, then submits each
+quiz for a series of users through the submit_quiz handler. Half of every
+submission is wrong, and half of those questions already have a review row,
+so the SRS upsert exercises both its insert and its reset path. Reports
+end-to-end latency and SQL statements per submission, plus the SRS queueing
+step alone against the old per-question SELECT + INSERT/UPDATE loop.
+
+Usage (from the _archive directory):
+    python backend/scripts/bench_submit_quiz.py [--sizes 5 10 25 50 100] [--submissions 100]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from sqlalchemy import create_engine, event, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from backend.app.database import Base  # noqa: E402
+from backend.app.models import Question, User, UserQuestionReview  # noqa: E402
+from backend.app.routers.quizzes import submit_quiz  # noqa: E402
+from backend.app.schemas import QuizSubmission  # noqa: E402
+from backend.app.utils.review_queue import queue_reviews  # noqa: E402
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def _legacy_queue(db, user_id, question_ids, due_date):
+    """The pre-upsert loop: one SELECT, then an INSERT or UPDATE, per failed question."""
+    for question_id in question_ids:
+        review = db.query(UserQuestionReview).filter(
+            UserQuestionReview.user_id == user_id,
+            UserQuestionReview.question_id == question_id
+        ).first()
+        if review:
+            review.interval_index = 0
+            review.success_count = 0
+            review.due_date = due_date
+            review.is_mastered = False
+        else:
+            db.add(UserQuestionReview(
+                user_id=user_id, question_id=question_id, interval_index=0,
+                due_date=due_date, success_count=0, is_mastered=False
+            ))
+    db.flush()
+
+
+def _seed(db, sizes, users):
+    next_id = 1
+    quizzes = {}
+    for size in sizes:
+        ids = list(range(next_id, next_id + size))
+        next_id += size
+        db.execute(insert(Question), [
+            {
+                "id": question_id,
+                "quiz_id": f"bench-{size}",
+                "question_type": "mcq",
+                "text": f"Question {question_id}",
+                "options": json.dumps(["a", "b", "c", "d"]),
+                "correct_index": 1,
+            }
+            for question_id in ids
+        ])
+        quizzes[size] = ids
+    db.execute(insert(User), [{"id": n, "username": f"user{n}", "xp": 0} for n in range(1, users + 1)])
+    db.commit()
+    return quizzes
+
+
+def _failed_half(ids):
+    return ids[::2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 10, 25, 50, 100])
+    parser.add_argument("--submissions", type=int, default=100, help="Submissions per quiz size")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench_submit.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine, autoflush=False)()
+        quizzes = _seed(db, args.sizes, args.submissions)
+
+        # Half of each user's failed questions are already scheduled
+        due = datetime.utcnow() + timedelta(days=7)
+        db.execute(insert(UserQuestionReview), [
+            {"user_id": user_id, "question_id": question_id, "interval_index": 2, "due_date": due}
+            for ids in quizzes.values()
+            for user_id in range(1, args.submissions + 1)
+            for question_id in _failed_half(ids)[::2]
+        ])
+        db.commit()
+
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *a: statements.append(1))
+
+        print(f"{'questions':>9}  {'submit p50':>10}  {'p95':>8}  {'SQL/submit':>10}  {'upsert':>8}  {'legacy loop':>11}")
+        for size, ids in quizzes.items():
+            failed = set(_failed_half(ids))
+            answers = {str(q): 0 if q in failed else 1 for q in ids}
+            timings = []
+            statements.clear()
+            for user_id in range(1, args.submissions + 1):
+                user = db.get(User, user_id)
+                start = time.perf_counter()
+                submit_quiz(QuizSubmission(quiz_id=f"bench-{size}", answers=answers), user=user, db=db)
+                timings.append((time.perf_counter() - start) * 1000)
+            per_submit = len(statements) / args.submissions
+
+            # The SRS step alone, rolled back so both variants see the same rows
+            queue_timings, legacy_timings = [], []
+            for user_id in range(1, args.submissions + 1):
+                for fn, samples in ((queue_reviews, queue_timings), (_legacy_queue, legacy_timings)):
+                    start = time.perf_counter()
+                    fn(db, user_id, sorted(failed), due)
+                    samples.append((time.perf_counter() - start) * 1000)
+                    db.rollback()
+
+            print(
+                f"{size:>9}  {statistics.median(timings):8.2f}ms  {_percentile(timings, 0.95):6.2f}ms"
+                f"  {per_submit:>10.1f}  {statistics.median(queue_timings):6.2f}ms"
+                f"  {statistics.median(legacy_timings):9.2f}ms"
+            )
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
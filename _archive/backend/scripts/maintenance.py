@@ -0,0 +1,236 @@
+"""
+Maintenance jobs for derived tables.
+
+Usage (from the _archive directory):
+    python backend/scripts/maintenance.py rebuild-progress-counters [--user-id N]
+    python backend/scripts/maintenance.py verify-ledger
+    python backend/scripts/maintenance.py rebuild-xp-from-ledger [--user-id N]
+    python backend/scripts/maintenance.py rebuild-activity-bitmaps [--user-id N]
+    python backend/scripts/maintenance.py rebuild-search-index
+    python backend/scripts/maintenance.py rebuild-user-stats [--user-id N]
+    python backend/scripts/maintenance.py verify-user-stats [--user-id N]
+    python backend/scripts/maintenance.py rebuild-daily-activity [--user-id N] [--batch-size N]
+    python backend/scripts/maintenance.py sweep-vitals [--batch-size N] [--start-after ID]
+    python backend/scripts/maintenance.py expire-challenges [--batch-size N]
+    python backend/scripts/maintenance.py rebuild-leaderboards [--user-id N]
+    python backend/scripts/maintenance.py link-quiz-tasks
+
+sweep-vitals and expire-challenges are meant to run nightly from cron, shortly after midnight.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from backend.app.database import SessionLocal  # noqa: E402
+from backend.app.utils.activity import rebuild_activity  # noqa: E402
+from backend.app.utils.challenges import expire_challenges  # noqa: E402
+from backend.app.utils.curriculum import link_day_quizzes  # noqa: E402
+from backend.app.utils.daily_activity import rebuild_daily_activity  # noqa: E402
+from backend.app.utils.leaderboard import rebuild_best_scores, rebuild_xp_rank_buckets  # noqa: E402
+from backend.app.utils.ledger import rebuild_totals_from_ledger, verify_ledger  # noqa: E402
+from backend.app.utils.progress_counters import rebuild_progress_counters  # noqa: E402
+from backend.app.utils.search import rebuild_search_index  # noqa: E402
+from backend.app.utils.user_stats import STAT_FIELDS, rebuild_user_stats, verify_user_stats  # noqa: E402
+from backend.app.utils.vitals_sweep import sweep_vitals  # noqa: E402
+
+
+def cmd_rebuild_progress_counters(db, args):
+    rows = rebuild_progress_counters(db, user_id=args.user_id)
+    db.commit()
+    print(f"Rebuilt {rows} user_week_progress rows")
+
+
+def cmd_verify_ledger(db, args):
+    drift = verify_ledger(db)
+    for row in drift:
+        print(
+            f"user {row['user_id']}: xp {row['xp']} (ledger {row['ledger_xp']}), "
+            f"gold {row['gold']} (ledger {row['ledger_gold']})"
+        )
+    print(f"{len(drift)} user(s) out of step with the reward ledger")
+    if drift:
+        sys.exit(1)
+
+
+def cmd_rebuild_xp_from_ledger(db, args):
+    rows = rebuild_totals_from_ledger(db, user_id=args.user_id)
+    db.commit()
+    print(f"Reset xp/gold for {rows} user(s) from the reward ledger")
+
+
+def cmd_rebuild_activity_bitmaps(db, args):
+    users = rebuild_activity(db, user_id=args.user_id)
+    db.commit()
+    print(f"Rebuilt activity bitmaps for {users} user(s)")
+
+
+def cmd_rebuild_search_index(db, args):
+    documents = rebuild_search_index(db)
+    db.commit()
+    print(f"Indexed {documents} reflection/question documents")
+
+
+def cmd_rebuild_user_stats(db, args):
+    rows = rebuild_user_stats(db, user_id=args.user_id)
+    db.commit()
+    print(f"Rebuilt {rows} user_stats rows")
+
+
+def cmd_verify_user_stats(db, args):
+    drift = verify_user_stats(db, user_id=args.user_id)
+    for row in drift:
+        fields = ", ".join(
+            f"{name} {row[name][0]} (live {row[name][1]})" for name in STAT_FIELDS if name in row
+        )
+        print(f"user {row['user_id']}: {fields}")
+    print(f"{len(drift)} user(s) out of step with live counts")
+    if drift:
+        sys.exit(1)
+
+
+def cmd_rebuild_daily_activity(db, args):
+    rows = rebuild_daily_activity(db, user_id=args.user_id, batch_size=args.batch_size)
+    print(f"Rebuilt {rows} user_daily_activity rows")
+
+
+def cmd_sweep_vitals(db, args):
+    def report(batch):
+        print(
+            f"users {batch.first_id}-{batch.last_id} ({batch.users}): "
+            f"{batch.focus_refreshed} focus refills, {batch.freezes_used} freezes used, "
+            f"{batch.hearts_lost} hearts lost in {batch.seconds * 1000:.1f} ms"
+        )
+
+    batches = sweep_vitals(db, batch_size=args.batch_size, start_after=args.start_after, on_batch=report)
+    print(
+        f"Swept {sum(batch.users for batch in batches)} user(s) in {len(batches)} batch(es); "
+        f"{sum(batch.hearts_lost for batch in batches)} hearts lost, "
+        f"{sum(batch.freezes_used for batch in batches)} freezes used"
+    )
+
+
+def cmd_expire_challenges(db, args):
+    rows = expire_challenges(db, batch_size=args.batch_size)
+    print(f"Expired {rows} unfinished user challenge(s) past their end date")
+
+
+def cmd_rebuild_leaderboards(db, args):
+    rows = rebuild_best_scores(db, user_id=args.user_id)
+    bands = rebuild_xp_rank_buckets(db)
+    db.commit()
+    print(f"Rebuilt {rows} quiz_best_scores rows and {bands} XP rank bands")
+
+
+def cmd_link_quiz_tasks(db, args):
+    added = link_day_quizzes(db)
+    db.commit()
+    print(f"Linked {added} day-N quizzes to their tasks")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Learning Tracker maintenance jobs")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser(
+        "rebuild-progress-counters",
+        help="Recompute user_week_progress from user_task_statuses",
+    )
+    rebuild.add_argument("--user-id", type=int, default=None)
+    rebuild.set_defaults(handler=cmd_rebuild_progress_counters)
+
+    verify = commands.add_parser(
+        "verify-ledger",
+        help="Report users whose xp/gold differ from the reward ledger sums",
+    )
+    verify.set_defaults(handler=cmd_verify_ledger)
+
+    rebuild_xp = commands.add_parser(
+        "rebuild-xp-from-ledger",
+        help="Overwrite users.xp/gold with the reward ledger sums",
+    )
+    rebuild_xp.add_argument("--user-id", type=int, default=None)
+    rebuild_xp.set_defaults(handler=cmd_rebuild_xp_from_ledger)
+
+    activity = commands.add_parser(
+        "rebuild-activity-bitmaps",
+        help="Recompute user_activity_bitmaps from user_task_statuses",
+    )
+    activity.add_argument("--user-id", type=int, default=None)
+    activity.set_defaults(handler=cmd_rebuild_activity_bitmaps)
+
+    search = commands.add_parser(
+        "rebuild-search-index",
+        help="Recreate the full-text search index from reflections and questions",
+    )
+    search.set_defaults(handler=cmd_rebuild_search_index)
+
+    stats = commands.add_parser(
+        "rebuild-user-stats",
+        help="Recompute user_stats from tasks, badges, achievements and quiz results",
+    )
+    stats.add_argument("--user-id", type=int, default=None)
+    stats.set_defaults(handler=cmd_rebuild_user_stats)
+
+    verify_stats = commands.add_parser(
+        "verify-user-stats",
+        help="Report users whose user_stats differ from live counts",
+    )
+    verify_stats.add_argument("--user-id", type=int, default=None)
+    verify_stats.set_defaults(handler=cmd_verify_user_stats)
+
+    daily = commands.add_parser(
+        "rebuild-daily-activity",
+        help="Recompute user_daily_activity from task completions and the reward ledger",
+    )
+    daily.add_argument("--user-id", type=int, default=None)
+    daily.add_argument("--batch-size", type=int, default=500, help="Users per committed batch")
+    daily.set_defaults(handler=cmd_rebuild_daily_activity)
+
+    sweep = commands.add_parser(
+        "sweep-vitals",
+        help="Apply daily focus refills and missed-day penalties to every user",
+    )
+    sweep.add_argument("--batch-size", type=int, default=1000, help="Users per committed batch")
+    sweep.add_argument(
+        "--start-after", type=int, default=0, help="Resume after this user id (last_id of the last batch)"
+    )
+    sweep.set_defaults(handler=cmd_sweep_vitals)
+
+    expire = commands.add_parser(
+        "expire-challenges",
+        help="Close unfinished user challenges whose challenge has ended",
+    )
+    expire.add_argument("--batch-size", type=int, default=1000, help="Rows per committed batch")
+    expire.set_defaults(handler=cmd_expire_challenges)
+
+    leaderboards = commands.add_parser(
+        "rebuild-leaderboards",
+        help="Recompute quiz_best_scores from quiz_results and the XP rank bands from users.xp",
+    )
+    leaderboards.add_argument("--user-id", type=int, default=None, help="Only rebuild this user's best scores")
+    leaderboards.set_defaults(handler=cmd_rebuild_leaderboards)
+
+    link = commands.add_parser(
+        "link-quiz-tasks",
+        help="Add quiz_tasks links for day-N quizzes loaded without seed.py",
+    )
+    link.set_defaults(handler=cmd_link_quiz_tasks)
+
+    args = parser.parse_args()
+    db = SessionLocal()
+    start = time.perf_counter()
+    try:
+        args.handler(db, args)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    print(f"Done in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
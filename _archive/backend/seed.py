@@ -7,6 +7,7 @@ import os
 import sys
 from typing import Dict, List, Tuple
 from datetime import datetime, timedelta
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 # Add the app directory to path for imports
@@ -30,7 +31,10 @@ from backend.app.models import (
     Achievement,
     UserAchievement,
     Question,
+    QuizTask,
 )
+from backend.app.utils.curriculum import link_day_quizzes
+from backend.app.utils.search import ensure_search_index, index_questions
 
 
 def load_seed_data() -> Dict:
@@ -100,6 +104,7 @@ def clear_existing_data(db):
     db.query(Challenge).delete()
     db.query(UserQuest).delete()
     db.query(QuestTask).delete()
+    db.query(QuizTask).delete()
     db.query(UserAchievement).delete()
     db.query(Achievement).delete()
     db.query(Quest).delete()
@@ -111,6 +116,7 @@ def clear_existing_data(db):
     db.query(Week).delete()
     db.query(User).delete()
     db.query(Question).delete() # Added Question to clear existing data
+    db.execute(text("DELETE FROM search_index"))
     db.commit()
 
 
@@ -230,11 +236,16 @@ def seed_questions(db: Session):
     db.commit()
     print(f"  Seeded {len(day2_questions)} questions for 'day-2-practice'.")
 
+    # Keep the full-text search index in step with the question bank
+    index_questions(db, db.query(Question).all())
+    db.commit()
+
 
 def seed_database():
     """Seed the database with initial data."""
     # Recreate tables to match current models
     Base.metadata.create_all(bind=engine)
+    ensure_search_index(engine)
 
     db = SessionLocal()
 
@@ -446,11 +457,13 @@ def seed_database():
             UserQuest(
                 user_id=default_user.id,
                 quest_id=quest_objects[0].id,
+                chain_index=0,
                 boss_hp_remaining=quest_objects[0].boss_hp,
             )
         )
 
         seed_questions(db)
+        print(f"  Linked {link_day_quizzes(db)} quizzes to their tasks")
 
         # Sample 7-day consistency challenge
         print("Creating sample challenge...")
@@ -1,11 +1,18 @@
+from contextlib import contextmanager
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from backend.app.database import Base, get_db
 from backend.app.main import app
+from backend.app.routers.quizzes import verify_limiter
+from backend.app.utils.catalog import invalidate_catalog
+from backend.app.utils.curriculum import invalidate_curriculum
+from backend.app.utils.question_cache import invalidate_question_cache
+from backend.app.utils.quest_manager import invalidate_quest_chains
 
 
 # Create in-memory SQLite database for testing
@@ -23,6 +30,11 @@ TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engin
 def db_session():
     """Create a fresh database for each test."""
     Base.metadata.create_all(bind=engine)
+    invalidate_catalog()
+    invalidate_curriculum()
+    invalidate_question_cache()
+    invalidate_quest_chains()
+    verify_limiter.reset()
     db = TestingSessionLocal()
     try:
         yield db
@@ -31,6 +43,25 @@ def db_session():
         Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture
+def count_statements():
+    """``with count_statements() as statements:`` collects the SQL run inside the block."""
+    @contextmanager
+    def counting():
+        statements = []
+
+        def _count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", _count)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", _count)
+
+    return counting
+
+
 @pytest.fixture(scope="function")
 def client(db_session):
     """Create a test client with overridden database dependency."""
@@ -91,3 +122,20 @@ def seed_test_questions(db_session):
     db_session.commit()
 
     return questions
+
+
+@pytest.fixture
+def seed_test_curriculum(db_session):
+    """Seed one week with two tasks plus the week badge and first-task achievement."""
+    from backend.app.models import Week, Task, Badge, Achievement
+
+    week = Week(id=1, week_number=1, title="Week 1")
+    db_session.add(week)
+    db_session.add_all([
+        Task(id=1, task_id="w1-d1", week_id=1, day="Day 1", description="Day 1", xp_reward=10),
+        Task(id=2, task_id="w1-d2", week_id=1, day="Day 2", description="Day 2", xp_reward=10),
+        Badge(badge_id="b-week-1", name="Week 1 Complete", xp_value=50),
+        Achievement(achievement_id="a-first-task", name="First Task", xp_value=20),
+    ])
+    db_session.commit()
+    return week
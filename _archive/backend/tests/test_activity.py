@@ -0,0 +1,81 @@
+"""Tests for the per-user activity bitmap."""
+from datetime import date, datetime, timedelta
+
+from ..app.models import Task, UserActivityBitmap, UserTaskStatus
+from ..app.utils.activity import (
+    ActivityBitmap,
+    clear_active_day_if_idle,
+    load_activity,
+    mark_active_day,
+    rebuild_activity,
+)
+
+
+def _days(*offsets, start=date(2026, 1, 1)):
+    return [start + timedelta(days=offset) for offset in offsets]
+
+
+def test_bitmap_runs_and_streaks():
+    bitmap = ActivityBitmap.from_days(_days(0, 1, 2, 5, 7, 8))
+
+    assert bitmap.runs() == [(date(2026, 1, 1), 3), (date(2026, 1, 6), 1), (date(2026, 1, 8), 2)]
+    assert bitmap.current_run() == 2
+    assert bitmap.longest_run() == 3
+    assert bitmap.last_active_day() == date(2026, 1, 9)
+    assert bitmap.runs(since=date(2026, 1, 2)) == [
+        (date(2026, 1, 2), 2), (date(2026, 1, 6), 1), (date(2026, 1, 8), 2)
+    ]
+
+    # Marking before the origin shifts the bitmap; clearing day 0 moves the origin forward
+    bitmap.mark(date(2025, 12, 31))
+    assert bitmap.origin == date(2025, 12, 31) and bitmap.longest_run() == 4
+    bitmap.clear(date(2025, 12, 31))
+    bitmap.clear(date(2026, 1, 1))
+    assert bitmap.origin == date(2026, 1, 2)
+    assert ActivityBitmap().current_run() == 0
+
+
+def test_completion_marks_today_and_calendar_returns_runs(client, seed_test_user, seed_test_curriculum, db_session):
+    client.post("/api/tasks/w1-d1/complete")
+    today = datetime.utcnow().date()
+    assert load_activity(db_session, 1).is_active(today)
+
+    calendar = client.get("/api/progress/calendar?compact=true").json()
+    assert calendar["active_runs"] == [[today.isoformat(), 1]]
+    assert calendar["streak_days"] == [today.isoformat()]
+    assert "completion_dates" not in calendar
+
+    # The day stays active until its last completion is undone
+    client.post("/api/tasks/w1-d2/complete")
+    client.post("/api/tasks/w1-d1/uncomplete")
+    db_session.expire_all()
+    assert load_activity(db_session, 1).is_active(today)
+    client.post("/api/tasks/w1-d2/uncomplete")
+    db_session.expire_all()
+    assert load_activity(db_session, 1).origin is None
+    assert client.get("/api/progress/calendar").json()["completion_dates"] == {}
+
+
+def test_rebuild_activity_from_statuses(db_session, seed_test_user, seed_test_curriculum):
+    tasks = db_session.query(Task).order_by(Task.id).all()
+    for offset, task in enumerate(tasks):
+        db_session.add(UserTaskStatus(
+            user_id=1,
+            task_id=task.id,
+            completed=True,
+            completed_at=datetime(2026, 3, 1, 12) + timedelta(days=offset),
+        ))
+    db_session.commit()
+
+    assert rebuild_activity(db_session) == 1
+    db_session.commit()
+    bitmap = load_activity(db_session, 1)
+    assert bitmap.runs() == [(date(2026, 3, 1), len(tasks))]
+
+
+def test_mark_active_day_upserts_the_bitmap_row(db_session, seed_test_user):
+    mark_active_day(db_session, 1, date(2026, 3, 2))
+    mark_active_day(db_session, 1, date(2026, 3, 1))
+    clear_active_day_if_idle(db_session, 1, date(2026, 3, 2))
+    assert db_session.query(UserActivityBitmap).count() == 1
+    assert load_activity(db_session, 1).runs() == [(date(2026, 3, 1), 1)]
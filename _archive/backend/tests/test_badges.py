@@ -0,0 +1,34 @@
+"""Tests for badge/achievement listings and their ETags."""
+
+
+def test_badges_listing_and_etag(client, seed_test_user, seed_test_curriculum):
+    first = client.get("/api/badges")
+    assert first.status_code == 200
+    assert [(b["badge_id"], b["unlocked"]) for b in first.json()] == [("b-week-1", False)]
+    etag = first.headers["etag"]
+
+    cached = client.get("/api/badges", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+
+    client.post("/api/tasks/w1-d1/complete")
+    client.post("/api/tasks/w1-d2/complete")
+    changed = client.get("/api/badges", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()[0]["unlocked"] is True
+    assert changed.json()[0]["earned_at"] is not None
+    assert changed.headers["etag"] != etag
+
+    # Revoking changes the earned set, so the tag changes again
+    client.post("/api/tasks/w1-d2/uncomplete")
+    assert client.get("/api/badges", headers={"If-None-Match": changed.headers["etag"]}).status_code == 200
+
+
+def test_achievements_listing_and_etag(client, seed_test_user, seed_test_curriculum):
+    client.post("/api/tasks/w1-d1/complete")
+    response = client.get("/api/achievements")
+    assert response.status_code == 200
+    assert [(a["achievement_id"], a["unlocked"]) for a in response.json()] == [("a-first-task", True)]
+
+    etag = response.headers["etag"]
+    assert client.get("/api/achievements", headers={"If-None-Match": etag}).status_code == 304
@@ -0,0 +1,69 @@
+"""Tests for the in-process badge/achievement catalog cache."""
+from sqlalchemy import text
+
+from ..app.models import Achievement, Badge, UserBadge
+from ..app.utils.cache_events import bump_content_version
+from ..app.utils.catalog import CATALOG, get_catalog
+from ..app.utils.rewards import RewardDiff, apply_reward_diff, evaluate_rewards
+from .conftest import TestingSessionLocal
+
+
+def test_catalog_applies_reward_multiplier(db_session):
+    """Catalog entries carry the difficulty-adjusted XP and gold bonus."""
+    db_session.add(Badge(badge_id="b-hard", name="Hard", xp_value=100, difficulty="hard"))
+    db_session.add(Achievement(achievement_id="a-epic", name="Epic", xp_value=50, difficulty="epic"))
+    db_session.commit()
+
+    catalog = get_catalog(db_session)
+    assert catalog.badges["b-hard"].xp_bonus == 150
+    assert catalog.badges["b-hard"].gold_bonus == 15
+    assert catalog.achievements["a-epic"].xp_bonus == 100
+
+
+def test_catalog_reloads_after_orm_write(db_session):
+    """Committing a Badge change drops the cached catalog."""
+    db_session.add(Badge(badge_id="b-one", name="One", xp_value=10))
+    db_session.commit()
+    first = get_catalog(db_session)
+    assert get_catalog(db_session) is first
+
+    db_session.add(Badge(badge_id="b-two", name="Two", xp_value=20))
+    db_session.commit()
+    second = get_catalog(db_session)
+    assert second is not first
+    assert "b-two" in second.badges
+    assert second.version != first.version
+
+
+def test_reseed_from_another_process_is_picked_up_by_the_stamp(db_session):
+    """A catalog rewritten elsewhere is reloaded, so awards never use replaced row ids."""
+    db_session.add(Badge(id=1, badge_id="b-one", name="One", xp_value=10))
+    db_session.commit()
+    assert get_catalog(db_session).badges["b-one"].id == 1
+
+    other = TestingSessionLocal()
+    try:
+        other.execute(text("DELETE FROM badges"))
+        other.execute(text("INSERT INTO badges (id, badge_id, name, xp_value) VALUES (7, 'b-one', 'One', 10)"))
+        bump_content_version(other, CATALOG)
+        other.commit()
+    finally:
+        other.close()
+
+    assert get_catalog(db_session).badges["b-one"].id == 7
+
+
+def test_reward_grants_use_catalog(db_session, seed_test_user):
+    """Grants post the catalog's pre-computed bonus once; unknown codes are skipped."""
+    db_session.add(Badge(badge_id="b-streak-3", name="Streak", xp_value=30))
+    db_session.commit()
+
+    seed_test_user.streak = 3
+    granted = evaluate_rewards(db_session, seed_test_user)
+    assert (granted["badges_unlocked"], granted["xp_bonus"], granted["gold_bonus"]) == (["b-streak-3"], 30, 3)
+    db_session.commit()
+    assert db_session.query(UserBadge).count() == 1
+    assert evaluate_rewards(db_session, seed_test_user)["badges_unlocked"] == []
+
+    missing = apply_reward_diff(db_session, seed_test_user, RewardDiff(grant_badges=["b-missing"]))
+    assert (missing["badges_unlocked"], missing["xp_bonus"]) == ([], 0)
@@ -0,0 +1,59 @@
+"""Tests for active-only challenge progress and the challenge expiry job."""
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from ..app.models import Challenge, User, UserChallenge
+from ..app.utils.challenges import active_user_challenges, expire_challenges
+from .conftest import engine
+
+
+def _seed_challenges(db_session):
+    now = datetime.utcnow()
+    db_session.add_all([
+        Challenge(id=1, name="Open", goal_count=5),
+        Challenge(id=2, name="Ended", goal_count=5, ends_at=now - timedelta(days=1)),
+        Challenge(id=3, name="Done", goal_count=1),
+        Challenge(id=4, name="Running", goal_count=5, ends_at=now + timedelta(days=3)),
+        User(id=2, username="other_user"),
+    ])
+    db_session.add_all([
+        UserChallenge(user_id=1, challenge_id=1, progress=0),
+        UserChallenge(user_id=1, challenge_id=2, progress=2),
+        UserChallenge(user_id=1, challenge_id=3, progress=1, completed_at=now - timedelta(days=9)),
+        UserChallenge(user_id=1, challenge_id=4, progress=0),
+        UserChallenge(user_id=2, challenge_id=2, progress=0),
+    ])
+    db_session.commit()
+
+
+def test_completion_only_advances_open_challenges(client, db_session, seed_test_user, seed_test_curriculum):
+    _seed_challenges(db_session)
+
+    result = client.post("/api/tasks/w1-d1/complete").json()
+    assert [update["challenge_id"] for update in result["challenge_updates"]] == [1, 4]
+    assert [c["id"] for c in client.get("/api/rpg/state").json()["active_challenges"]] == [1, 4]
+
+    # The ended challenge is untouched even before the expiry job has run
+    ended = db_session.query(UserChallenge).filter_by(user_id=1, challenge_id=2).one()
+    assert (ended.progress, ended.completed_at, ended.expired_at) == (2, None, None)
+
+
+def test_active_lookup_uses_partial_index(db_session, seed_test_user):
+    with engine.connect() as connection:
+        plan = connection.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM user_challenges "
+            "WHERE user_id = 1 AND completed_at IS NULL AND expired_at IS NULL"
+        )).all()
+    assert any("ix_user_challenges_active" in str(row) for row in plan)
+
+
+def test_expire_challenges_closes_ended_rows_in_batches(db_session, seed_test_user):
+    _seed_challenges(db_session)
+
+    assert expire_challenges(db_session, batch_size=1) == 2
+    assert expire_challenges(db_session) == 0
+    expired = db_session.query(UserChallenge).filter(UserChallenge.expired_at.isnot(None)).all()
+    assert sorted((uc.user_id, uc.challenge_id) for uc in expired) == [(1, 2), (2, 2)]
+    assert all(uc.completed_at is None for uc in expired)
+    assert [uc.challenge_id for uc in active_user_challenges(db_session, 1)] == [1, 4]
@@ -0,0 +1,139 @@
+"""Tests for the sandboxed code runner pool."""
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from ..app.models import Question
+from ..app.routers import quizzes
+from ..app.utils.code_runner import SandboxBusy, SandboxError, SandboxLimits, SandboxPool
+
+SANDBOX_USER = "nobody"  # Only used when the tests run as root
+
+GREET_TESTS = json.dumps([
+    {"function_call": "greet('Ada')", "expected": "Hello, Ada!"},
+    {"function_call": "greet('Bob')", "expected": "Hello, Bob!"},
+])
+
+
+@pytest.fixture(scope="module")
+def pool():
+    os.environ["CODE_RUNNER_TEST_SECRET"] = "hunter2"  # Inherited by the workers
+    pool = SandboxPool(2, SandboxLimits(time_limit=1.0, memory_mb=256), max_queue=4, user=SANDBOX_USER)
+    yield pool
+    pool.close()
+    del os.environ["CODE_RUNNER_TEST_SECRET"]
+
+
+def test_runs_each_test_case_and_reports_results(pool):
+    run = pool.run("def greet(name):\n    return 'Hello, ' + name + '!'", GREET_TESTS)
+    assert run.all_passed and [r.actual for r in run.results] == ["Hello, Ada!", "Hello, Bob!"]
+
+    wrong = pool.run("def greet(name):\n    return 'Hi ' + name", GREET_TESTS)
+    assert not wrong.all_passed
+    assert (wrong.results[0].input, wrong.results[0].actual) == ("greet('Ada')", "Hi Ada")
+
+    broken = pool.run("def greet(name)\n    return name", GREET_TESTS)
+    assert all(r.error.startswith("SyntaxError") for r in broken.results)
+
+
+def test_printed_output_and_assertion_scripts(pool):
+    printed = pool.run("def greet():\n    print('Hello World')", [{"function_call": "greet()", "expected_output": "Hello World"}])
+    assert printed.all_passed
+
+    script = json.dumps("assert double(2) == 4\nassert double(0) == 0")
+    assert pool.run("def double(x):\n    return 2 * x", script).all_passed
+    failing = pool.run("def double(x):\n    return x", script)
+    assert failing.results[0].error.startswith("AssertionError")
+
+
+def test_limits_and_blocked_operations(pool):
+    tests = [{"function_call": "f()", "expected": "None"}, {"function_call": "f()", "expected": "None"}]
+    looping = pool.run("def f():\n    while True:\n        pass", tests)
+    assert looping.timed_out
+    assert [r.error for r in looping.results] == ["Timed out", "Not run (time limit reached)"]
+
+    hungry = pool.run("def f():\n    return len(bytearray(1024 ** 3))", tests[:1])
+    assert hungry.results[0].error.startswith("MemoryError")
+
+    for body in (
+        "import socket\n    socket.socket().connect(('127.0.0.1', 80))",
+        "import os\n    os.system('true')",
+        "open('/tmp/sandbox-escape', 'w')",
+    ):
+        run = pool.run(f"def f():\n    {body}", tests[:1])
+        assert run.results[0].error.startswith("PermissionError"), run.results[0].error
+
+    # The worker that ran the runaway loop was kept healthy and still serves requests
+    assert pool.run("def greet(name):\n    return 'Hello, ' + name + '!'", GREET_TESTS).all_passed
+
+
+def test_no_secrets_files_or_processes_reach_the_submission(pool, tmp_path):
+    tests = [{"function_call": "f()", "expected": "None"}]
+    leaked = pool.run("import os\ndef f():\n    return os.environ.get('CODE_RUNNER_TEST_SECRET')", tests)
+    assert leaked.all_passed
+
+    secret = tmp_path / ".env"
+    secret.write_text("SECRET_KEY=hunter2")
+    for body in (f"return open({str(secret)!r}).read()", "import os\n    return os.listdir('/')"):
+        run = pool.run(f"def f():\n    {body}", tests)
+        assert run.results[0].error.startswith("PermissionError"), run.results[0].error
+
+    # Spawning below the os module raises no audit event; the seccomp filter refuses the fork itself
+    escape = pool.run(
+        "import _posixsubprocess, os\n"
+        "def f():\n"
+        "    return _posixsubprocess.fork_exec(['/bin/true'], [b'/bin/true'], True, (), None, None,"
+        " -1, -1, -1, -1, -1, -1, *os.pipe(), False, False, -1, None, None, None, -1, None, False)",
+        tests,
+    )
+    assert escape.results[0].error.startswith("PermissionError"), escape.results[0].error
+
+
+def test_pool_refuses_to_run_submissions_as_root():
+    if os.geteuid() != 0:
+        pytest.skip("Only meaningful when the tests run as root")
+    with pytest.raises(SandboxError, match="CODE_SANDBOX_USER"):
+        SandboxPool(1)
+
+
+def test_full_queue_is_rejected_instead_of_waiting():
+    pool = SandboxPool(1, SandboxLimits(time_limit=1.0), max_queue=0, user=SANDBOX_USER)
+    try:
+        slow = threading.Thread(target=pool.run, args=("import time\ntime.sleep(0.5)", GREET_TESTS))
+        slow.start()
+        deadline = time.monotonic() + 5
+        while pool._idle.qsize() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        with pytest.raises(SandboxBusy):
+            pool.run("def greet(name):\n    return name", GREET_TESTS)
+        slow.join()
+    finally:
+        pool.close()
+
+
+def test_coding_answers_are_verified_on_the_server(client, db_session, seed_test_user, pool, monkeypatch):
+    monkeypatch.setattr(quizzes, "get_sandbox_pool", lambda: pool)
+    db_session.add(Question(id=1, quiz_id="day-1-practice", question_type="coding", text="Greet", test_cases=GREET_TESTS))
+    db_session.commit()
+
+    claimed = client.post("/api/quizzes/verify", json={
+        "question_id": 1, "answer": {"allPassed": True, "code": "def greet(name):\n    return name"}
+    }).json()
+    assert claimed["is_correct"] is False
+    assert [r["passed"] for r in claimed["test_results"]] == [False, False]
+
+    solved = client.post("/api/quizzes/verify", json={
+        "question_id": 1, "answer": {"code": "def greet(name):\n    return 'Hello, ' + name + '!'"}
+    }).json()
+    assert solved["is_correct"] is True
+
+    # Without test cases there is nothing to run, and the client's flag is not trusted either
+    db_session.add(Question(id=2, quiz_id="day-1-practice", question_type="coding", text="Untested", test_cases="[]"))
+    db_session.commit()
+    untested = client.post("/api/quizzes/verify", json={
+        "question_id": 2, "answer": {"allPassed": True, "code": "pass"}
+    }).json()
+    assert untested["is_correct"] is False
@@ -0,0 +1,72 @@
+"""Concurrency stress test for atomic XP/gold updates (file-backed SQLite, many threads)."""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from ..app.database import Base
+from ..app.models import User
+from ..app.routers.rpg import SHOP_ITEMS, award_xp, buy_item
+from ..app.utils.ledger import credit, verify_ledger
+
+REQUESTS = 200
+WORKERS = 16
+
+
+@pytest.fixture
+def file_session_factory(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'stress.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with factory() as db:
+        db.add(User(id=1, username="stress_user", xp=0, gold=0))
+        db.commit()
+    yield factory
+    engine.dispose()
+
+
+def _as_request(factory, endpoint, *args):
+    """Run an endpoint the way a request would: fresh session, user loaded up front."""
+    with factory() as db:
+        user = db.get(User, 1)
+        try:
+            endpoint(*args, user=user, db=db)
+            return True
+        except HTTPException:
+            db.rollback()
+            return False
+
+
+def test_parallel_xp_awards_do_not_lose_updates(file_session_factory):
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        results = list(pool.map(lambda _: _as_request(file_session_factory, award_xp, 3), range(REQUESTS)))
+
+    assert all(results)
+    with file_session_factory() as db:
+        assert db.get(User, 1).xp == 3 * REQUESTS
+        assert verify_ledger(db) == []
+
+
+def test_parallel_purchases_never_overspend(file_session_factory):
+    cost = SHOP_ITEMS["streak_freeze"]["cost"]
+    affordable = 7
+    with file_session_factory() as db:
+        credit(db, db.get(User, 1), "opening-balance", "test", gold=cost * affordable)
+        db.commit()
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        results = list(pool.map(
+            lambda _: _as_request(file_session_factory, buy_item, "streak_freeze"), range(REQUESTS)
+        ))
+
+    assert sum(results) == affordable
+    with file_session_factory() as db:
+        user = db.get(User, 1)
+        assert user.gold == 0
+        assert user.streak_freeze_count == affordable
+        assert verify_ledger(db) == []
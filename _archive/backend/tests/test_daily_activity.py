@@ -0,0 +1,90 @@
+"""Tests for the daily activity rollup, heatmap endpoint and batched rebuild."""
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from ..app.models import QuizResult, User, UserDailyActivity, UserQuestionReview
+from ..app.utils.daily_activity import rebuild_daily_activity
+
+
+def _rollup(db_session):
+    return db_session.execute(
+        select(
+            UserDailyActivity.user_id,
+            UserDailyActivity.day,
+            UserDailyActivity.tasks,
+            UserDailyActivity.quiz_xp,
+            UserDailyActivity.reviews,
+            UserDailyActivity.xp,
+        ).order_by(UserDailyActivity.user_id, UserDailyActivity.day)
+    ).all()
+
+
+def _record_activity(client, db_session, user_id=1):
+    client.post("/api/tasks/w1-d1/complete")
+    client.post("/api/tasks/w1-d2/complete")
+    client.post("/api/quizzes/submit", json={"quiz_id": "test-quiz", "answers": {"1": 1, "2": 1}})
+    review = UserQuestionReview(user_id=user_id, question_id=1, due_date=datetime.utcnow() - timedelta(hours=1))
+    db_session.add(review)
+    db_session.commit()
+    client.post("/api/srs/review-result", json={"review_id": review.id, "was_correct": True})
+
+
+def test_heatmap_metrics_follow_write_paths(client, db_session, seed_test_user, seed_test_curriculum, seed_test_questions):
+    _record_activity(client, db_session)
+    today = datetime.utcnow().date().isoformat()
+
+    def heatmap(metric):
+        response = client.get("/api/progress/heatmap", params={"metric": metric})
+        assert response.status_code == 200
+        return response.json()["days"]
+
+    # Tasks are 10 XP each; the quiz is 10 + score; a correct review is 10
+    assert heatmap("tasks") == {today: 2}
+    assert heatmap("quiz_xp") == {today: 12}
+    assert heatmap("reviews") == {today: 1}
+    assert heatmap("xp") == {today: 42}
+
+    client.post("/api/tasks/w1-d2/uncomplete")
+    assert (heatmap("tasks"), heatmap("xp")) == ({today: 1}, {today: 32})
+    assert client.get("/api/progress/calendar").json()["completion_dates"] == {today: 1}
+
+
+def test_heatmap_window_and_validation(client, db_session, seed_test_user):
+    db_session.add_all([
+        UserDailyActivity(user_id=1, day=datetime(2025, 12, 31).date(), tasks=3),
+        UserDailyActivity(user_id=1, day=datetime(2026, 3, 1).date(), tasks=1, xp=10),
+    ])
+    db_session.commit()
+
+    data = client.get("/api/progress/heatmap", params={"year": 2026}).json()
+    assert (data["start"], data["end"]) == ("2026-01-01", "2026-12-31")
+    assert (data["days"], data["total"], data["max"]) == ({"2026-03-01": 1}, 1, 1)
+    assert client.get("/api/progress/heatmap", params={"metric": "gold"}).status_code == 400
+
+
+def test_rebuild_matches_incremental_rollup(client, db_session, seed_test_user, seed_test_curriculum, seed_test_questions):
+    db_session.add_all(User(id=n, username=f"user{n}") for n in (2, 3))
+    db_session.commit()
+    _record_activity(client, db_session)
+    client.post("/api/tasks/w1-d2/uncomplete")
+    incremental = _rollup(db_session)
+    assert incremental
+
+    # One user per batch exercises the id-range batching
+    assert rebuild_daily_activity(db_session, batch_size=1) == len(incremental)
+    assert _rollup(db_session) == incremental
+
+
+def test_rebuild_recovers_history_from_before_the_ledger(db_session, seed_test_user, seed_test_questions):
+    day = datetime(2026, 1, 5)
+    db_session.add_all([
+        QuizResult(user_id=1, quiz_id="test-quiz", score=2, total_questions=2, completed_at=day),
+        UserQuestionReview(user_id=1, question_id=1, due_date=day, success_count=1, last_reviewed_at=day),
+        UserQuestionReview(user_id=1, question_id=2, due_date=day, success_count=0, last_reviewed_at=day),
+    ])
+    db_session.commit()
+
+    # No ledger events: the quiz earned 10 + score, one review 10 XP and one failed
+    assert rebuild_daily_activity(db_session) == 1
+    assert _rollup(db_session) == [(1, day.date(), 0, 12, 2, 22)]
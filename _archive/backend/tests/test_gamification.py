@@ -0,0 +1,41 @@
+"""Tests for gamification level calculations."""
+from ..app.utils.gamification import (
+    cumulative_xp_to_level,
+    level_from_xp,
+    levels_from_xp,
+    next_level_requirement,
+    xp_for_next_level,
+)
+
+
+def _loop_level_from_xp(xp):
+    level = 1
+    remaining = xp
+    while remaining >= xp_for_next_level(level):
+        remaining -= xp_for_next_level(level)
+        level += 1
+    return level
+
+
+def test_level_from_xp_matches_level_walk():
+    """Table lookup agrees with walking the curve level by level."""
+    for xp in list(range(0, 5000, 7)) + [-10, 99, 100, 229, 230, 10**6]:
+        assert level_from_xp(xp) == _loop_level_from_xp(xp)
+
+
+def test_level_boundaries():
+    """Reaching exactly the cumulative XP for a level lands on that level."""
+    for level in range(1, 40):
+        boundary = cumulative_xp_to_level(level)
+        assert level_from_xp(boundary) == level
+        if boundary > 0:
+            assert level_from_xp(boundary - 1) == level - 1
+    assert cumulative_xp_to_level(2) == xp_for_next_level(1)
+
+
+def test_levels_from_xp_batch():
+    """Batch lookup returns one level per input in order."""
+    values = [0, 150, 10**5, 42, 10**5]
+    assert levels_from_xp(values) == [level_from_xp(xp) for xp in values]
+    assert levels_from_xp([]) == []
+    assert next_level_requirement(150) == xp_for_next_level(level_from_xp(150))
@@ -0,0 +1,104 @@
+"""Tests for the best-score quiz leaderboard and the XP leaderboard."""
+from datetime import datetime, timedelta
+
+from ..app.models import QuizBestScore, QuizResult, User, XpRankBucket
+from ..app.utils.leaderboard import rebuild_best_scores, rebuild_xp_rank_buckets, record_best_score, xp_rank
+from ..app.utils.ledger import credit
+from ..app.utils.pagination import NEXT_CURSOR_HEADER
+
+
+def _record(db_session, user_id, quiz_id, score, minutes_ago):
+    result = QuizResult(
+        user_id=user_id,
+        quiz_id=quiz_id,
+        score=score,
+        total_questions=10,
+        completed_at=datetime.utcnow() - timedelta(minutes=minutes_ago),
+    )
+    db_session.add(result)
+    db_session.flush()
+    record_best_score(db_session, result)
+    return result
+
+
+def _best_scores(db_session):
+    return {
+        (row.user_id, row.quiz_id): (row.score, row.result_id)
+        for row in db_session.query(QuizBestScore)
+    }
+
+
+def test_best_score_keeps_one_row_per_user_and_quiz(db_session, seed_test_user):
+    db_session.add(User(id=2, username="rival"))
+    first = _record(db_session, 1, "day-1", 6, minutes_ago=30)
+    better = _record(db_session, 1, "day-1", 9, minutes_ago=20)
+    _record(db_session, 1, "day-1", 9, minutes_ago=10)  # Ties keep the earlier attempt
+    _record(db_session, 1, "day-1", 4, minutes_ago=5)
+    other = _record(db_session, 2, "day-1", 7, minutes_ago=1)
+    db_session.commit()
+
+    maintained = _best_scores(db_session)
+    assert maintained == {(1, "day-1"): (9, better.id), (2, "day-1"): (7, other.id)}
+    assert first.id not in {result_id for _, result_id in maintained.values()}
+
+    assert rebuild_best_scores(db_session) == 2
+    assert _best_scores(db_session) == maintained
+
+
+def test_quiz_leaderboard_pages_with_cursors(client, db_session, seed_test_user):
+    for minutes_ago, score in enumerate([5, 9, 9, 7, 3]):
+        _record(db_session, 1, f"quiz-{minutes_ago}", score, minutes_ago)
+    _record(db_session, 1, "quiz-1", 2, minutes_ago=0)  # Worse retry: not listed
+    db_session.commit()
+
+    entries, cursor = [], None
+    while True:
+        response = client.get("/api/quizzes/leaderboard", params={"limit": 2, "cursor": cursor})
+        entries += response.json()
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+    assert [(e["quiz_id"], e["score"]) for e in entries] == [
+        ("quiz-1", 9), ("quiz-2", 9), ("quiz-3", 7), ("quiz-0", 5), ("quiz-4", 3)
+    ]
+
+    assert client.get("/api/quizzes/leaderboard", params={"cursor": "bogus"}).status_code == 400
+
+
+def test_xp_rank_uses_bands_and_matches_a_full_count(client, db_session, seed_test_user):
+    totals = {2: 40, 3: 150, 4: 150, 5: 260, 6: 99, 7: 1000}
+    db_session.add_all(User(id=user_id, username=f"user{user_id}", xp=0) for user_id in totals)
+    db_session.commit()
+    for user in db_session.query(User).filter(User.id > 1):
+        credit(db_session, user, "seed", "test", xp=totals[user.id])
+    me = db_session.get(User, 1)
+    credit(db_session, me, "seed", "test", xp=120)
+    db_session.commit()
+
+    bands = {row.bucket: row.users for row in db_session.query(XpRankBucket) if row.users}
+    assert bands == {1: 3, 2: 1, 10: 1}
+
+    # Moving down a band updates the counts too
+    credit(db_session, me, "undo", "test", xp=-30)
+    db_session.commit()
+    assert xp_rank(db_session, 1) == (90, 6)
+    rebuild_xp_rank_buckets(db_session)
+    db_session.commit()
+    assert {row.bucket: row.users for row in db_session.query(XpRankBucket)} == {1: 2, 2: 1, 10: 1}
+
+    for user in db_session.query(User):
+        above = db_session.query(User).filter(User.xp > user.xp).count()
+        assert xp_rank(db_session, user.id) == (user.xp, above + 1)
+    assert client.get("/api/leaderboard/xp/me").json() == {"user_id": 1, "xp": 90, "rank": 6}
+
+
+def test_xp_leaderboard_pages_with_cursors(client, db_session, seed_test_user):
+    db_session.add_all(User(id=i, username=f"user{i}", xp=xp) for i, xp in [(2, 500), (3, 200), (4, 200)])
+    db_session.commit()
+
+    first = client.get("/api/leaderboard/xp", params={"limit": 2})
+    rest = client.get("/api/leaderboard/xp", params={"cursor": first.headers[NEXT_CURSOR_HEADER]})
+    assert [(row["user_id"], row["xp"]) for row in first.json() + rest.json()] == [
+        (2, 500), (4, 200), (3, 200), (1, 0)
+    ]
+    assert NEXT_CURSOR_HEADER not in rest.headers
@@ -0,0 +1,43 @@
+"""Tests for the append-only reward ledger."""
+from ..app.models import RewardLedgerEntry, User
+from ..app.utils.ledger import rebuild_totals_from_ledger, reverse_event, task_event, verify_ledger
+
+
+def _user(db_session):
+    user = db_session.get(User, 1)
+    db_session.refresh(user)
+    return user
+
+
+def test_completion_and_undo_are_recorded_as_entries(client, seed_test_user, seed_test_curriculum, db_session):
+    client.post("/api/tasks/w1-d1/complete")
+    client.post("/api/tasks/w1-d2/complete")
+    earned = _user(db_session).xp
+    assert earned > 20  # task XP plus badge/achievement bonuses
+
+    client.post("/api/tasks/w1-d2/uncomplete")
+    user = _user(db_session)
+    assert verify_ledger(db_session) == []
+
+    # Undo appends compensating entries instead of editing history
+    entries = db_session.query(RewardLedgerEntry).filter_by(event_key=task_event(2)).all()
+    assert [e.xp_delta for e in entries] == [10, -10]
+    assert user.xp < earned
+
+    # Reversing an already-reversed event is a no-op
+    assert reverse_event(db_session, user, task_event(2)) == (0, 0)
+
+
+def test_verify_and_rebuild_detect_and_repair_drift(client, seed_test_user, seed_test_curriculum, db_session):
+    client.post("/api/tasks/w1-d1/complete")
+    expected = _user(db_session).xp
+
+    db_session.query(User).filter(User.id == 1).update({"xp": 9999})
+    db_session.commit()
+    drift = verify_ledger(db_session)
+    assert [(row["user_id"], row["ledger_xp"]) for row in drift] == [(1, expected)]
+
+    assert rebuild_totals_from_ledger(db_session) == 1
+    db_session.commit()
+    assert _user(db_session).xp == expected
+    assert verify_ledger(db_session) == []
@@ -0,0 +1,62 @@
+"""Tests for the cached public question payloads."""
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from ..app.models import Question, UserQuestionReview
+from ..app.utils.question_cache import QUESTIONS, bump_content_version, content_version
+from .conftest import TestingSessionLocal
+
+
+def test_quiz_questions_are_served_with_an_etag(client, seed_test_user, seed_test_questions):
+    response = client.get("/api/quizzes/test-quiz/questions")
+    etag = response.headers["etag"]
+    assert [q["options"] for q in response.json()] == [["3", "4", "5", "6"], ["London", "Paris", "Berlin", "Madrid"]]
+    assert "correct_index" not in response.text and "explanation" not in response.text
+
+    revalidated = client.get("/api/quizzes/test-quiz/questions", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == etag
+
+
+def test_reseed_from_another_process_is_picked_up_by_the_stamp(client, seed_test_user, seed_test_questions):
+    etag = client.get("/api/quizzes/test-quiz/questions").headers["etag"]
+
+    # Raw SQL writes bypass the ORM hooks: the cached payload is still served
+    other = TestingSessionLocal()
+    try:
+        other.execute(text("UPDATE questions SET text = 'What is 3 + 3?' WHERE id = 1"))
+        other.commit()
+        assert client.get("/api/quizzes/test-quiz/questions").json()[0]["text"] == "What is 2 + 2?"
+
+        bump_content_version(other, QUESTIONS)
+        other.commit()
+    finally:
+        other.close()
+
+    response = client.get("/api/quizzes/test-quiz/questions", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()[0]["text"] == "What is 3 + 3?"
+    assert response.headers["etag"] != etag
+
+
+def test_orm_question_writes_bump_the_stamp(db_session, seed_test_questions):
+    stamp = content_version(db_session, QUESTIONS)
+    db_session.query(Question).filter(Question.id == 2).update({"difficulty": "easy"})
+    db_session.commit()
+    assert content_version(db_session, QUESTIONS) == stamp + 1
+
+    db_session.add(Question(id=3, quiz_id="other-quiz", text="Unsaved"))
+    db_session.rollback()
+    assert content_version(db_session, QUESTIONS) == stamp + 1
+
+
+def test_daily_review_reads_parsed_questions_from_the_cache(client, db_session, seed_test_user, seed_test_questions):
+    db_session.add(UserQuestionReview(
+        user_id=1, question_id=2, due_date=datetime.utcnow() - timedelta(hours=1)
+    ))
+    db_session.commit()
+
+    review = client.get("/api/srs/daily-review").json()
+    assert review["total_due"] == 1
+    assert review["questions"][0]["options"] == ["London", "Paris", "Berlin", "Madrid"]
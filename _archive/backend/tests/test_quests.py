@@ -0,0 +1,58 @@
+"""Tests for per-course quest chains and next-quest assignment."""
+from datetime import datetime
+
+from ..app.models import Course, Quest, UserQuest
+from ..app.utils.quest_manager import assign_next_quest, get_quest_chain
+
+
+def _seed_quests(db_session):
+    db_session.add(Course(id=1, name="Data Science"))
+    db_session.add_all([
+        # Default chain: positions override id order, unpositioned quests go last
+        Quest(id=1, name="Slime", boss_hp=5, position=2),
+        Quest(id=2, name="Goblin", boss_hp=50),
+        Quest(id=3, name="Warm-up", boss_hp=5, position=1),
+        # Independent chain for course 1
+        Quest(id=4, name="Pandas", boss_hp=30, course_id=1, position=1),
+        Quest(id=5, name="Matplotlib", boss_hp=40, course_id=1, position=2),
+    ])
+    db_session.commit()
+
+
+def test_chains_are_ordered_per_course(db_session):
+    _seed_quests(db_session)
+    assert [entry.id for entry in get_quest_chain(db_session).entries] == [3, 1, 2]
+    assert [entry.id for entry in get_quest_chain(db_session, 1).entries] == [4, 5]
+    assert get_quest_chain(db_session, 99).entries == ()
+
+
+def test_assignment_follows_the_completed_quests_chain(db_session, seed_test_user, count_statements):
+    _seed_quests(db_session)
+    first = assign_next_quest(db_session, 1, course_id=1)
+    assert (first.quest_id, first.chain_index, first.boss_hp_remaining) == (4, 0, 30)
+    first.completed_at = datetime.utcnow()
+    db_session.flush()
+
+    with count_statements() as statements:
+        second = assign_next_quest(db_session, 1, after=first)
+    assert (second.quest_id, second.course_id, second.chain_index) == (5, 1, 1)
+    # The chain stamp, then the new UserQuest row
+    assert len(statements) == 2 and statements[1].startswith("INSERT")
+
+    second.completed_at = datetime.utcnow()
+    db_session.flush()
+    assert assign_next_quest(db_session, 1, after=second) is None
+
+    # Without a pointer the user resumes after their furthest completed quest
+    assert assign_next_quest(db_session, 1, course_id=1) is None
+    assert assign_next_quest(db_session, 1).quest_id == 3
+
+
+def test_defeating_a_boss_assigns_the_next_quest(client, db_session, seed_test_user, seed_test_curriculum):
+    _seed_quests(db_session)
+    db_session.add(UserQuest(user_id=1, quest_id=3, chain_index=0, boss_hp_remaining=5))
+    db_session.commit()
+
+    client.post("/api/tasks/w1-d1/complete")
+    active = db_session.query(UserQuest).filter(UserQuest.completed_at.is_(None)).one()
+    assert (active.quest_id, active.chain_index) == (1, 1)
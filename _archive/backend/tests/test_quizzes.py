@@ -60,3 +60,59 @@ def test_submit_quiz(client, seed_test_user, seed_test_questions):
     assert data["total_questions"] == 2
     assert "xp_gained" in data
     assert data["xp_gained"] >= 10  # Base XP + score
+
+
+def test_verify_batch_answers_in_request_order(client, seed_test_user, seed_test_questions):
+    """Batch verification answers every item from one query."""
+    response = client.post("/api/quizzes/verify-batch", json={"answers": [
+        {"question_id": 2, "answer": 1},
+        {"question_id": 1, "answer": 0},
+    ]})
+
+    assert response.status_code == 200
+    assert [(r["question_id"], r["is_correct"], r["correct_index"]) for r in response.json()] == [
+        (2, True, 1), (1, False, 1)
+    ]
+
+    missing = client.post("/api/quizzes/verify-batch", json={"answers": [{"question_id": 99, "answer": 0}]})
+    assert missing.status_code == 404
+
+
+def test_verify_endpoints_share_a_per_answer_rate_limit(client, seed_test_user, seed_test_questions):
+    """A batch costs one check per answer against the budget of the single endpoint."""
+    batch = {"answers": [{"question_id": 1, "answer": 1}] * 49}
+    assert client.post("/api/quizzes/verify-batch", json=batch).status_code == 200
+    assert client.post("/api/quizzes/verify", json={"question_id": 1, "answer": 1}).status_code == 200
+
+    limited = client.post("/api/quizzes/verify", json={"question_id": 1, "answer": 1})
+    assert limited.status_code == 429
+    assert int(limited.headers["retry-after"]) >= 1
+    assert client.post("/api/quizzes/verify-batch", json=batch).status_code == 429
+
+    too_big = {"answers": [{"question_id": 1, "answer": 1}] * 51}
+    assert client.post("/api/quizzes/verify-batch", json=too_big).status_code == 422
+
+
+def test_passing_a_linked_quiz_completes_its_task(client, db_session, seed_test_user, seed_test_curriculum):
+    """The submit hook completes the task a quiz is linked to; several quizzes may share a task."""
+    from backend.app.models import Question, QuizTask, UserTaskStatus
+    from backend.app.utils.curriculum import link_day_quizzes
+
+    for question_id, quiz_id in enumerate(["day-2-practice", "python-basics", "test-quiz"], start=1):
+        db_session.add(Question(
+            id=question_id, quiz_id=quiz_id, question_type="mcq", text="Pick b",
+            options='["a", "b"]', correct_index=1,
+        ))
+    db_session.commit()
+    assert link_day_quizzes(db_session) == 1  # Only the day-N quiz is linked by convention
+    db_session.add(QuizTask(quiz_id="python-basics", task_id=2))
+    db_session.commit()
+
+    def submit(quiz_id, question_id):
+        data = client.post("/api/quizzes/submit", json={"quiz_id": quiz_id, "answers": {str(question_id): 1}}).json()
+        return data["task_completed"], data["task_id"]
+
+    assert submit("day-2-practice", 1) == (True, "w1-d2")
+    assert submit("python-basics", 2) == (False, "w1-d2")  # Same task, already completed
+    assert submit("test-quiz", 3) == (False, None)  # Not linked to any task
+    assert [s.task_id for s in db_session.query(UserTaskStatus).filter(UserTaskStatus.completed)] == [2]
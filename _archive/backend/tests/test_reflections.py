@@ -0,0 +1,50 @@
+"""Tests for the reflections listing (keyset pagination and field selection)."""
+from datetime import datetime, timedelta
+
+from ..app.models import Reflection, Week
+
+
+def _seed_reflections(db_session, count):
+    db_session.add_all(Week(id=week, week_number=week, title=f"Week {week}") for week in range(2, count + 1))
+    base = datetime(2026, 5, 1)
+    db_session.add_all(
+        Reflection(
+            user_id=1,
+            week_id=week,
+            content=f"Reflection {week}",
+            # Two reflections share each timestamp so the id tie-break matters
+            created_at=base + timedelta(days=week // 2),
+            updated_at=base,
+        )
+        for week in range(1, count + 1)
+    )
+    db_session.commit()
+
+
+def test_reflections_keyset_pages_cover_everything_once(client, seed_test_user, seed_test_curriculum, db_session):
+    _seed_reflections(db_session, 7)
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/reflections", params=params)
+        assert response.status_code == 200
+        seen.extend(item["week_number"] for item in response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+
+    assert seen == [7, 6, 5, 4, 3, 2, 1]
+    assert client.get("/api/reflections", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_reflections_fields_drop_content(client, seed_test_user, seed_test_curriculum, db_session):
+    _seed_reflections(db_session, 2)
+
+    summary = client.get("/api/reflections", params={"fields": "id,week_title"}).json()
+    assert "content" not in summary[0]
+    assert summary[0]["week_title"] == "Week 2"
+
+    full = client.get("/api/reflections").json()
+    assert full[0]["content"] == "Reflection 2"
+    assert client.get("/api/reflections", params={"fields": "secret"}).status_code == 400
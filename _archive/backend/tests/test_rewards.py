@@ -0,0 +1,69 @@
+"""Tests for the declarative reward rule engine."""
+from ..app.models import Badge, UserBadge
+from ..app.utils.ledger import badge_event, credit
+from ..app.utils.rewards import (
+    ACHIEVEMENT,
+    BADGE,
+    RewardRule,
+    UserRewardSnapshot,
+    evaluate_rewards,
+    evaluate_rules,
+)
+
+
+def _snapshot(metrics, badges=(), achievements=()):
+    return UserRewardSnapshot(
+        user_id=1, metrics=metrics, badges=frozenset(badges), achievements=frozenset(achievements)
+    )
+
+
+def test_evaluate_rules_grants_and_revokes():
+    rules = (
+        RewardRule(BADGE, "b-streak-3", "streak", 3),
+        RewardRule(BADGE, "b-streak-7", "streak", 7),
+        RewardRule(ACHIEVEMENT, "a-boss-first", "quests_defeated", revocable=False),
+    )
+
+    diff = evaluate_rules(rules, _snapshot({"streak": 4, "quests_defeated": 1}))
+    assert diff.grant_badges == ["b-streak-3"]
+    assert diff.grant_achievements == ["a-boss-first"]
+
+    diff = evaluate_rules(
+        rules,
+        _snapshot({"streak": 1}, badges={"b-streak-3"}, achievements={"a-boss-first"}),
+        grant=False,
+        revoke=True,
+    )
+    assert diff.revoke_badges == ["b-streak-3"]
+    assert diff.revoke_achievements == []  # Non-revocable
+
+
+def test_uncomplete_revokes_streak_badge(db_session, seed_test_user, seed_test_curriculum):
+    """Revocations are applied in bulk and the bonus recorded in the ledger is taken back."""
+    db_session.add(Badge(badge_id="b-streak-3", name="Streak 3", xp_value=30))
+    db_session.commit()
+    badge = db_session.query(Badge).filter(Badge.badge_id == "b-streak-3").one()
+    db_session.add(UserBadge(user_id=seed_test_user.id, badge_id=badge.id))
+    seed_test_user.streak, seed_test_user.xp, seed_test_user.gold = 0, 70, 7
+    db_session.commit()
+    credit(db_session, seed_test_user, badge_event("b-streak-3"), "badge", xp=30, gold=3)
+    db_session.commit()
+
+    result = evaluate_rewards(db_session, seed_test_user, grant=False, revoke=True)
+    db_session.commit()
+
+    assert result["badges_revoked"] == ["b-streak-3"]
+    assert db_session.query(UserBadge).count() == 0
+    assert (seed_test_user.xp, seed_test_user.gold) == (70, 7)
+
+
+def test_reward_evaluation_query_count_is_constant(client, seed_test_user, seed_test_curriculum, count_statements):
+    """A full completion request stays at a small constant number of statements."""
+    client.post("/api/tasks/w1-d1/complete")  # Warm the catalog/curriculum/rule caches
+
+    with count_statements() as statements:
+        response = client.post("/api/tasks/w1-d2/complete")
+
+    assert response.status_code == 200
+    assert "b-week-1" in response.json()["badges_unlocked"]
+    assert len(statements) <= 27
@@ -0,0 +1,80 @@
+"""Tests for the read-only RPG state and lazily settled focus/penalties."""
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from ..app.models import RewardLedgerEntry, User
+
+
+def _lapse(db_session, user, **values):
+    """Put the user three days past their last check-in, with focus spent yesterday."""
+    user.last_checkin_at = datetime.utcnow() - timedelta(days=3)
+    user.focus_points = 1
+    user.focus_refreshed_at = datetime.utcnow() - timedelta(days=1)
+    user.streak = 4
+    for name, value in values.items():
+        setattr(user, name, value)
+    db_session.commit()
+
+
+def test_state_derives_penalty_without_writing(client, db_session, seed_test_user, count_statements):
+    _lapse(db_session, seed_test_user)
+
+    with count_statements() as statements:
+        state = client.get("/api/rpg/state").json()
+
+    assert (state["hearts"], state["streak"], state["focus_points"]) == (2, 0, 5)
+    assert all(statement.lstrip().upper().startswith("SELECT") for statement in statements)
+    db_session.expire_all()
+    stored = db_session.get(User, 1)
+    assert (stored.hearts, stored.streak, stored.focus_points, stored.last_heart_loss) == (3, 4, 1, None)
+
+
+def test_next_write_settles_penalty_once(client, db_session, seed_test_user, seed_test_curriculum):
+    _lapse(db_session, seed_test_user)
+
+    client.post("/api/tasks/w1-d1/complete")
+    db_session.expire_all()
+    stored = db_session.get(User, 1)
+    assert stored.hearts == 2 and stored.last_heart_loss is not None
+    assert stored.streak == 1  # Reset by the penalty, then today's check-in
+
+    state = client.get("/api/rpg/state").json()
+    assert (state["hearts"], state["streak"]) == (2, 1)
+
+
+def test_purchase_settles_freeze_before_applying(client, db_session, seed_test_user):
+    _lapse(db_session, seed_test_user, streak_freeze_count=1, gold=100)
+    assert client.get("/api/rpg/state").json()["streak_freeze_count"] == 0
+
+    # The pending miss consumes the owned freeze; the new one is kept
+    assert client.post("/api/rpg/buy/streak_freeze").status_code == 200
+    state = client.get("/api/rpg/state").json()
+    assert (state["streak_freeze_count"], state["hearts"], state["streak"]) == (1, 3, 4)
+
+
+def test_heart_refill_cap_is_checked_by_the_increment(client, db_session, seed_test_user):
+    seed_test_user.hearts, seed_test_user.gold = 2, 300
+    db_session.commit()
+    assert client.post("/api/rpg/buy/heart_refill").status_code == 200
+
+    # A concurrent refill filled the hearts after this request loaded the user
+    db_session.execute(update(User).values(hearts=2).execution_options(synchronize_session=False))
+    db_session.commit()
+    seed_test_user.hearts  # Load the 2 hearts, then let the other purchase land behind the ORM's back
+    db_session.execute(update(User).values(hearts=3).execution_options(synchronize_session=False))
+    response = client.post("/api/rpg/buy/heart_refill")
+    assert (response.status_code, response.json()["detail"]) == (400, "Hearts already full")
+
+    db_session.expire_all()
+    stored = db_session.get(User, 1)
+    assert (stored.hearts, stored.gold) == (3, 200)
+
+
+def test_manual_awards_are_separate_ledger_events(client, db_session, seed_test_user):
+    assert client.post("/api/rpg/award-xp", params={"amount": 5}).json()["total_xp"] == 5
+    assert client.post("/api/rpg/award-xp", params={"amount": 7}).json()["total_xp"] == 12
+
+    keys = [key for (key,) in db_session.query(RewardLedgerEntry.event_key).filter_by(source="award")]
+    assert len(keys) == len(set(keys)) == 2
+    assert all(key.startswith("manual-award:") for key in keys)
@@ -0,0 +1,63 @@
+"""Tests for the full-text search index and endpoint."""
+import pytest
+
+from ..app.models import Question, Reflection, User
+from ..app.utils.search import drop_search_index, ensure_search_index, index_questions, rebuild_search_index
+from .conftest import engine
+
+
+@pytest.fixture
+def search_index(db_session):
+    ensure_search_index(engine)
+    yield
+    drop_search_index(engine)
+
+
+@pytest.fixture
+def seeded_search(db_session, seed_test_user, seed_test_curriculum, search_index):
+    questions = [
+        Question(quiz_id="day-1", text="What does a for loop iterate over?", topic_tag="loops",
+                 explanation="Any iterable, such as a list"),
+        Question(quiz_id="day-2", text="How do you define a function?", topic_tag="functions",
+                 explanation="Use the def keyword"),
+    ]
+    db_session.add_all(questions)
+    db_session.flush()
+    index_questions(db_session, questions)
+    db_session.commit()
+
+
+def test_search_ranks_reflections_and_questions(client, seeded_search):
+    saved = client.post("/api/reflections", json={"week_id": 1, "content": "Loops finally <clicked> for me"})
+    assert saved.status_code == 200
+
+    data = client.get("/api/search", params={"q": "loop"}).json()
+    assert {(r["kind"], r["id"]) for r in data["results"]} == {("reflection", saved.json()["id"]), ("question", 1)}
+    reflection = next(r for r in data["results"] if r["kind"] == "reflection")
+    assert reflection["snippet"] == "<mark>Loops</mark> finally &lt;clicked&gt; for me"
+    assert reflection["parent"] == "1"
+
+    # Updates replace the indexed document
+    client.post("/api/reflections", json={"week_id": 1, "content": "Recursion is next"})
+    assert client.get("/api/search", params={"q": "loops", "kind": "reflection"}).json()["results"] == []
+    assert len(client.get("/api/search", params={"q": "recurs"}).json()["results"]) == 1
+
+
+def test_search_scopes_reflections_to_owner_and_hides_explanations(client, db_session, seeded_search):
+    db_session.add(User(id=2, username="other_user"))
+    db_session.add(Reflection(user_id=2, week_id=1, content="Private notes about keyword arguments"))
+    db_session.commit()
+    rebuild_search_index(db_session)
+    db_session.commit()
+
+    # The explanation matches "keyword", but only its question text is shown
+    results = client.get("/api/search", params={"q": "keyword"}).json()["results"]
+    assert [(r["kind"], r["snippet"]) for r in results] == [("question", "How do you define a function?")]
+
+
+def test_search_pagination_and_validation(client, seeded_search):
+    page = client.get("/api/search", params={"q": "d", "limit": 1}).json()
+    assert len(page["results"]) == 1 and page["next_offset"] == 1
+
+    assert client.get("/api/search", params={"q": "!!!"}).json()["results"] == []
+    assert client.get("/api/search", params={"q": "loop", "kind": "users"}).status_code == 400
@@ -89,3 +89,28 @@ def test_submit_review_result_failure(client, seed_test_user, seed_test_question
     assert updated_review.interval_index == 0
     assert updated_review.success_count == 0
     assert updated_review.due_date < (datetime.utcnow() + timedelta(days=2))
+
+
+def test_submit_quiz_upserts_failed_questions_in_one_statement(
+    client, seed_test_user, seed_test_questions, db_session, count_statements
+):
+    """Failed answers insert new reviews and reset existing ones with a single upsert."""
+    db_session.add(UserQuestionReview(
+        user_id=1, question_id=2, interval_index=3, success_count=4, is_mastered=True,
+        due_date=datetime.utcnow() + timedelta(days=30)
+    ))
+    db_session.commit()
+
+    with count_statements() as statements:
+        response = client.post("/api/quizzes/submit", json={
+            "quiz_id": "test-quiz", "answers": {"1": 0, "01": 1, "2": 0}
+        })
+    assert response.json()["score"] == 0  # "01" repeats question 1 and is ignored
+
+    assert len([s for s in statements if "user_question_reviews" in s]) == 1
+    db_session.expire_all()
+    reviews = db_session.query(UserQuestionReview).order_by(UserQuestionReview.question_id).all()
+    assert [(r.question_id, r.interval_index, r.success_count, r.is_mastered) for r in reviews] == [
+        (1, 0, 0, False), (2, 0, 0, False)
+    ]
+    assert all(r.due_date < datetime.utcnow() + timedelta(days=2) for r in reviews)
@@ -0,0 +1,92 @@
+"""Tests for task completion and progress counters."""
+from ..app.models import UserBadge, UserWeekProgress
+from ..app.utils.progress_counters import adjust_week_progress, rebuild_progress_counters
+
+
+def _week_counter(db_session, user_id=1, week_id=1):
+    row = db_session.get(UserWeekProgress, (user_id, week_id))
+    db_session.refresh(row)
+    return row.tasks_completed
+
+
+def test_complete_task_updates_week_counter(client, seed_test_user, seed_test_curriculum, db_session):
+    """Completing tasks increments the counter and finishing the week awards its badge."""
+    first = client.post("/api/tasks/w1-d1/complete")
+    assert first.status_code == 200
+    assert first.json()["achievements_unlocked"] == ["a-first-task"]
+    assert _week_counter(db_session) == 1
+
+    second = client.post("/api/tasks/w1-d2/complete")
+    assert second.status_code == 200
+    assert "b-week-1" in second.json()["badges_unlocked"]
+    assert _week_counter(db_session) == 2
+
+    # Completing again is a no-op for the counter
+    client.post("/api/tasks/w1-d2/complete")
+    assert _week_counter(db_session) == 2
+
+
+def test_uncomplete_task_decrements_counter_and_revokes_week_badge(
+    client, seed_test_user, seed_test_curriculum, db_session
+):
+    client.post("/api/tasks/w1-d1/complete")
+    client.post("/api/tasks/w1-d2/complete")
+    assert db_session.query(UserBadge).count() == 1
+
+    response = client.post("/api/tasks/w1-d2/uncomplete")
+    assert response.status_code == 200
+    assert _week_counter(db_session) == 1
+    assert db_session.query(UserBadge).count() == 0
+
+    progress = client.get("/api/progress").json()
+    assert progress["tasks_completed"] == 1
+    assert progress["tasks_total"] == 2
+
+
+def test_rebuild_progress_counters_matches_live_state(
+    client, seed_test_user, seed_test_curriculum, db_session
+):
+    client.post("/api/tasks/w1-d1/complete")
+    db_session.query(UserWeekProgress).update({"tasks_completed": 7})
+    db_session.commit()
+
+    assert rebuild_progress_counters(db_session) == 1
+    db_session.commit()
+    assert _week_counter(db_session) == 1
+
+
+def test_week_counter_upsert_creates_then_adjusts_the_row(seed_test_user, seed_test_curriculum, db_session):
+    adjust_week_progress(db_session, 1, 1, -1)  # A first write never goes below zero
+    assert _week_counter(db_session) == 0
+    adjust_week_progress(db_session, 1, 1, 1)
+    adjust_week_progress(db_session, 1, 1, 1)
+    assert _week_counter(db_session) == 2
+    adjust_week_progress(db_session, 1, 1, -3)
+    assert _week_counter(db_session) == 0
+
+
+def test_complete_batch_applies_tasks_in_one_pass(client, seed_test_user, seed_test_curriculum, db_session):
+    """Batch completion aggregates XP and evaluates week badges once."""
+    response = client.post(
+        "/api/tasks/complete-batch",
+        json={"task_ids": ["w1-d1", "w1-d2", "w1-d1", "w9-d9"]},
+    )
+    assert response.status_code == 200
+    data = response.json()
+
+    assert [t["task_id"] for t in data["completed"]] == ["w1-d1", "w1-d2"]
+    assert data["not_found"] == ["w9-d9"]
+    assert data["xp_gained"] == 20
+    assert data["badges_unlocked"] == ["b-week-1"]
+    assert data["achievements_unlocked"] == ["a-first-task"]
+    assert _week_counter(db_session) == 2
+
+    again = client.post("/api/tasks/complete-batch", json={"task_ids": ["w1-d2"]}).json()
+    assert again["already_completed"] == ["w1-d2"]
+    assert again["xp_gained"] == 0
+
+
+def test_complete_batch_rejects_oversized_batches(client, seed_test_user):
+    task_ids = [f"t-{i}" for i in range(101)]
+    response = client.post("/api/tasks/complete-batch", json={"task_ids": task_ids})
+    assert response.status_code == 400
@@ -0,0 +1,75 @@
+"""Tests for the user_stats materialization behind /api/progress."""
+from sqlalchemy import update
+
+from ..app.models import Task, UserStats, UserTaskStatus
+from ..app.utils.user_stats import adjust_user_stats, get_user_stats, rebuild_user_stats, verify_user_stats
+
+
+def test_progress_tracks_write_paths(client, db_session, seed_test_user, seed_test_curriculum, seed_test_questions):
+    client.post("/api/tasks/w1-d1/complete")
+    client.post("/api/tasks/w1-d2/complete")
+    client.post("/api/quizzes/submit", json={"quiz_id": "test-quiz", "answers": {"1": 1, "2": 0}})
+
+    progress = client.get("/api/progress").json()
+    assert (progress["tasks_completed"], progress["tasks_total"]) == (2, 2)
+    assert (progress["badges_earned"], progress["badges_total"]) == (1, 1)
+    assert (progress["achievements_earned"], progress["achievements_total"]) == (1, 1)
+    assert progress["quizzes_completed"] == 1
+
+    # Uncompleting revokes the week badge; the stats follow
+    client.post("/api/tasks/w1-d2/uncomplete")
+    progress = client.get("/api/progress").json()
+    assert (progress["tasks_completed"], progress["badges_earned"]) == (1, 0)
+    assert verify_user_stats(db_session) == []
+
+
+def test_progress_reads_one_stats_row(client, seed_test_user, seed_test_curriculum, count_statements):
+    client.post("/api/tasks/w1-d1/complete")
+    client.get("/api/progress")  # Warm the curriculum and catalog caches
+
+    with count_statements() as statements:
+        assert client.get("/api/progress").status_code == 200
+
+    # The user row (auth), the user_stats row, and the catalog and curriculum stamps
+    assert len(statements) == 4
+    assert "user_stats" in statements[1]
+    assert all("content_versions" in statement for statement in statements[2:])
+
+
+def test_adjust_user_stats_upsert_seeds_then_increments(db_session, seed_test_user, seed_test_curriculum):
+    task = db_session.query(Task).filter_by(task_id="w1-d1").one()
+    db_session.add(UserTaskStatus(user_id=1, task_id=task.id, completed=True))
+
+    # The first write seeds the row from live counts, which include the pending change
+    adjust_user_stats(db_session, 1, tasks_completed=1)
+    assert get_user_stats(db_session, 1).tasks_completed == 1
+
+    # Later writes add to the stored row in the same statement
+    adjust_user_stats(db_session, 1, tasks_completed=1, quizzes_completed=-2)
+    stats = get_user_stats(db_session, 1)
+    assert (stats.tasks_completed, stats.quizzes_completed) == (2, 0)
+    assert db_session.query(UserStats).count() == 1
+
+
+def test_verify_and_rebuild_user_stats(client, db_session, seed_test_user, seed_test_curriculum):
+    # No row yet: counted live, and not reported as drift
+    assert client.get("/api/progress").json()["tasks_completed"] == 0
+    assert verify_user_stats(db_session) == []
+
+    client.post("/api/tasks/w1-d1/complete")
+    db_session.execute(update(UserStats).values(tasks_completed=9, quizzes_completed=3))
+    db_session.commit()
+    assert verify_user_stats(db_session) == [
+        {"user_id": 1, "tasks_completed": (9, 1), "quizzes_completed": (3, 0)}
+    ]
+
+    assert rebuild_user_stats(db_session) == 1
+    db_session.commit()
+    assert verify_user_stats(db_session) == []
+    assert client.get("/api/progress").json()["tasks_completed"] == 1
+
+    # An active user whose row has not been created yet is served live, not drifted
+    db_session.query(UserStats).delete()
+    db_session.commit()
+    assert client.get("/api/progress").json()["tasks_completed"] == 1
+    assert verify_user_stats(db_session) == []
@@ -0,0 +1,65 @@
+"""Tests for the nightly bulk vitals sweep."""
+from datetime import datetime, timedelta
+
+from ..app.models import User
+from ..app.utils.gamification import resolve_vitals
+from ..app.utils.vitals_sweep import sweep_vitals
+
+
+def _seed_users(db_session):
+    now = datetime.utcnow()
+    states = [
+        {},  # Never checked in
+        {"last_checkin_at": now},  # Active today
+        {"last_checkin_at": now - timedelta(days=1)},  # Yesterday: no penalty yet
+        {"last_checkin_at": now - timedelta(days=3)},  # Loses a heart
+        {"last_checkin_at": now - timedelta(days=3), "streak_freeze_count": 2},  # Uses a freeze
+        {"last_checkin_at": now - timedelta(days=3), "hearts": 0},  # Nothing left to take
+        {"last_checkin_at": now - timedelta(days=5), "last_heart_loss": now - timedelta(days=2)},  # Already penalized
+    ]
+    for offset, state in enumerate(states):
+        db_session.add(User(
+            id=offset + 1,
+            username=f"user{offset + 1}",
+            streak=4,
+            focus_points=1,
+            focus_refreshed_at=now - timedelta(days=1),
+            **state,
+        ))
+    db_session.commit()
+
+
+def _vitals(db_session):
+    db_session.expire_all()
+    return {
+        user.id: (user.focus_points, user.hearts, user.streak, user.streak_freeze_count)
+        for user in db_session.query(User).order_by(User.id)
+    }
+
+
+def test_sweep_matches_per_user_rules(db_session):
+    _seed_users(db_session)
+    expected = {
+        user.id: (vitals.focus_points, vitals.hearts, vitals.streak, vitals.streak_freeze_count)
+        for user in db_session.query(User)
+        for vitals in [resolve_vitals(user)]
+    }
+
+    batches = sweep_vitals(db_session, batch_size=3)
+    assert [(b.first_id, b.last_id) for b in batches] == [(1, 3), (4, 6), (7, 7)]
+    assert (sum(b.hearts_lost for b in batches), sum(b.freezes_used for b in batches)) == (1, 1)
+    assert _vitals(db_session) == expected
+    assert all(resolve_vitals(user).penalty is None for user in db_session.query(User))
+
+
+def test_sweep_is_idempotent_and_resumable(db_session):
+    _seed_users(db_session)
+
+    # Resume after user 3: earlier users are left alone
+    sweep_vitals(db_session, batch_size=2, start_after=3)
+    assert _vitals(db_session)[1][0] == 1
+    swept = _vitals(db_session)
+
+    rerun = sweep_vitals(db_session, batch_size=2, start_after=3)
+    assert sum(b.focus_refreshed + b.freezes_used + b.hearts_lost for b in rerun) == 0
+    assert _vitals(db_session) == swept
@@ -0,0 +1,38 @@
+"""Tests for the weeks endpoints, including query-count regression guards."""
+from ..app.models import Task, Week
+
+
+def _seed_long_week(db_session, tasks=7):
+    db_session.add(Week(id=2, week_number=2, title="Week 2"))
+    db_session.add_all(
+        Task(id=100 + day, task_id=f"w2-d{day}", week_id=2, day=f"Day {day}", description=f"Day {day}")
+        for day in range(1, tasks + 1)
+    )
+    db_session.commit()
+
+
+def test_get_week_reports_statuses(client, seed_test_user, seed_test_curriculum):
+    client.post("/api/tasks/w1-d2/complete")
+
+    data = client.get("/api/weeks/1").json()
+    assert [t["completed"] for t in data["tasks"]] == [False, True]
+    assert (data["tasks_completed"], data["tasks_total"]) == (1, 2)
+    assert client.get("/api/weeks/number/1").json() == data
+
+
+def test_week_endpoints_use_constant_queries(client, seed_test_user, seed_test_curriculum, db_session, count_statements):
+    """Query counts do not grow with the number of tasks or weeks."""
+    client.get("/api/weeks")  # Warm the curriculum cache
+    with count_statements() as short_week:
+        client.get("/api/weeks/1")
+
+    _seed_long_week(db_session)
+    client.post("/api/tasks/w2-d3/complete")
+    client.get("/api/weeks")
+    with count_statements() as long_week:
+        assert client.get("/api/weeks/number/2").json()["tasks_completed"] == 1
+    with count_statements() as all_weeks:
+        assert len(client.get("/api/weeks").json()) == 2
+
+    assert len(long_week) == len(short_week) <= 4
+    assert len(all_weeks) <= 4
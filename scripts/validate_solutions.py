@@ -0,0 +1,200 @@
+"""
+Validate that every coding question's solution_code passes its own test_cases.
+
+Loads all scripts/data/questions/day-*.json files and runs each coding
+question's reference solution through the backend's sandboxed code runner
+(the same pool of forked workers that scores answers on the server), so a
+question that passes here also passes when a learner submits the solution.
+
+Results are cached by a hash of the solution and its tests. Questions whose
+content has not changed since the last run are not executed again; the cache
+is dropped whenever the runner or its limits change.
+
+Prints a JSON report of failing, timed-out and slow questions and exits
+non-zero when any solution fails.
+
+Usage:
+    python scripts/validate_solutions.py [--jobs N] [--time-limit 5] [--slow 1.0]
+                                         [--days 1 2 3] [--output report.json] [--no-cache]
+                                         [--user nobody]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+QUESTIONS_DIR = BASE_DIR / "scripts" / "data" / "questions"
+CACHE_PATH = BASE_DIR / "scripts" / ".solution_cache.json"
+RUNNER_PATH = BASE_DIR / "_archive" / "backend" / "app" / "utils" / "code_runner.py"
+
+sys.path.insert(0, str(BASE_DIR / "_archive"))
+
+from backend.app.utils.code_runner import SANDBOX_USER, SandboxLimits, SandboxPool  # noqa: E402
+
+
+def load_coding_questions(days=None):
+    """Every coding question with a reference solution, in day and file order."""
+    questions = []
+    json_files = sorted(QUESTIONS_DIR.glob("day-*.json"), key=lambda p: int(p.stem.split("-")[1]))
+    for json_file in json_files:
+        day = int(json_file.stem.split("-")[1])
+        if days and day not in days:
+            continue
+        with open(json_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for index, q in enumerate(data):
+            if q.get("question_type") != "coding" or not q.get("solution_code"):
+                continue
+            questions.append({
+                "day": day,
+                "question": index + 1,
+                "text": (q.get("text") or "")[:80],
+                "solution_code": q["solution_code"],
+                "test_cases": q.get("test_cases"),
+            })
+    return questions
+
+
+def content_hash(question):
+    payload = json.dumps([question["solution_code"], question["test_cases"]], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def runner_fingerprint(limits):
+    """Changes whenever the runner code or the limits do, invalidating cached outcomes."""
+    digest = hashlib.sha256(RUNNER_PATH.read_bytes())
+    digest.update(f"{limits.time_limit}:{limits.memory_mb}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def load_cache(path, fingerprint):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if cache.get("runner") != fingerprint:
+        return {}
+    return cache.get("results", {})
+
+
+def save_cache(path, fingerprint, results):
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"runner": fingerprint, "results": results}, f, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def run_question(pool, question):
+    """Run one solution and summarize it as a cacheable outcome."""
+    start = time.perf_counter()
+    run = pool.run(question["solution_code"], question["test_cases"])
+    duration = round(time.perf_counter() - start, 4)
+    if not run.results:
+        status = "no_tests"
+    elif run.timed_out:
+        status = "timeout"
+    else:
+        status = "passed" if run.all_passed else "failed"
+    return {
+        "status": status,
+        "duration": duration,
+        "tests": len(run.results),
+        "failures": [result.to_dict() for result in run.results if not result.passed],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Sandbox worker processes")
+    parser.add_argument("--time-limit", type=float, default=5.0, help="Seconds allowed per question")
+    parser.add_argument("--memory-mb", type=int, default=512, help="Address-space limit per question")
+    parser.add_argument("--slow", type=float, default=1.0, help="Report passing questions slower than this (seconds)")
+    parser.add_argument("--days", type=int, nargs="+", help="Only validate these days")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--cache", default=str(CACHE_PATH), help="Result cache file")
+    parser.add_argument("--no-cache", action="store_true", help="Run every question, ignoring cached results")
+    parser.add_argument(
+        "--user",
+        default=SANDBOX_USER or "nobody",
+        help="Account the sandbox switches to when run as root (default: $CODE_SANDBOX_USER or nobody)",
+    )
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    limits = SandboxLimits(time_limit=args.time_limit, memory_mb=args.memory_mb)
+    fingerprint = runner_fingerprint(limits)
+    cache_path = Path(args.cache)
+    cached = {} if args.no_cache else load_cache(cache_path, fingerprint)
+
+    questions = load_coding_questions(set(args.days) if args.days else None)
+    for question in questions:
+        question["hash"] = content_hash(question)
+    pending = [q for q in questions if q["hash"] not in cached]
+    # The same solution and tests can appear on several days; run it once
+    unique = list({q["hash"]: q for q in pending}.values())
+
+    outcomes = dict(cached)
+    if unique:
+        pool = SandboxPool(
+            max(1, min(args.jobs, len(unique))), limits, max_queue=len(unique), user=args.user
+        )
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, min(args.jobs, len(unique)))) as executor:
+                for question, outcome in zip(unique, executor.map(lambda q: run_question(pool, q), unique)):
+                    outcomes[question["hash"]] = outcome
+        finally:
+            pool.close()
+
+    if not args.no_cache:
+        # Timeouts depend on machine load, so they are retried next time
+        keep = {h: o for h, o in outcomes.items() if o["status"] != "timeout"}
+        save_cache(cache_path, fingerprint, keep)
+
+    problems = []
+    counts = {"passed": 0, "failed": 0, "timeout": 0, "no_tests": 0, "slow": 0}
+    for question in questions:
+        outcome = outcomes[question["hash"]]
+        counts[outcome["status"]] += 1
+        slow = outcome["status"] == "passed" and outcome["duration"] > args.slow
+        counts["slow"] += slow
+        if outcome["status"] != "passed" or slow:
+            problems.append({
+                "day": question["day"],
+                "question": question["question"],
+                "text": question["text"],
+                "status": "slow" if slow else outcome["status"],
+                "duration": outcome["duration"],
+                "tests": outcome["tests"],
+                "failures": outcome["failures"],
+            })
+
+    report = {
+        "questions": len(questions),
+        "executed": len(unique),
+        "cached": len(questions) - len(pending),
+        "elapsed": round(time.perf_counter() - started, 2),
+        "counts": counts,
+        "problems": problems,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    print(
+        f"{len(questions)} solutions: {counts['passed']} passed, {counts['failed']} failed, "
+        f"{counts['timeout']} timed out, {counts['no_tests']} without tests, {counts['slow']} slow "
+        f"({report['executed']} run, {report['cached']} cached, {report['elapsed']}s)",
+        file=sys.stderr,
+    )
+    return 1 if counts["failed"] or counts["timeout"] or counts["no_tests"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())